@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+"""Measure the throughput of the e-board parsers, run it from the picochess folder."""
+
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from eboard.certabo.parser import BoardTranslator, Parser as CertaboParser  # noqa: E402
+from eboard.chessnut.parser import Parser as ChessnutParser, ParserCallback as ChessnutCallback  # noqa: E402
+from eboard.ichessone.parser import Parser as IChessOneParser, ParserCallback as IChessOneCallback  # noqa: E402
+
+# the fixtures of tests/test_certabo_parser.py, tests/test_chessnut_parser.py and tests/test_ichessone_parser.py
+CERTABO_BOARD = (
+    ':3 0 84 252 153 3 0 85 0 104 3 0 84 2 3 3 0 83 177 224 3 0 84 107 52 3 0 84 240 106 '
+    '3 0 85 0 107 3 0 84 255 174 3 0 84 44 81 3 0 84 121 210 3 0 84 242 13 3 0 84 107 56 3 0 84 78 193 '
+    '3 0 84 240 84 3 0 84 240 65 3 0 84 68 134 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 160 80 '
+    '7 140 126 32 250 15 0 0 254 7 118 237 181 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 '
+    '0 160 225 80 192 121 0 0 0 0 0 207 224 74 7 172 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 3 0 85 1 184 0 0 0 0 0 '
+    '0 0 0 0 0 100 115 213 250 161 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 186 10 56 165 201 0 0 0 0 0 168 '
+    '94 211 7 40 74 124 195 174 25 3 0 84 44 165 3 0 84 68 112 3 0 84 237 98 3 0 84 252 170 0 0 0 0 0 3 0 '
+    '84 78 209 3 0 84 242 11 3 0 84 78 216 3 0 85 0 16 3 0 83 229 13 3 0 85 0 67 3 0 84 121 142 3 0 84 105 '
+    '128 3 0 84 106 231 3 0 84 247 87 3 0 84 252 15\r\n').encode()
+SENTIO_BOARD = b':255 255 0 0 0 0 255 255 \r\n'
+CHESSNUT_BOARD = bytes.fromhex('012458233185444444440000000000000000000000000000000077777777A6C99B6AFFFFFFFF')
+CHESSNUT_BATTERY = bytes.fromhex('2a025800')
+ICHESSONE_BOARD = bytes.fromhex('3d70a89bc98a77777777000000000000000000000000000000001111111142356324')
+
+USB_CHUNK = 64  # bytes per read from a USB serial adapter
+BLE_CHUNK = 20  # bytes per BLE notification
+REPEAT = 5
+
+
+def chunks(stream: bytes, size: int):
+    return [stream[pos:pos + size] for pos in range(0, len(stream), size)]
+
+
+def bench(name: str, parser, frame: bytes, frames: int, chunk_size: int):
+    data = chunks(frame * frames, chunk_size)
+
+    def run():
+        for chunk in data:
+            parser.parse(bytearray(chunk))
+
+    seconds = min(timeit.repeat(run, number=1, repeat=REPEAT))
+    size = len(frame) * frames
+    print('{:<22} {:>10.0f} frames/s {:>8.1f} MB/s'.format(name, frames / seconds, size / seconds / 1e6))
+
+
+def parser_cases():
+    """Return name, parser, frame, number of frames and chunk size of each parser benchmark."""
+    return [
+        ('certabo', CertaboParser(BoardTranslator(), skip_unchanged=True), CERTABO_BOARD, 2000, USB_CHUNK),
+        ('certabo (low gain)', CertaboParser(BoardTranslator()), CERTABO_BOARD, 2000, USB_CHUNK),
+        ('tabutronic sentio', CertaboParser(BoardTranslator()), SENTIO_BOARD, 20000, USB_CHUNK),
+        ('chessnut', ChessnutParser(ChessnutCallback()), CHESSNUT_BOARD + CHESSNUT_BATTERY, 20000, BLE_CHUNK),
+        ('ichessone', IChessOneParser(IChessOneCallback()), ICHESSONE_BOARD, 20000, BLE_CHUNK),
+    ]
+
+
+def main():
+    for case in parser_cases():
+        bench(*case)
+
+
+if __name__ == '__main__':
+    main()
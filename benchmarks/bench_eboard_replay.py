@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Replay e-board recordings (see --eboard-record) through the board parsers, run it from the picochess folder.
+
+For each recording the messages/s and the latency from handing a message to the parser till the
+board event are reported. Without arguments, recordings built from the parser test fixtures are used.
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from typing import Callable, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.bench_eboard_parsers import (CERTABO_BOARD, CHESSNUT_BATTERY, CHESSNUT_BOARD,  # noqa: E402
+                                             ICHESSONE_BOARD, SENTIO_BOARD, chunks)
+from dgt.frame_parser import FrameParser  # noqa: E402
+from eboard.certabo.parser import BoardTranslator, Parser as CertaboParser  # noqa: E402
+from eboard.chesslink.chess_link import flat_to_short_fen, raw_to_flat  # noqa: E402
+from eboard.chessnut.parser import Parser as ChessnutParser, ParserCallback as ChessnutCallback  # noqa: E402
+from eboard.ichessone.parser import Parser as IChessOneParser, ParserCallback as IChessOneCallback  # noqa: E402
+from eboard.recorder import Recorder, read_recording  # noqa: E402
+
+# second positions, so every frame of the built recordings changes the board
+CHESSNUT_MOVED = bytes.fromhex('012458233185444400440000000000000000000000000000000077700777A6C99B6AFFFFFFFF')
+SENTIO_MOVED = b':255 255 0 0 0 0 239 255 \r\n'
+ICHESSONE_MOVED = bytes.fromhex('3d70a89bc98a77777777000000000000000000000000000000011111111042356324')
+CHESSLINK_BOARDS = ['s' + 'RNBKQBNR' + 'PPPPPPPP' + '.' * 32 + 'pppppppp' + 'rnbkqbnr' + '00',
+                    's' + 'RNBKQBNR' + 'PPP.PPPP' + '...P....' + '.' * 24 + 'pppppppp' + 'rnbkqbnr' + '00']
+DGT_FIELD_UPDATES = bytes.fromhex('8e0005' '3400' '8e0005' '2401')
+
+
+class Events(object):
+
+    """Collect the latencies from handing a message to a parser till its board events."""
+
+    def __init__(self):
+        self.start = 0.0
+        self.latencies: List[float] = []
+
+    def event(self, *args):
+        self.latencies.append(time.perf_counter() - self.start)
+
+
+class CertaboEvents(BoardTranslator):
+
+    def __init__(self, events: Events):
+        self.events = events
+
+    def translate(self, board):
+        self.events.event()
+
+    def translate_occupied_squares(self, board):
+        self.events.event()
+
+
+class ChessnutEvents(ChessnutCallback):
+
+    def __init__(self, events: Events):
+        self.events = events
+
+    def board_update(self, short_fen: str):
+        self.events.event()
+
+
+class IChessOneEvents(IChessOneCallback):
+
+    def __init__(self, events: Events):
+        self.events = events
+
+    def board_update(self, short_fen: str):
+        self.events.event()
+
+
+def certabo_sink(events: Events) -> Callable:
+    return CertaboParser(CertaboEvents(events)).parse
+
+
+def chessnut_sink(events: Events) -> Callable:
+    return ChessnutParser(ChessnutEvents(events)).parse
+
+
+def ichessone_sink(events: Events) -> Callable:
+    return IChessOneParser(IChessOneEvents(events)).parse
+
+
+def chesslink_sink(events: Events) -> Callable:
+    def parse(message: str):
+        if message[0] == 's':
+            flat = raw_to_flat(message[1:65])
+            if flat is not None:
+                events.event(flat_to_short_fen(flat))
+    return parse
+
+
+def dgt_sink(events: Events) -> Callable:
+    parser = FrameParser()
+
+    def parse(data: bytes):
+        for frame in parser.feed(data):
+            events.event(frame)
+    return parse
+
+
+SINKS = {'certabo': certabo_sink, 'chessnut': chessnut_sink, 'ichessone': ichessone_sink,
+         'chesslink': chesslink_sink, 'dgt': dgt_sink}
+
+
+def build_recordings(folder: str) -> List[str]:
+    """Write recordings of the parser test fixtures, cut into reads like the transports hand them over."""
+    streams = {'certabo': chunks(CERTABO_BOARD, 64) * 500,
+               'sentio': [SENTIO_BOARD, SENTIO_MOVED] * 2500,
+               'chessnut': chunks((CHESSNUT_BOARD + CHESSNUT_BATTERY + CHESSNUT_MOVED) * 2500, 20),
+               'ichessone': chunks((ICHESSONE_BOARD + ICHESSONE_MOVED) * 2500, 20),
+               'chesslink': CHESSLINK_BOARDS * 2500,
+               'dgt': chunks(DGT_FIELD_UPDATES * 5000, 8)}
+    paths = []
+    for name, messages in streams.items():
+        path = os.path.join(folder, name + '.rec')
+        recorder = Recorder(path, 'certabo' if name == 'sentio' else name)
+        for message in messages:
+            recorder.record(message)
+        recorder.close()
+        paths.append(path)
+    return paths
+
+
+def percentile(values: List[float], percent: int) -> float:
+    return sorted(values)[min(len(values) - 1, len(values) * percent // 100)]
+
+
+def bench(path: str):
+    board, recording = read_recording(path)
+    messages = [message for _, message in recording if not (isinstance(message, str) and
+                                                            message.startswith('agent-state: '))]
+    events = Events()
+    parse = SINKS[board](events)
+    begin = time.perf_counter()
+    for message in messages:
+        events.start = time.perf_counter()
+        parse(message)
+    seconds = time.perf_counter() - begin
+    latencies = events.latencies or [0.0]
+    print('{:<18} {:<10} {:>9.0f} msg/s {:>7} events  latency us p50 {:>6.1f} p95 {:>6.1f} p99 {:>6.1f}'.format(
+        os.path.basename(path), board, len(messages) / seconds, len(events.latencies),
+        percentile(latencies, 50) * 1e6, percentile(latencies, 95) * 1e6, percentile(latencies, 99) * 1e6))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('recordings', nargs='*', help='recordings made with --eboard-record')
+    args = parser.parse_args()
+    if args.recordings:
+        for path in args.recordings:
+            bench(path)
+        return
+    with tempfile.TemporaryDirectory() as folder:
+        for path in build_recordings(folder):
+            bench(path)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,315 @@
+#!/usr/bin/env python3
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Measure the functions picochess runs per move or per board scan, run it from the picochess folder.
+
+All fixtures are built from the Evergreen game below and the test engine ini files, so runs on
+different machines and releases measure the same work. With --json the results are written to a file
+together with the machine they were measured on, --compare shows the change to such a file.
+"""
+
+import argparse
+import datetime
+import io
+import json
+import logging
+import os
+import platform
+import sys
+import timeit
+from types import SimpleNamespace
+from typing import Callable, Dict, List, Optional, Tuple
+
+import chess  # type: ignore
+import chess.pgn  # type: ignore
+import chess.uci  # type: ignore
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.bench_eboard_parsers import chunks, parser_cases  # noqa: E402
+from dgt.api import Dgt, Message  # noqa: E402
+from dgt.menu import DgtMenu  # noqa: E402
+from dgt.translate import DgtTranslate  # noqa: E402
+from dgt.util import ClockSide, EBoard, PicoCoach, PicoComment  # noqa: E402
+from dispatcher import Dispatcher  # noqa: E402
+from eboard.move_debouncer import MoveDebouncer  # noqa: E402
+from picochess import compare_fen, compute_legal_fens  # noqa: E402
+from picotutor import PicoTutor  # noqa: E402
+from server import WebDisplay  # noqa: E402
+from uci.engine_provider import EngineProvider  # noqa: E402
+from uci.read import read_engine_ini  # noqa: E402
+from utilities import version  # noqa: E402
+
+GAME = """
+1.e4 e5 2.Nf3 Nc6 3.Bc4 Bc5 4.b4 Bxb4 5.c3 Ba5 6.d4 exd4 7.O-O d3 8.Qb3 Qf6 9.e5 Qg6 10.Re1 Nge7
+11.Ba3 b5 12.Qxb5 Rb8 13.Qa4 Bb6 14.Nbd2 Bb7 15.Ne4 Qf5 16.Bxd3 Qh5 17.Nf6+ gxf6 18.exf6 Rg8
+19.Rad1 Qxf3 20.Rxe7+ Nxe7 21.Qxd7+ Kxd7 22.Bf5+ Ke8 23.Bd7+ Kf8 24.Bxe7# 1-0
+"""
+TEST_ENGINES = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'tests')
+TEXT_CODES = [('N10_score', 35), ('N10_score', None), ('N10_mate', '3'), ('N10_bookmove', ''),
+              ('B10_okengine', ''), ('B00_level', 'Level 10'), ('K20_newposition', ''), ('Y21_picochess', '')]
+REPEAT = 5
+
+Case = Tuple[str, int, Callable[[], None]]  # name, operations per run, run
+
+
+def game_boards() -> Tuple[List[chess.Board], List[chess.Move]]:
+    """Return the positions of the game from the start position on, and its moves."""
+    game = chess.pgn.read_game(io.StringIO(GAME))
+    board = game.board()
+    boards = [board.copy()]
+    moves = list(game.main_line())
+    for move in moves:
+        board.push(move)
+        boards.append(board.copy())
+    return boards, moves
+
+
+def create_menu() -> DgtMenu:
+    EngineProvider.modern_engines = read_engine_ini(engine_path=TEST_ENGINES, filename='engines.ini', use_cache=False)
+    EngineProvider.retro_engines = read_engine_ini(engine_path=TEST_ENGINES, filename='retro.ini', use_cache=False)
+    EngineProvider.favorite_engines = read_engine_ini(engine_path=TEST_ENGINES, filename='favorites.ini',
+                                                      use_cache=False)
+    EngineProvider.installed_engines = list(EngineProvider.modern_engines + EngineProvider.retro_engines
+                                            + EngineProvider.favorite_engines)
+    return DgtMenu(clockside='', disable_confirm=False, ponder_interval=0, user_voice='', comp_voice='',
+                   speed_voice=0, enable_capital_letters=False, disable_short_move=False, log_file='',
+                   engine_server=None, rol_disp_norm=False, volume_voice=0, board_type=EBoard.DGT,
+                   theme_type='dark', rspeed=1.0, rsound=True, rdisplay=False, rwindow=False, rol_disp_brain=False,
+                   show_enginename=False, picocoach=PicoCoach.COACH_OFF, picowatcher=False, picoexplorer=False,
+                   picocomment=PicoComment.COM_OFF, picocomment_prob=0, contlast=False, altmove=False,
+                   dgttranslate=DgtTranslate('none', 0, 'en', version))
+
+
+def bench_legal_fens(boards: List[chess.Board]) -> Case:
+    def run():
+        for board in boards:
+            compute_legal_fens(board)
+
+    return 'compute_legal_fens', len(boards), run
+
+
+def bench_compare_fen(boards: List[chess.Board]) -> Case:
+    fens = [board.board_fen() for board in boards]
+    pairs = list(zip(fens[1:], fens[:-1])) + list(zip(fens[:-1], fens[1:]))  # board ahead and behind
+
+    def run():
+        for external, internal in pairs:
+            compare_fen(external, internal)
+
+    return 'compare_fen', len(pairs), run
+
+
+def bench_translate() -> Case:
+    translate = DgtTranslate('none', 0, 'en', version)
+
+    def run():
+        for code, msg in TEXT_CODES:
+            translate.text(code, msg)
+
+    return 'DgtTranslate.text', len(TEXT_CODES), run
+
+
+def bench_menu() -> Case:
+    menu = create_menu()
+    top_menus = 8
+
+    def run():
+        menu.enter_top_menu()
+        for _ in range(top_menus):
+            menu.main_down()  # into the sub menu, through its entries and back
+            menu.main_right()
+            menu.main_right()
+            menu.main_left()
+            menu.main_up()
+            menu.main_right()
+
+    return 'DgtMenu navigation', 1 + top_menus * 6, run
+
+
+def bench_dispatcher(boards: List[chess.Board], moves: List[chess.Move]) -> Case:
+    dispatcher = Dispatcher(create_menu())
+    dispatcher.register('web')
+    dispatcher._process_message(Dgt.CLOCK_VERSION(main=2, sub=0, devs={'web'}), 'web')
+    translate = DgtTranslate('none', 0, 'en', version)
+    messages = []
+    for board, move in zip(boards, moves):  # maxtime 0, so no display timer gets started
+        messages.append(Dgt.DISPLAY_MOVE(move=move, fen=board.fen(), side=ClockSide.NONE, wait=False, maxtime=0,
+                                         beep=False, devs={'web'}, uci960=False, lang='en', capital=False,
+                                         long=False))
+        messages.append(translate.text('N00_score', len(messages)))
+
+    def run():
+        for message in messages:
+            dispatcher._process_message(message, 'web')
+
+    return 'Dispatcher._process_message', len(messages), run
+
+
+def bench_opening(boards: List[chess.Board], moves: List[chess.Move]) -> Case:
+    tutor = PicoTutor(i_engine_path='engines/x86_64/a-stock8')
+    states = []
+    played: List[str] = []
+    for board, move in zip(boards, moves):
+        played.append(board.san(move))
+        after = board.copy()
+        after.push(move)
+        states.append((after, list(played)))
+
+    def run():
+        for board, op in states:
+            tutor.board = board
+            tutor.op = op
+            tutor.last_inside_book_moveno = board.fullmove_number
+            tutor.get_opening()
+
+    return 'PicoTutor.get_opening', len(states), run
+
+
+def bench_eval_pv_list(boards: List[chess.Board]) -> Case:
+    handlers = []
+    for board in boards[::8]:  # a multipv result over all legal moves
+        pv = {}
+        score = {}
+        for number, move in enumerate(board.legal_moves, start=1):
+            pv[number] = [move]
+            if number % 13 == 0:
+                score[number] = chess.uci.Score(cp=None, mate=number % 5 - 2 or 1)
+            else:
+                score[number] = chess.uci.Score(cp=(number * 37) % 400 - 200, mate=None)
+        handlers.append(SimpleNamespace(info={'pv': pv, 'score': score}))
+
+    def run():
+        for handler in handlers:
+            PicoTutor._eval_pv_list(handler.info['pv'], handler, [])
+
+    return 'PicoTutor._eval_pv_list', len(handlers), run
+
+
+def bench_web_pgn(boards: List[chess.Board], moves: List[chess.Move]) -> Case:
+    web = WebDisplay({})
+    messages = [Message.USER_MOVE_DONE(move=move, fen=board.fen(), turn=board.turn, game=board.copy())
+                for board, move in zip(boards[1:], moves)]
+
+    def run():
+        for message in messages:
+            web.task(message)
+
+    return 'WebDisplay PGN export', len(messages), run
+
+
+def bench_debouncer(boards: List[chess.Board], moves: List[chess.Move]) -> Case:
+    debouncer = MoveDebouncer(1000, lambda fen: None)
+    scans = []
+    for board, move in zip(boards, moves):  # the piece lifted, then placed
+        lifted = board.copy()
+        lifted.remove_piece_at(move.from_square)
+        scans.append(lifted.board_fen())
+        after = board.copy()
+        after.push(move)
+        scans.append(after.board_fen())
+
+    def run():
+        debouncer.previous_fens = []
+        for fen in scans:
+            debouncer.update(fen)
+        debouncer.stop()
+
+    return 'MoveDebouncer.update', len(scans), run
+
+
+def bench_parsers() -> List[Case]:
+    cases: List[Case] = []
+    for name, parser, frame, frames, chunk_size in parser_cases():
+        data = chunks(frame * frames, chunk_size)
+
+        def run(parser=parser, data=data):
+            for chunk in data:
+                parser.parse(bytearray(chunk))
+
+        cases.append(('parser ' + name, frames, run))
+    return cases
+
+
+def all_cases() -> List[Case]:
+    boards, moves = game_boards()
+    return [bench_legal_fens(boards), bench_compare_fen(boards), bench_translate(), bench_menu(),
+            bench_dispatcher(boards, moves), bench_opening(boards, moves), bench_eval_pv_list(boards),
+            bench_web_pgn(boards, moves), bench_debouncer(boards, moves)] + bench_parsers()
+
+
+def machine_info() -> Dict[str, str]:
+    """Return what tells the machine apart, the Raspberry Pi model included."""
+    info = {'machine': platform.machine(), 'system': platform.platform(), 'python': platform.python_version(),
+            'picochess': version, 'date': datetime.datetime.now().isoformat(timespec='seconds')}
+    try:
+        with open('/proc/device-tree/model') as f:
+            info['model'] = f.read().rstrip('\0\n')
+    except OSError:
+        info['model'] = platform.processor()
+    return info
+
+
+def measure(cases: List[Case], only: Optional[str]) -> Dict[str, Dict[str, float]]:
+    results = {}
+    for name, operations, run in cases:
+        if only and only.lower() not in name.lower():
+            continue
+        timer = timeit.Timer(run)
+        number, _ = timer.autorange()  # runs taking at least 0.2 seconds
+        seconds = min(timer.repeat(number=number, repeat=REPEAT)) / number
+        results[name] = {'ops_per_s': operations / seconds, 'us_per_op': seconds / operations * 1e6}
+    return results
+
+
+def report(results: Dict[str, Dict[str, float]], baseline: Optional[dict]):
+    before = baseline['results'] if baseline else {}
+    header = '{:<30} {:>12} {:>10}'.format('benchmark', 'ops/s', 'us/op')
+    if baseline:
+        header += '  vs {} {}'.format(baseline['info'].get('model', ''), baseline['info'].get('picochess', ''))
+    print(header)
+    for name, result in results.items():
+        line = '{:<30} {:>12.0f} {:>10.2f}'.format(name, result['ops_per_s'], result['us_per_op'])
+        if name in before:
+            line += '  {:>+7.1f}%'.format((result['us_per_op'] / before[name]['us_per_op'] - 1) * 100)
+        print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--json', help='write the results to this file')
+    parser.add_argument('--compare', help='results file of an earlier run, the change of the time per op is shown')
+    parser.add_argument('--only', help='run only the benchmarks with this text in their name')
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.ERROR)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+    info = machine_info()
+    print('picochess {} on {} ({}), python {}'.format(
+        info['picochess'], info['model'] or info['machine'], info['machine'], info['python']))
+    results = measure(all_cases(), args.only)
+    report(results, baseline)
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'info': info, 'results': results}, f, indent=2)
+    os._exit(0)  # the scheduler thread of the debouncer doesnt stop
+
+
+if __name__ == '__main__':
+    main()
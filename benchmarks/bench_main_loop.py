@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Replay PGN games through the picochess main loop, without e-board and web server. Run it from the picochess folder.
+
+The user plays white: each of the user's moves is fired as Event.FEN (or as Event.KEYBOARD_FEN with --keyboard).
+The engine plays black. By default this is pgn_uci_engine.py, which answers with the moves of the games.
+With --engine a real engine plays instead, and a game ends as soon as the engine leaves it.
+
+For each user move, three times are measured from firing the position:
+- until USER_MOVE_DONE,
+- until COMPUTER_MOVE,
+- until the computer move is dispatched to the clock display.
+The p50/p95/p99 of these times are reported per move number.
+With --trace the spans of the last moves are written as Chrome trace, open it in chrome://tracing or Perfetto.
+"""
+
+import argparse
+import glob
+import logging
+import os
+import queue
+import shlex
+import sys
+import tempfile
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import chess  # type: ignore
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import picochess  # noqa: E402
+from benchmarks.bench_eboard_replay import percentile  # noqa: E402
+from benchmarks.pgn_uci_engine import read_games  # noqa: E402
+from dgt.api import Dgt, Event, Message  # noqa: E402
+from dgt.menu import DgtMenu  # noqa: E402
+from dispatcher import Dispatcher  # noqa: E402
+from tracing import tracer  # noqa: E402
+from utilities import DisplayDgt, DisplayMsg, Observable  # noqa: E402
+
+CORPUS = os.path.join('engines', 'pgn_engine', 'pgn_games', '*.pgn')
+STAGES = ('user', 'computer', 'display')
+
+Arrival = Tuple[float, Any]  # arrival time and the Message or Dgt command
+
+
+class MessageProbe(DisplayMsg, threading.Thread):
+
+    """Pass the messages of the main loop with their arrival time to the benchmark."""
+
+    def __init__(self, arrivals: 'queue.Queue[Arrival]'):
+        super(MessageProbe, self).__init__()
+        threading.Thread.__init__(self, name='bench_msg', daemon=True)
+        self.arrivals = arrivals
+
+    def run(self):
+        while True:
+            message = self.msg_queue.get()
+            self.arrivals.put((time.perf_counter(), message))
+
+
+class ClockProbe(DisplayDgt, threading.Thread):
+
+    """Pass the commands dispatched to the clock display with their arrival time to the benchmark."""
+
+    def __init__(self, arrivals: 'queue.Queue[Arrival]'):
+        super(ClockProbe, self).__init__()
+        threading.Thread.__init__(self, name='bench_dgt', daemon=True)
+        self.arrivals = arrivals
+
+    def run(self):
+        while True:
+            command = self.dgt_queue.get()
+            if isinstance(command, Dgt.DISPLAY_MOVE):
+                self.arrivals.put((time.perf_counter(), command))
+
+
+class ClockDispatcher(Dispatcher):
+
+    """A dispatcher with the web clock registered, so the display commands get dispatched without web server."""
+
+    def __init__(self, dgtmenu: DgtMenu):
+        super(ClockDispatcher, self).__init__(dgtmenu)
+        self.register('web')
+
+
+class Driver(object):
+
+    """Fire the user moves of the games and time the answers of the main loop."""
+
+    def __init__(self, arrivals: 'queue.Queue[Arrival]', keyboard: bool, timeout: float):
+        self.arrivals = arrivals
+        self.keyboard = keyboard
+        self.timeout = timeout
+        self.board = chess.Board()  # the position of picochess
+        self.latencies: Dict[int, Dict[str, List[float]]] = {}  # move number => stage => seconds
+
+    def fire_fen(self, fen: str) -> float:
+        self.drain()
+        start = time.perf_counter()
+        Observable.fire(Event.KEYBOARD_FEN(fen=fen) if self.keyboard else Event.FEN(fen=fen))
+        return start
+
+    def drain(self):
+        while True:
+            try:
+                self.arrivals.get_nowait()
+            except queue.Empty:
+                return
+
+    def wait_for(self, *kinds) -> Optional[Arrival]:
+        """Return the first arrival of one of kinds, None on timeout."""
+        deadline = time.perf_counter() + self.timeout
+        while True:
+            try:
+                arrival = self.arrivals.get(timeout=max(deadline - time.perf_counter(), 0))
+            except queue.Empty:
+                return None
+            if isinstance(arrival[1], kinds):
+                return arrival
+
+    def wait_ready(self) -> bool:
+        """Wait till the main loop takes events."""
+        Observable.fire(Event.EXIT_MENU())
+        return self.wait_for(Message.EXIT_MENU) is not None
+
+    def new_game(self) -> bool:
+        if self.board.board_fen() != chess.STARTING_BOARD_FEN:
+            # the start position would be taken as a takeback of the last game, so start the new game directly
+            self.drain()
+            Observable.fire(Event.NEW_GAME(pos960=518))
+            if self.wait_for(Message.START_NEW_GAME) is None:
+                return False
+        self.board = chess.Board()
+        return True
+
+    def user_move(self, move: chess.Move) -> Optional[chess.Move]:
+        """Play move for the user and return the computer move, None if the game is over or stuck."""
+        self.board.push(move)
+        start = self.fire_fen(self.board.board_fen())
+        times: Dict[str, float] = {}
+        computer_move = None
+        display_moves: List[Arrival] = []
+        while len(times) < len(STAGES):
+            arrival = self.wait_for(Message.USER_MOVE_DONE, Message.COMPUTER_MOVE, Message.GAME_ENDS,
+                                    Dgt.DISPLAY_MOVE)
+            if arrival is None:
+                return None
+            arrived, message = arrival
+            if isinstance(message, Message.USER_MOVE_DONE):
+                times['user'] = arrived - start
+            elif isinstance(message, Message.COMPUTER_MOVE):
+                times['computer'] = arrived - start
+                computer_move = message.move
+            elif isinstance(message, Dgt.DISPLAY_MOVE):
+                display_moves.append(arrival)
+            else:
+                return None
+            if computer_move is not None and 'display' not in times:
+                for arrived, command in display_moves:
+                    if command.move == computer_move:
+                        times['display'] = arrived - start
+        stages = self.latencies.setdefault(self.board.fullmove_number, {stage: [] for stage in STAGES})
+        for stage in STAGES:
+            stages[stage].append(times[stage])
+        return computer_move
+
+    def computer_move_done(self, move: chess.Move) -> bool:
+        self.board.push(move)
+        self.fire_fen(self.board.board_fen())
+        return self.wait_for(Message.COMPUTER_MOVE_DONE) is not None
+
+    def play(self, moves: List[chess.Move]) -> int:
+        """Play the white moves of a game, return the number of user moves played."""
+        if not self.new_game():
+            sys.exit('picochess did not start a new game')
+        played = 0
+        for ply in range(0, len(moves), 2):
+            computer_move = self.user_move(moves[ply])
+            if computer_move is None:
+                break
+            played += 1
+            if not self.computer_move_done(computer_move):
+                break
+            if ply + 1 >= len(moves) or computer_move != moves[ply + 1]:
+                break  # the engine left the game
+        return played
+
+    def report(self):
+        print('{:>4} {:>5}  {}'.format('move', 'count', '  '.join(
+            '{:<8} p50 / p95 / p99 ms'.format(stage) for stage in STAGES)))
+        for number in sorted(self.latencies):
+            stages = self.latencies[number]
+            print('{:>4} {:>5}  {}'.format(number, len(stages['user']), '  '.join(
+                '{:>11.1f} / {:>6.1f} / {:>6.1f}'.format(
+                    *(percentile(stages[stage], percent) * 1e3 for percent in (50, 95, 99)))
+                for stage in STAGES)))
+
+
+def engine_script(folder: str, pgn_files: List[str]) -> str:
+    """Write an executable starting pgn_uci_engine.py with the games, picochess can only start files."""
+    path = os.path.join(folder, 'pgn-replay')
+    engine = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'pgn_uci_engine.py')
+    with open(path, 'w') as f:
+        f.write('#!/bin/sh\nexec {} {} {}\n'.format(shlex.quote(sys.executable), shlex.quote(engine),
+                                                    ' '.join(shlex.quote(os.path.abspath(p)) for p in pgn_files)))
+    os.chmod(path, 0o755)
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('pgn', nargs='*', help='PGN files to replay, default ' + CORPUS)
+    parser.add_argument('--engine', help='UCI engine playing black instead of the moves of the games')
+    parser.add_argument('--time', default='60 0', help='picochess time control, default "60 0"')
+    parser.add_argument('--keyboard', action='store_true', help='fire Event.KEYBOARD_FEN instead of Event.FEN')
+    parser.add_argument('--repeat', type=int, default=1, help='number of times the games are replayed')
+    parser.add_argument('--timeout', type=float, default=30.0, help='seconds to wait for an answer of the main loop')
+    parser.add_argument('--trace', metavar='FILE', help='write the move lifecycle trace to this JSON file')
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.ERROR)
+    logging.getLogger('chess.pgn').setLevel(logging.CRITICAL)  # games not starting from the start position
+
+    pgn_files = args.pgn or sorted(glob.glob(CORPUS))
+    games = read_games(pgn_files)
+    folder = tempfile.mkdtemp()
+    engine = args.engine or engine_script(folder, pgn_files)
+
+    arrivals: 'queue.Queue[Arrival]' = queue.Queue()
+    MessageProbe(arrivals).start()
+    ClockProbe(arrivals).start()
+    picochess.Dispatcher = ClockDispatcher  # type: ignore
+    sys.argv = ['picochess.py', '--board-type', 'noeboard', '--engine', engine, '--book', 'books/a-nobook.bin',
+                '--time', args.time, '--location', 'Benchmark', '--pgn-file', 'benchmark.pgn']
+    threading.Thread(target=picochess.main, name='picochess', daemon=True).start()
+
+    driver = Driver(arrivals, args.keyboard, args.timeout)
+    if not driver.wait_ready():
+        sys.exit('picochess main loop not ready')
+    DisplayMsg.show(Message.DGT_CLOCK_VERSION(main=2, sub=0, dev='web', text=None))  # like the web server
+    begin = time.perf_counter()
+    played = 0
+    for _ in range(args.repeat):
+        for moves in games:
+            played += driver.play(moves)
+    print('{} user moves of {} games in {:.1f}s'.format(played, len(games) * args.repeat,
+                                                        time.perf_counter() - begin))
+    driver.report()
+    if args.trace:
+        tracer.dump(args.trace)
+        print('trace of {} events written to {}'.format(len(tracer.events), args.trace))
+    sys.stdout.flush()
+    os._exit(0)  # the picochess threads dont stop
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+"""
+A minimal UCI engine answering at once with the moves of PGN games, used by bench_main_loop.py.
+
+A position found in the games is answered with the move played there, any other one with its first legal move.
+"""
+
+import sys
+from typing import Dict, List, Tuple
+
+import chess  # type: ignore
+import chess.pgn  # type: ignore
+
+Key = Tuple[str, bool]
+
+
+def read_games(paths: List[str]) -> List[List[chess.Move]]:
+    """Return the mainline moves of all games in the PGN files."""
+    games = []
+    for path in paths:
+        with open(path) as f:
+            while True:
+                game = chess.pgn.read_game(f)
+                if game is None:
+                    break
+                if game.board().board_fen() == chess.STARTING_BOARD_FEN:
+                    games.append(list(game.main_line()))
+    return games
+
+
+def book_of(games: List[List[chess.Move]]) -> Dict[Key, chess.Move]:
+    """Return the first move played in each position of the games."""
+    book: Dict[Key, chess.Move] = {}
+    for moves in games:
+        board = chess.Board()
+        for move in moves:
+            book.setdefault((board.board_fen(), board.turn), move)
+            board.push(move)
+    return book
+
+
+def set_position(tokens: List[str]) -> chess.Board:
+    if 'moves' in tokens:
+        moves = tokens[tokens.index('moves') + 1:]
+        tokens = tokens[:tokens.index('moves')]
+    else:
+        moves = []
+    board = chess.Board(' '.join(tokens[1:])) if tokens[0] == 'fen' else chess.Board()
+    for uci in moves:
+        board.push_uci(uci)
+    return board
+
+
+def best_move(book: Dict[Key, chess.Move], board: chess.Board) -> str:
+    move = book.get((board.board_fen(), board.turn))
+    if move is None or move not in board.legal_moves:
+        move = next(iter(board.legal_moves), None)
+    return move.uci() if move else '(none)'
+
+
+def main():
+    book = book_of(read_games(sys.argv[1:]))
+    board = chess.Board()
+    searching = False  # a ponder or infinite search waits for stop or ponderhit
+
+    def send(line: str):
+        sys.stdout.write(line + '\n')
+        sys.stdout.flush()
+
+    for line in sys.stdin:
+        tokens = line.split()
+        if not tokens:
+            continue
+        command = tokens[0]
+        if command == 'uci':
+            send('id name PGN Replay')
+            send('id author picochess')
+            send('uciok')
+        elif command == 'isready':
+            send('readyok')
+        elif command == 'ucinewgame':
+            board = chess.Board()
+        elif command == 'position' and len(tokens) > 1:
+            board = set_position(tokens[1:])
+        elif command == 'go':
+            if 'ponder' in tokens or 'infinite' in tokens:
+                searching = True
+                continue
+            move = best_move(book, board)
+            send('info depth 1 score cp 0 pv ' + move)
+            send('bestmove ' + move)
+        elif command in ('stop', 'ponderhit') and searching:
+            searching = False
+            send('bestmove ' + best_move(book, board))
+        elif command == 'quit':
+            break
+
+
+if __name__ == '__main__':
+    main()
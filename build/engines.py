@@ -18,8 +18,15 @@
 # along with this program. If not, see <http://www.gnu.org/licenses/>.
 from uci.write import write_engine_ini
 
+import argparse
 import sys
 import os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir)))
 
-write_engine_ini()
+parser = argparse.ArgumentParser(description='write engines.ini for the engines of this machine')
+parser.add_argument('-w', '--workers', type=int, default=None, help='number of engines probed at the same time')
+parser.add_argument('-t', '--timeout', type=float, default=60.0, help='seconds to wait for the uci handshake of an engine')
+parser.add_argument('-f', '--full', action='store_true', help='probe all engines, not only the changed ones')
+args = parser.parse_args()
+
+write_engine_ini(workers=args.workers, timeout=args.timeout, incremental=not args.full)
@@ -20,6 +20,48 @@ class Configuration:
             default=None,
         )
         self.parser.add_argument("-el", "--engine-level", type=str, help="UCI engine level", default=None)
+        self.parser.add_argument(
+            "-esb",
+            "--engine-standby",
+            type=str,
+            help="keep an engine started in the background for fast engine switching: 'last' for the last used engine or a filename/path such as 'engines/aarch64/a-stockf'",
+            default=None,
+        )
+        self.parser.add_argument(
+            "-esm",
+            "--engine-standby-memory",
+            type=int,
+            help="maximum memory in MB the standby engine may use",
+            default=256,
+        )
+        self.parser.add_argument(
+            "-ebc",
+            "--engine-brain-candidates",
+            type=int,
+            help="number of predicted user moves the engine ponders on in turn in brain mode (1 = only the ponder move)",
+            default=1,
+        )
+        self.parser.add_argument(
+            "-ebs",
+            "--engine-brain-slice",
+            type=float,
+            help="seconds the engine ponders on each predicted user move in brain mode",
+            default=2.0,
+        )
+        self.parser.add_argument(
+            "-ecs",
+            "--eval-cache-size",
+            type=int,
+            help="number of positions whose engine and tutor evaluations are cached",
+            default=10000,
+        )
+        self.parser.add_argument(
+            "-ecf",
+            "--eval-cache-file",
+            type=str,
+            help="file to keep the cached evaluations in between restarts",
+            default=None,
+        )
         self.parser.add_argument(
             "-er",
             "--engine-remote",
@@ -31,7 +73,7 @@ class Configuration:
             "-ers",
             "--engine-remote-server",
             type=str,
-            help="address of the remote engine server",
+            help="address of the remote engine server (ssh), or tcp://host:port or unix:///path of an engine host",
             default=None,
         )
         self.parser.add_argument(
@@ -98,6 +140,12 @@ class Configuration:
             help="logging level",
         )
         self.parser.add_argument("-lf", "--log-file", type=str, help="log to the given file")
+        self.parser.add_argument(
+            "-pstart",
+            "--profile-startup",
+            action="store_true",
+            help="log the time of each startup stage and the import time of each module",
+        )
         self.parser.add_argument(
             "-pf", "--pgn-file", type=str, help="pgn file used to store the games", default="games.pgn"
         )
@@ -366,6 +414,27 @@ class Configuration:
             default="dgt",
             help='Type of e-board: "dgt", "certabo", "chesslink", "chessnut", "ichessone" or "noeboard" (for basic web-play only), default is "dgt"',
         )
+        self.parser.add_argument(
+            "-erec",
+            "--eboard-record",
+            type=str,
+            default=None,
+            help="folder to record the messages received from the e-board to, for reproducing board problems",
+        )
+        self.parser.add_argument(
+            "-erep",
+            "--eboard-replay",
+            type=str,
+            default=None,
+            help="replay an e-board recording instead of connecting to the board (not for dgt)",
+        )
+        self.parser.add_argument(
+            "-erepsp",
+            "--eboard-replay-speed",
+            type=float,
+            default=1.0,
+            help="speed factor of the e-board replay, 0 replays without delays, default is 1.0",
+        )
         self.parser.add_argument(
             "-theme",
             "--theme",
@@ -15,10 +15,9 @@
 # You should have received a copy of the GNU General Public License
 # along with this program. If not, see <http://www.gnu.org/licenses/>.
 
-import struct
 import logging
 import subprocess
-from threading import Timer, Lock
+from threading import Thread, Timer, Lock
 from fcntl import fcntl, F_GETFL, F_SETFL
 from os import O_NONBLOCK, read, path, listdir
 from serial import Serial, SerialException, STOPBITS_ONE, PARITY_NONE, EIGHTBITS  # type: ignore
@@ -26,8 +25,13 @@ import time
 from typing import List, Optional, Tuple
 
 from eboard.eboard import EBoard
+from eboard.recorder import board_recorder
 from dgt.util import DgtAck, DgtClk, DgtCmd, DgtMsg, ClockIcons, ClockSide, enum
 from dgt.api import Message, Dgt
+from dgt.command_queue import CommandQueue, is_clock_command
+from dgt.frame_parser import FrameParser
+from metrics import eboard_frames
+from tracing import tracer
 from utilities import RepeatedTimer, DisplayMsg, hms_time
 
 
@@ -96,7 +100,11 @@ class DgtBoard(EBoard):
 
         self.serial = None
         self.lock = Lock()  # lock the serial write
+        self.commands = CommandQueue()  # commands waiting for the serial write
+        self.writer_thread = Thread(target=self._write_commands_forever, daemon=True)
         self.incoming_board_thread = None
+        self.frame_parser = FrameParser()
+        self.recorder = board_recorder('dgt')
         self.lever_pos: Optional[int] = None
         # the next three are only used for "not dgtpi" mode
         self.clock_lock: float = 0.0  # serial connected clock is locked
@@ -151,17 +159,16 @@ class DgtBoard(EBoard):
         self.field_timer_running = True
 
     def write_command(self, message: list):
-        """Write the message list to the dgt board."""
+        """Queue the message list for the dgt board."""
         if not self.serial:
             return False
-        mes = message[3] if message[0].value == DgtCmd.DGT_CLOCK_MESSAGE.value else message[0]
-        if not mes == DgtCmd.DGT_RETURN_SERIALNR:
-            logger.debug('(ser) board put [%s] length: %i', mes, len(message))
-            if mes.value == DgtClk.DGT_CMD_CLOCK_ASCII.value:
-                logger.debug('sending text [%s] to (ser) clock', ''.join([chr(elem) for elem in message[4:12]]))
-            if mes.value == DgtClk.DGT_CMD_REV2_ASCII.value:
-                logger.debug('sending text [%s] to (rev) clock', ''.join([chr(elem) for elem in message[4:15]]))
+        data = self._encode_command(message)
+        if data is None:
+            return False
+        self.commands.put(message, data)
+        return True
 
+    def _encode_command(self, message: list) -> Optional[bytes]:
         array = []
         char_to_xl = {
             '0': 0x3f, '1': 0x06, '2': 0x5b, '3': 0x4f, '4': 0x66, '5': 0x6d, '6': 0x7d, '7': 0x07, '8': 0x7f,
@@ -181,17 +188,35 @@ class DgtBoard(EBoard):
                         array.append(char_to_xl[character.lower()])
             else:
                 logger.error('type not supported [%s]', type(item))
-                return False
+                return None
+        try:
+            return bytes(array)
+        except ValueError:
+            logger.error('invalid bytes sent %s', message)
+            return None
+
+    def _write_commands_forever(self):
+        while True:
+            self._send_commands(self.commands.get())
+
+    def _send_commands(self, commands: List[Tuple[list, bytes]], wait: bool = True):
+        """Write the commands with one serial write, with wait retry until the board is connected again."""
+        for message, _ in commands:
+            mes = message[3] if message[0].value == DgtCmd.DGT_CLOCK_MESSAGE.value else message[0]
+            if not mes == DgtCmd.DGT_RETURN_SERIALNR and logger.isEnabledFor(logging.DEBUG):
+                logger.debug('(ser) board put [%s] length: %i', mes, len(message))
+                if mes.value == DgtClk.DGT_CMD_CLOCK_ASCII.value:
+                    logger.debug('sending text [%s] to (ser) clock', ''.join([chr(elem) for elem in message[4:12]]))
+                if mes.value == DgtClk.DGT_CMD_REV2_ASCII.value:
+                    logger.debug('sending text [%s] to (rev) clock', ''.join([chr(elem) for elem in message[4:15]]))
+        only_serialnr = all(message[0] == DgtCmd.DGT_RETURN_SERIALNR for message, _ in commands)
 
         while True:
             if self.serial:
                 with self.lock:
                     try:
-                        self.serial.write(bytearray(array))
+                        self.serial.write(b''.join(data for _, data in commands))
                         break
-                    except ValueError:
-                        logger.error('invalid bytes sent %s', message)
-                        return False
                     except SerialException as write_expection:
                         logger.error(write_expection)
                         self.serial.close()
@@ -200,22 +225,36 @@ class DgtBoard(EBoard):
                         logger.error(write_expection)
                         self.serial.close()
                         self.serial = None
-            if mes == DgtCmd.DGT_RETURN_SERIALNR:
-                break
+            if only_serialnr or not wait:
+                return
             time.sleep(0.1)
 
-        if message[0] == DgtCmd.DGT_SET_LEDS:
-            logger.debug('(rev) leds turned %s', 'on' if message[2] else 'off')
-        if message[0] == DgtCmd.DGT_CLOCK_MESSAGE:
-            self.last_clock_command = message
-            if self.clock_lock:
-                logger.warning('(ser) clock is already locked. Maybe a "resend"?')
-            else:
-                logger.debug('(ser) clock is locked now')
-            self.clock_lock = time.time()
-        else:
-            time.sleep(0.1)  # give the board some time to process the command
-        return True
+        for message, _ in commands:
+            if message[0] == DgtCmd.DGT_SET_LEDS:
+                logger.debug('(rev) leds turned %s', 'on' if message[2] else 'off')
+            if message[0] == DgtCmd.DGT_CLOCK_MESSAGE:
+                self.last_clock_command = message
+                if self.clock_lock:
+                    logger.warning('(ser) clock is already locked. Maybe a "resend"?')
+                else:
+                    logger.debug('(ser) clock is locked now')
+                self.clock_lock = time.time()
+        if not is_clock_command(commands[0][0]):
+            time.sleep(0.1)  # give the board some time to process the commands, the clock is paced by its acks
+
+    def _resend_clock_command(self):
+        """Write the last clock command again, bypassing the waiting commands."""
+        if not self.serial:
+            return  # the reader thread reconnects, and the scheduler must not wait for it
+        data = self._encode_command(self.last_clock_command)
+        if data is not None:
+            self._send_commands([(self.last_clock_command, data)], wait=False)
+
+    def _unlock_clock(self):
+        if self.clock_lock:
+            logger.debug('(ser) clock unlocked after %.3f secs', time.time() - self.clock_lock)
+        self.clock_lock = 0.0
+        self.commands.acked()
 
     def _process_board_message(self, message_id: int, message: tuple, message_length: int):
         if False:  # switch-case
@@ -266,7 +305,7 @@ class DgtBoard(EBoard):
                     logger.warning('(ser) clock ACK error %s', (ack0, ack1, ack2, ack3))
                     if self.last_clock_command:
                         logger.debug('(ser) clock resending failed message [%s]', self.last_clock_command)
-                        self.write_command(self.last_clock_command)
+                        self._resend_clock_command()
                         self.last_clock_command = []  # only resend once
                     return
                 else:
@@ -372,9 +411,7 @@ class DgtBoard(EBoard):
                     self.l_time = l_time
             else:
                 logger.debug('(ser) clock null message ignored')
-            if self.clock_lock:
-                logger.debug('(ser) clock unlocked after %.3f secs', time.time() - self.clock_lock)
-                self.clock_lock = False
+            self._unlock_clock()
 
         elif message_id == DgtMsg.DGT_MSG_BOARD_DUMP:
             if message_length != 64:
@@ -384,10 +421,9 @@ class DgtBoard(EBoard):
                 0x07: 'p', 0x08: 'r', 0x09: 'n', 0x0a: 'b', 0x0b: 'k', 0x0c: 'q',
                 0x0d: '$', 0x0e: '%', 0x0f: '&', 0x00: '.'
             }
-            board = ''
-            for character in message:
-                board += piece_to_char[character & 0x0f]
-            logger.debug('\n' + '\n'.join(board[0 + i:8 + i] for i in range(0, len(board), 8)))  # Show debug board
+            if logger.isEnabledFor(logging.DEBUG):
+                board = ''.join(piece_to_char[character & 0x0f] for character in message)
+                logger.debug('\n' + '\n'.join(board[0 + i:8 + i] for i in range(0, len(board), 8)))  # Show debug board
             # Create fen from board
             fen = ''
             empty = 0
@@ -408,6 +444,7 @@ class DgtBoard(EBoard):
 
             # Attention! This fen is NOT flipped
             logger.debug('raw fen [%s]', fen)
+            tracer.instant('board fen', 'eboard', fen=fen)
             DisplayMsg.show(Message.DGT_FEN(fen=fen, raw=True))
 
         elif message_id == DgtMsg.DGT_MSG_FIELD_UPDATE:
@@ -438,91 +475,50 @@ class DgtBoard(EBoard):
         else:  # Default
             logger.warning('message not handled [%s]', DgtMsg(message_id))
 
-    def _read_serial(self, bytes_toread=1):
+    def _read_serial(self):
+        """Read all waiting bytes, wait up to the serial timeout if there are none."""
         try:
-            return self.serial.read(bytes_toread)
+            return self.serial.read(self.serial.in_waiting or 1)
         except SerialException:
             pass
-        except AttributeError:  # serial is None (race condition)
+        except (AttributeError, TypeError):  # serial is None (race condition)
             pass
         return b''
 
-    def _read_board_message(self, head: bytes):
-        message: Tuple = ()
-        header_len = 3
-        header = head + self._read_serial(header_len - 1)
-        try:
-            header = struct.unpack('>BBB', header)
-        except struct.error:
-            logger.warning('timeout in header reading')
-            return message
-        message_id = header[0]
-        message_length = counter = (header[1] << 7) + header[2] - header_len
-        if message_length <= 0 or message_length > 64:
-            if message_id == 0x8f and message_length == 0x1f00:  # @todo find out why this can happen
-                logger.warning('falsely DGT_SEND_EE_MOVES send before => receive and ignore EE_MOVES result')
-                self.watchdog_timer.stop()  # this serial read gonna take around 8secs
-                now = time.time()
-                while counter > 0:
-                    ee_moves = self._read_serial(counter)
-                    if self.serial:
-                        logger.debug('EE_MOVES 0x%x bytes read - inWaiting: 0x%x', len(ee_moves), self.serial.inWaiting())
-                    counter -= len(ee_moves)
-                    if time.time() - now > 15:
-                        logger.warning('EE_MOVES needed over 15secs => ignore not readed 0x%x bytes now', counter)
-                        break
-                self.watchdog_timer.start()
-            else:
-                logger.warning('illegal length in message header 0x%x length: %i', message_id, message_length)
-            return message
-
-        try:
-            if not message_id == DgtMsg.DGT_MSG_SERIALNR:
-                logger.debug('(ser) board get [%s] length: %i', DgtMsg(message_id), message_length)
-        except ValueError:
-            logger.warning('illegal id in message header 0x%x length: %i', message_id, message_length)
-            return message
-
-        while counter:
-            byte = self._read_serial()
-            try:
-                if byte:
-                    data: Tuple = struct.unpack('>B', byte)
-                    counter -= 1
-                    if data[0] & 0x80:
-                        logger.warning('illegal data in message 0x%x found', message_id)
-                        logger.warning('ignore collected message data %s', message)
-                        return self._read_board_message(byte)
-                    message += data
-                else:
-                    logger.warning('timeout in data reading')
-            except struct.error:
-                logger.warning('struct error => maybe a reconnected board?')
-
-        self._process_board_message(message_id, message, message_length)
-        return message
-
     def _process_incoming_board_forever(self):
         counter = 0
+        frames = eboard_frames('dgt')
         logger.info('incoming_board ready')
         while True:
-            byte = b''
+            data = b''
             if self.serial:
-                byte = self._read_serial()
+                data = self._read_serial()
             else:
                 self._setup_serial_port()
                 if self.serial:
                     logger.debug('sleeping for 0.5 secs. Afterwards startup the (ser) board')
                     time.sleep(0.5)
                     counter = 0
+                    self.frame_parser.reset()
                     self._startup_serial_board()
-            if byte and byte[0] & 0x80:
-                self._read_board_message(head=byte)
+                else:
+                    time.sleep(0.1)
+            if data:
+                if self.recorder is not None:
+                    self.recorder.record(data)
+                was_skipping = self.frame_parser.is_skipping()
+                for frame in self.frame_parser.feed(data):
+                    frames.inc()
+                    self._process_board_message(frame.message_id, frame.message, frame.message_length)
+                if self.frame_parser.is_skipping() != was_skipping:
+                    if was_skipping:
+                        self.watchdog_timer.start()
+                    else:
+                        self.watchdog_timer.stop()  # the EE_MOVES are coming in around 8secs
             else:
                 counter = (counter + 1) % 10
                 if counter == 0 and not self.watchdog_timer.is_running():
                     self._watchdog()  # issue 150 - check for alive connection, so write something to the board
-                time.sleep(0.1)
 
     def ask_battery_status(self):
         """Ask the BT board for the battery status."""
@@ -530,7 +526,7 @@ class DgtBoard(EBoard):
 
     def startup_serial_clock(self):
         """Ask the clock for its version."""
-        self.clock_lock = 0.0
+        self._unlock_clock()
         self.enable_ser_clock = False
         command = [DgtCmd.DGT_CLOCK_MESSAGE, 0x03, DgtClk.DGT_CMD_CLOCK_START_MESSAGE,
                    DgtClk.DGT_CMD_CLOCK_VERSION, DgtClk.DGT_CMD_CLOCK_END_MESSAGE]
@@ -546,7 +542,7 @@ class DgtBoard(EBoard):
                 logger.warning('(ser) clock is locked over 2secs')
                 logger.debug('resending locked (ser) clock message [%s]', self.last_clock_command)
                 self.clock_lock = 0.0
-                self.write_command(self.last_clock_command)
+                self._resend_clock_command()
         self.write_command([DgtCmd.DGT_RETURN_SERIALNR])  # ask for this AFTER cause of - maybe - old board hardware
 
     def _open_bluetooth(self):
@@ -755,23 +751,8 @@ class DgtBoard(EBoard):
         return False
 
     # dgtHw functions start
-    def _wait_for_clock(self, func: str):
-        has_to_wait = False
-        counter = 0
-        while self.clock_lock:
-            if not has_to_wait:
-                has_to_wait = True
-                logger.debug('(ser) clock is locked => waiting to serve: %s', func)
-            time.sleep(0.1)
-            counter = (counter + 1) % 30
-            if counter == 0:
-                logger.warning('(ser) clock is locked over 3secs')
-        if has_to_wait:
-            logger.debug('(ser) clock is released now')
-
     def set_text_rp(self, text: bytes, beep: int):
         """Display a text on a Pi enabled Rev2."""
-        self._wait_for_clock('SetTextRp()')
         res = self.write_command([DgtCmd.DGT_CLOCK_MESSAGE, 0x0f, DgtClk.DGT_CMD_CLOCK_START_MESSAGE,
                                   DgtClk.DGT_CMD_REV2_ASCII,
                                   text[0], text[1], text[2], text[3], text[4], text[5], text[6], text[7],
@@ -781,7 +762,6 @@ class DgtBoard(EBoard):
 
     def set_text_3k(self, text: bytes, beep: int):
         """Display a text on a 3000 Clock."""
-        self._wait_for_clock('SetText3K()')
         res = self.write_command([DgtCmd.DGT_CLOCK_MESSAGE, 0x0c, DgtClk.DGT_CMD_CLOCK_START_MESSAGE,
                                   DgtClk.DGT_CMD_CLOCK_ASCII,
                                   text[0], text[1], text[2], text[3], text[4], text[5], text[6], text[7], beep,
@@ -798,7 +778,6 @@ class DgtBoard(EBoard):
                 result = 0x02
             return result
 
-        self._wait_for_clock('SetTextXL()')
         icn = (_transfer(right_icons) & 0x07) | (_transfer(left_icons) << 3) & 0x38
         res = self.write_command([DgtCmd.DGT_CLOCK_MESSAGE, 0x0b, DgtClk.DGT_CMD_CLOCK_START_MESSAGE,
                                   DgtClk.DGT_CMD_CLOCK_DISPLAY,
@@ -808,7 +787,6 @@ class DgtBoard(EBoard):
 
     def set_and_run(self, lr: int, lh: int, lm: int, ls: int, rr: int, rh: int, rm: int, rs: int):
         """Set the clock with times and let it run."""
-        self._wait_for_clock('SetAndRun()')
         side = ClockSide.NONE
         if lr == 1 and rr == 0:
             side = ClockSide.LEFT
@@ -822,7 +800,6 @@ class DgtBoard(EBoard):
 
     def end_text(self):
         """Return the clock display to time display."""
-        self._wait_for_clock('EndText()')
         res = self.write_command([DgtCmd.DGT_CLOCK_MESSAGE, 0x03, DgtClk.DGT_CMD_CLOCK_START_MESSAGE,
                                   DgtClk.DGT_CMD_CLOCK_END,
                                   DgtClk.DGT_CMD_CLOCK_END_MESSAGE])
@@ -831,7 +808,6 @@ class DgtBoard(EBoard):
     def light_squares_on_revelation(self, uci_move: str):
         """Light the Rev2 leds."""
         if self.is_revelation and not self.disable_revelation_leds:
-            # self._wait_for_clock('LIGHTon')
             logger.debug('(rev) leds turned on - move: %s', uci_move)
             fr_s = (8 - int(uci_move[1])) * 8 + ord(uci_move[0]) - ord('a')
             to_s = (8 - int(uci_move[3])) * 8 + ord(uci_move[2]) - ord('a')
@@ -856,5 +832,7 @@ class DgtBoard(EBoard):
 
     def run(self):
         """NOT called from threading.Thread instead inside the __init__ function from hw.py."""
+        if not self.writer_thread.is_alive():
+            self.writer_thread.start()
         self.incoming_board_thread = Timer(0, self._process_incoming_board_forever)
         self.incoming_board_thread.start()
@@ -0,0 +1,129 @@
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+import logging
+import time
+from collections import deque
+from threading import Condition
+from typing import Deque, List, Tuple
+
+from dgt.util import DgtClk, DgtCmd, enum
+
+logger = logging.getLogger(__name__)
+
+CLOCK_ACK_TIMEOUT = 3.0  # stop waiting for a lost clock ack, the board watchdog resends after 2secs
+
+# clock commands showing a text, a newer text or time display makes a waiting one useless
+TEXT_COMMANDS = {DgtClk.DGT_CMD_CLOCK_DISPLAY.value, DgtClk.DGT_CMD_CLOCK_ASCII.value, DgtClk.DGT_CMD_REV2_ASCII.value}
+DISPLAY_COMMANDS = TEXT_COMMANDS | {DgtClk.DGT_CMD_CLOCK_END.value}
+
+Command = Tuple[list, bytes]  # the message list and its encoded bytes
+
+
+def _value(item) -> int:
+    return item.value if isinstance(item, enum.Enum) else item
+
+
+def is_clock_command(message: list) -> bool:
+    """Return if the message is meant for the clock."""
+    return _value(message[0]) == DgtCmd.DGT_CLOCK_MESSAGE.value
+
+
+def is_display_command(message: list) -> bool:
+    """Return if the message only changes what the clock displays."""
+    return is_clock_command(message) and _value(message[3]) in DISPLAY_COMMANDS
+
+
+def is_led_command(message: list) -> bool:
+    """Return if the message switches the Rev2 leds."""
+    return _value(message[0]) == DgtCmd.DGT_SET_LEDS.value
+
+
+class CommandQueue(object):
+
+    """Commands waiting to be written to one DGT board and its clock.
+
+    A clock command is only handed out after the clock acked the one before. Meanwhile a new
+    display command replaces the texts still waiting, so the clock jumps to the latest one.
+    Board commands don't wait for the clock, they are handed out together and led commands
+    undone by a newer one are dropped.
+    """
+
+    def __init__(self, ack_timeout: float = CLOCK_ACK_TIMEOUT):
+        super(CommandQueue, self).__init__()
+        self.ack_timeout = ack_timeout
+        self.board_commands: Deque[Command] = deque()
+        self.clock_commands: Deque[Command] = deque()
+        self.clock_sent = 0.0  # time the clock command still waiting for its ack was handed out
+        self.cond = Condition()
+
+    def put(self, message: list, data: bytes):
+        """Add a command, dropping the waiting ones it supersedes."""
+        with self.cond:
+            if is_clock_command(message):
+                if is_display_command(message):
+                    self._drop_texts()
+                self.clock_commands.append((message, data))
+            else:
+                if is_led_command(message):
+                    self._drop_leds(message)
+                self.board_commands.append((message, data))
+            self.cond.notify()
+
+    def _drop_texts(self):
+        """Drop the texts waiting after the last clock command which isnt a display one."""
+        kept: List[Command] = []
+        while self.clock_commands and is_display_command(self.clock_commands[-1][0]):
+            command = self.clock_commands.pop()
+            if _value(command[0][3]) in TEXT_COMMANDS:
+                logger.debug('(ser) clock message superseded %s', command[0])
+            else:
+                kept.append(command)  # the end after a set and run is needed for some clocks
+        self.clock_commands.extend(reversed(kept))
+
+    def _drop_leds(self, message: list):
+        """Drop the led commands undone by message, everything if it switches the leds off."""
+        switch_off = not _value(message[2])
+        for command in list(self.board_commands):
+            if is_led_command(command[0]) and (switch_off or command[0] == message):
+                logger.debug('(rev) leds command superseded %s', command[0])
+                self.board_commands.remove(command)
+
+    def get(self) -> List[Command]:
+        """Wait for the next commands to write.
+
+        These are either all waiting board commands or one clock command, if the clock acked the last one.
+        """
+        with self.cond:
+            while True:
+                if self.board_commands:
+                    commands = list(self.board_commands)
+                    self.board_commands.clear()
+                    return commands
+                timeout = None
+                if self.clock_commands:
+                    if self.clock_sent:
+                        timeout = self.clock_sent + self.ack_timeout - time.monotonic()
+                        if timeout <= 0:
+                            logger.warning('(ser) clock ack missing after %.1fsecs', self.ack_timeout)
+                            self.clock_sent = 0.0
+                    if not self.clock_sent:
+                        self.clock_sent = time.monotonic()
+                        return [self.clock_commands.popleft()]
+                self.cond.wait(timeout)
+
+    def acked(self):
+        """Let the next clock command pass."""
+        with self.cond:
+            self.clock_sent = 0.0
+            self.cond.notify()
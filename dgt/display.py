@@ -31,6 +31,7 @@ from dgt.api import Dgt, Event, Message
 from timecontrol import TimeControl
 from dgt.board import Rev2Info
 from dgt.translate import DgtTranslate
+from tracing import tracer
 
 
 logger = logging.getLogger(__name__)
@@ -1645,6 +1646,7 @@ class DgtDisplay(DisplayMsg, threading.Thread):
                 message = self.msg_queue.get()
                 if not isinstance(message, Message.DGT_SERIAL_NR):
                     logger.debug("received message from msg_queue: %s", message)
-                self._process_message(message)
+                with tracer.message_span(message, "dgt"):
+                    self._process_message(message)
             except queue.Empty:
                 pass
@@ -0,0 +1,116 @@
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+import logging
+from typing import List, NamedTuple, Tuple
+
+from dgt.util import DgtMsg
+
+logger = logging.getLogger(__name__)
+
+HEADER_LENGTH = 3
+MAX_MESSAGE_LENGTH = 64
+EE_MOVES_LENGTH = 0x1f00  # falsely requested DGT_SEND_EE_MOVES result, it gets ignored
+
+
+class Frame(NamedTuple):
+    """One message received from the DGT board."""
+
+    message_id: int
+    message: Tuple[int, ...]
+    message_length: int
+
+
+class FrameParser(object):
+
+    """Split the bytes read from a DGT board into messages.
+
+    The bytes are collected in one buffer, so a message can come in any number of reads.
+    A message starts with a byte having the high bit set, followed by two length bytes and
+    data bytes without the high bit. Bytes not fitting this are skipped till the next start.
+    """
+
+    def __init__(self):
+        super(FrameParser, self).__init__()
+        self.buffer = bytearray()
+        self.skip_counter = 0  # bytes of an EE_MOVES message still to ignore
+
+    def reset(self):
+        """Forget the bytes of an incomplete message, for example after a reconnect."""
+        self.buffer.clear()
+        self.skip_counter = 0
+
+    def is_skipping(self) -> bool:
+        """Return if an EE_MOVES message is being ignored."""
+        return self.skip_counter > 0
+
+    def feed(self, data: bytes) -> List[Frame]:
+        """Add the read bytes and return the messages completed by them."""
+        frames: List[Frame] = []
+        if self.skip_counter:
+            skipped = min(self.skip_counter, len(data))
+            self.skip_counter -= skipped
+            data = data[skipped:]
+            if not self.skip_counter:
+                logger.debug('EE_MOVES ignored')
+        self.buffer += data
+        with memoryview(self.buffer) as view:
+            pos = self._parse(view, frames)
+        del self.buffer[:pos]
+        return frames
+
+    def _parse(self, view: memoryview, frames: List[Frame]) -> int:
+        """Parse the frames in view, return the position of the first unused byte."""
+        pos = 0
+        end = len(view)
+        while pos < end:
+            if not view[pos] & 0x80:
+                pos += 1  # out of sync
+                continue
+            if end - pos < HEADER_LENGTH:
+                break
+            message_id = view[pos]
+            message_length = (view[pos + 1] << 7) + view[pos + 2] - HEADER_LENGTH
+            if message_length <= 0 or message_length > MAX_MESSAGE_LENGTH:
+                if message_id == DgtMsg.DGT_MSG_EE_MOVES.value and message_length == EE_MOVES_LENGTH:
+                    logger.warning('falsely DGT_SEND_EE_MOVES send before => receive and ignore EE_MOVES result')
+                    skipped = min(message_length, end - pos - HEADER_LENGTH)
+                    self.skip_counter = message_length - skipped
+                    pos += HEADER_LENGTH + skipped
+                    if self.skip_counter:
+                        return end
+                    continue
+                logger.warning('illegal length in message header 0x%x length: %i', message_id, message_length)
+                pos += 1
+                continue
+            try:
+                name = DgtMsg(message_id)
+            except ValueError:
+                logger.warning('illegal id in message header 0x%x length: %i', message_id, message_length)
+                pos += 1
+                continue
+            start = pos + HEADER_LENGTH
+            stop = start + message_length
+            illegal = next((index for index in range(start, min(stop, end)) if view[index] & 0x80), None)
+            if illegal is not None:
+                logger.warning('illegal data in message 0x%x found', message_id)
+                logger.warning('ignore collected message data %s', tuple(view[start:illegal]))
+                pos = illegal
+                continue
+            if stop > end:
+                break  # wait for the rest of the message
+            if name != DgtMsg.DGT_MSG_SERIALNR:
+                logger.debug('(ser) board get [%s] length: %i', name, message_length)
+            frames.append(Frame(message_id, tuple(view[start:stop]), message_length))
+            pos = stop
+        return pos
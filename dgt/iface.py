@@ -140,7 +140,8 @@ class DgtIface(DisplayDgt, Thread):
         if self.get_name() not in message.devs:
             return True
 
-        logger.debug('(%s) handle DgtApi: %s started', ','.join(message.devs), message)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug('(%s) handle DgtApi: %s started', ','.join(message.devs), message)
         self.case_res = True
 
         if False:  # switch-case
@@ -177,7 +178,8 @@ class DgtIface(DisplayDgt, Thread):
             self.promotion_done(message.uci_move)
         else:  # switch-default
             pass
-        logger.debug('(%s) handle DgtApi: %s ended', ','.join(message.devs), message)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug('(%s) handle DgtApi: %s ended', ','.join(message.devs), message)
         return self.case_res
 
     def _create_task(self, msg):
@@ -17,13 +17,14 @@
 
 import logging
 import queue
-from threading import Timer, Thread, Lock
+from threading import Thread, Lock
 from copy import deepcopy
 from typing import Dict, Set
 
-from utilities import DisplayDgt, DispatchDgt, dispatch_queue
+from utilities import DisplayDgt, DispatchDgt, ScheduledCall, dispatch_queue, scheduler
 from dgt.api import Dgt, DgtApi
 from dgt.menu import DgtMenu
+from tracing import tracer
 
 
 logger = logging.getLogger(__name__)
@@ -38,7 +39,7 @@ class Dispatcher(DispatchDgt, Thread):
 
         self.dgtmenu = dgtmenu
         self.devices: Set[str] = set()
-        self.maxtimer: Dict[str, Timer] = {}
+        self.maxtimer: Dict[str, ScheduledCall] = {}
         self.maxtimer_running: Dict[str, bool] = {}
         self.clock_connected: Dict[str, bool] = {}
         self.time_factor = 1  # This is for testing the duration - remove it lateron!
@@ -131,14 +132,15 @@ class Dispatcher(DispatchDgt, Thread):
                             logger.debug('(%s) inside update menu => board connect not displayed', dev)
                             return
                 if message.maxtime > 0.1:  # filter out "all the time" show and "eBoard error" messages
-                    self.maxtimer[dev] = Timer(message.maxtime * self.time_factor, self._stopped_maxtimer, [dev])
-                    self.maxtimer[dev].start()
+                    self.maxtimer[dev] = scheduler.schedule(message.maxtime * self.time_factor, self._stopped_maxtimer, dev)
                     logger.debug('(%s) showing %s for %.1f secs', dev, message, message.maxtime * self.time_factor)
                     self.maxtimer_running[dev] = True
             if repr(message) == DgtApi.CLOCK_START and self.dgtmenu.inside_updt_menu():
                 logger.debug('(%s) inside update menu => clock not started', dev)
                 return
             message.devs = {dev}  # on new system, we only have ONE device each message - force this!
+            if repr(message) == DgtApi.DISPLAY_MOVE:
+                tracer.instant('clock DISPLAY_MOVE', 'clock', dev=dev, move=message.move.uci())
             DisplayDgt.show(message)
         else:
             logger.debug('(%s) hash ignore DgtApi: %s', dev, message)
@@ -147,7 +149,6 @@ class Dispatcher(DispatchDgt, Thread):
         """Stop the maxtimer."""
         if self.maxtimer_running[dev]:
             self.maxtimer[dev].cancel()
-            self.maxtimer[dev].join()
             self.maxtimer_running[dev] = False
             self.dgtmenu.disable_picochess_displayed(dev)
 
@@ -158,7 +159,8 @@ class Dispatcher(DispatchDgt, Thread):
             # Check if we have something to display
             try:
                 msg = dispatch_queue.get()
-                logger.debug('received command from dispatch_queue: %s devs: %s', msg, ','.join(msg.devs))
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug('received command from dispatch_queue: %s devs: %s', msg, ','.join(msg.devs))
 
                 for dev in msg.devs & self.devices:
                     message = deepcopy(msg)
@@ -21,6 +21,8 @@ import queue
 import time
 import os
 
+from eboard.event_loop import ReconnectPolicy
+
 try:
     import bluepy  # type: ignore
     from bluepy.btle import Scanner, DefaultDelegate, Peripheral  # type: ignore
@@ -51,6 +53,7 @@ class Transport(object):
         self.worker_thread_active = False
         self.worker_threader = None
         self.conn_state = None
+        self.policy = ReconnectPolicy()
 
         self.bp_path = os.path.dirname(os.path.abspath(bluepy.__file__))
         self.bp_helper = os.path.join(self.bp_path, 'bluepy-helper')
@@ -251,17 +254,15 @@ class Transport(object):
                 wrque.task_done()
 
             try:
-                self._read(device, rx)
+                self._read(device, rx)  # blocks till a notification arrives or 0.05s passed
             except Exception as e:
                 logger.warning(f'Bluetooth read error {e}')
                 bt_error = True
                 self._agent_state(que, 'offline', 'BLE connection lost')
-                continue
-            time.sleep(0.01)
         device.disconnect()
 
     def _try_connect(self, device, address, rx, tx, que, rep_err, time_last_out):
-        time.sleep(1)
+        time.sleep(self.policy.next_delay())
         bt_error = False
         self.init = False
         try:
@@ -277,6 +278,7 @@ class Transport(object):
 
     def _on_connect(self, device, address, rx, tx, que, time_last_out):
         logger.info(f'Bluetooth reconnected to {address}')
+        self.policy.reset()
         rx, tx = self._device_open(address, device, que)
         time_last_out = time.time() + 0.2
         self.init = True
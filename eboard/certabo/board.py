@@ -18,6 +18,7 @@ import queue
 
 from eboard.eboard import EBoard
 from utilities import DisplayMsg
+from tracing import tracer
 from dgt.api import Message, Dgt
 from dgt.util import ClockIcons
 
@@ -87,6 +88,7 @@ class CertaboBoard(EBoard):
                         DisplayMsg.show(Message.DGT_NO_EBOARD_ERROR(text=text))
                     elif 'cmd' in result and result['cmd'] == 'raw_board_position' and 'fen' in result:
                         fen = result['fen'].split(' ')[0]
+                        tracer.instant('board fen', 'eboard', fen=fen)
                         DisplayMsg.show(Message.DGT_FEN(fen=fen, raw=True))
                     elif 'cmd' in result and result['cmd'] == 'request_promotion_dialog' and 'move' in result:
                         DisplayMsg.show(Message.PROMOTION_DIALOG(move=result['move']))
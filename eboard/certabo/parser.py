@@ -13,10 +13,11 @@
 
 from typing import Dict, List, Optional
 import binascii
-import re
 from collections import Counter
 
 from eboard.eboard import to_short_fen, check_reversed
+from eboard.frame_extractor import FrameExtractor, FrameSpec
+from metrics import eboard_frames
 
 
 class CertaboPiece(object):
@@ -97,66 +98,71 @@ def to_square(i: int):
     return row * 8 + col
 
 
+LINE = FrameSpec('line', b'', terminator=b'\r\n')  # a board starts after a ':', led acks are 'L' or 'D'
+
+
 class Parser(object):
 
-    def __init__(self, callback: BoardTranslator):
+    def __init__(self, callback: BoardTranslator, skip_unchanged=False):
+        """
+        :param callback: translator for the received boards
+        :param skip_unchanged: only pass on boards with piece ids that differ from the last one
+        """
         self.callback = callback
-        self.buffer = bytearray()
-        self.last_board: List = []
+        self.extractor = FrameExtractor([LINE])
+        self.frames = eboard_frames('certabo')
+        self.last_frame = b''
         self.reversed = False
         self.piece_recognition = False
+        self.skip_unchanged = skip_unchanged
 
     def parse(self, msg: bytearray):
-        # copy any previous buffer to the front
-        data = self.buffer + msg
-        self.buffer = bytearray()
-
-        if len(data) > 15:
-            input_str = data.decode(encoding='UTF-8', errors='ignore')
-            if '\r\n' not in input_str:
-                self._add_to_buffer(data)
-            else:
-                split_data = input_str.split(':')
-                for index, part in enumerate(split_data):
-                    if len(part) > 0 and not self._parse(part) and index == len(split_data) - 1:
-                        position = len(data) - len(part) - 1
-                        if position >= 0:
-                            self._add_to_buffer(data[position:])
-                        break
-        else:
-            self.buffer = data
-
-    def _add_to_buffer(self, arr):
-        self.buffer += arr
-
-    def _parse(self, part: str):
-        if 'L' in part:
+        self.extractor.extract(msg, self._parse_frame)
+        if b'\r\n' in msg:
+            # a board which got all its numbers is taken, even if its line end is still missing
+            tail = self.extractor.pending()
+            if b':' in tail and self._parse_line(tail):
+                self.extractor.clear()
+
+    def forget_last_board(self):
+        """Pass on the next board, even if it is unchanged."""
+        self.last_frame = b''
+
+    def _parse_frame(self, _: FrameSpec, frame: memoryview) -> bool:
+        self._parse_line(frame.tobytes())
+        return True
+
+    def _parse_line(self, line: bytes) -> bool:
+        self.frames.inc()
+        if b'L' in line:
             self.callback.leds_detected(False)
-        if 'D' in part:
+        if b'D' in line:
             self.callback.leds_detected(True)
-        split_input = re.sub('[\r\nLD*]', '', part).split()
+        data = line[line.rfind(b':') + 1:].translate(None, b'\r\nLD*')  # a board cut off by the next is dropped
+        if not data:
+            return False
+        if data == self.last_frame:
+            return True
+        split_input = data.split()
         if not self.piece_recognition and len(split_input) > 8:
             self.piece_recognition = True
             self.callback.has_piece_recognition(True)
         if self.piece_recognition:
-            return self._parse_with_piece_info(split_input)
+            parsed = self._parse_with_piece_info(split_input)
         else:
-            return self._parse_without_piece_info(split_input)
+            parsed = self._parse_without_piece_info(split_input)
+        if parsed and (self.skip_unchanged or not self.piece_recognition):
+            self.last_frame = data  # occupied squares are never needed twice
+        return parsed
 
     def _parse_with_piece_info(self, split_input):
         if len(split_input) >= 320:
-            board = []
-            for square in range(64):
-                piece_id = bytearray(5)
-                for i in range(5):
-                    try:
-                        piece_id[i] = int(split_input[square * 5 + i])
-                    except ValueError:
-                        return False
-                piece = CertaboPiece(piece_id)
-                board.append(piece)
+            try:
+                piece_ids = bytearray(int(value) for value in split_input[:320])
+            except ValueError:
+                return False
+            board = [CertaboPiece(piece_ids[square * 5:square * 5 + 5]) for square in range(64)]
             self.callback.translate(board)
-            self.buffer = bytearray()
             return True
         else:
             return False
@@ -175,7 +181,6 @@ class Parser(object):
                 except ValueError:
                     return False
             self.callback.translate_occupied_squares(board)
-            self.buffer = bytearray()
             return True
         else:
             return False
@@ -190,10 +195,11 @@ class CertaboBoardMessageParser(BoardTranslator):
         self.low_gain_chips = low_gain
         self.reversed = False
         self.stones: Dict = {}
-        self.parser = Parser(self)
+        self.parser = Parser(self, skip_unchanged=not low_gain)  # low gain chips need every board
 
     def update_stones(self, stones: Dict[CertaboPiece, Optional[str]]):
         self.stones = stones
+        self.parser.forget_last_board()
 
     def parse(self, msg: bytearray):
         self.parser.parse(msg)
@@ -17,12 +17,12 @@ from typing import List
 
 import json
 import logging
-import queue
 import time
 import threading
 import typing
 
 from eboard.move_debouncer import MoveDebouncer
+from eboard.recorder import ReplayTransport, replay_transport, transport_queue
 from eboard.certabo import command
 from eboard.certabo.parser import CalibrationCallback, CertaboCalibrator, CertaboPiece, \
     CertaboBoardMessageParser, ParserCallback
@@ -56,7 +56,7 @@ class Protocol(ParserCallback, CalibrationCallback):
         self.error_condition = False
         self.appque = appque
         self.board_mutex = threading.Lock()
-        self.trque = queue.Queue()
+        self.trque = transport_queue('certabo')
         self.trans = None
         self.led_control = None
         self.connected = False
@@ -75,10 +75,15 @@ class Protocol(ParserCallback, CalibrationCallback):
         self.event_thread.start()
 
         self.config = None
-        try:
-            self._read_config()
-        except Exception as e:
-            logger.debug(f'No valid default configuration, starting board-scan: {e}')
+        self.trans = replay_transport(self.trque)
+        if self.trans is not None:
+            self.config = {'address': self.trans.path}
+            self.device_in_config = True
+        else:
+            try:
+                self._read_config()
+            except Exception as e:
+                logger.debug(f'No valid default configuration, starting board-scan: {e}')
 
         self.parser = CertaboBoardMessageParser(self, self.low_gain)
 
@@ -97,6 +102,9 @@ class Protocol(ParserCallback, CalibrationCallback):
 
             if not self.error_condition:
                 break
+            if isinstance(self.trans, ReplayTransport):
+                logger.error('Replay failed, no scan for a real board.')
+                break
             self.device_in_config = False
             time.sleep(3)
 
@@ -148,6 +156,7 @@ class Protocol(ParserCallback, CalibrationCallback):
         if self.trans is not None:
             self.trans.quit()
         self.thread_active = False
+        self.trque.put(b'')  # wake up the event worker
 
     def position_initialized(self):
         """
@@ -163,6 +172,8 @@ class Protocol(ParserCallback, CalibrationCallback):
         return False
 
     def write_configuration(self):
+        if isinstance(self.trans, ReplayTransport):
+            return False  # a replay must not replace the configuration of the real board
         try:
             with open('certabo_config.json', 'w') as f:
                 json.dump(self.config, f, indent=4)
@@ -177,8 +188,8 @@ class Protocol(ParserCallback, CalibrationCallback):
         """
         logger.debug('Certabo worker thread started.')
         while self.thread_active:
-            if not self.trque.empty():
-                msg = self.trque.get()
+            msg = self.trque.get()
+            if msg:
                 token = 'agent-state: '
                 if msg[:len(token)] == token:
                     toks = msg[len(token):]
@@ -201,8 +212,6 @@ class Protocol(ParserCallback, CalibrationCallback):
                     self.calibrator.calibrate(msg)
                 else:
                     self.parser.parse(msg)
-            else:
-                time.sleep(0.01)
 
     def has_piece_recognition(self, piece_recognition: bool):
         self.piece_recognition = True
@@ -41,9 +41,10 @@
 Certabo transport implementation for USB connections.
 """
 import logging
-import threading
 import queue
-import time
+from typing import Optional
+
+from eboard.event_loop import SerialStream
 
 try:
     import serial  # type: ignore
@@ -62,7 +63,7 @@ class Transport(object):
     """
     Certabo transport implementation for USB connections.
 
-    This transport uses an asynchronous background thread for hardware communication.
+    This transport reads the board on the shared e-board event loop.
     All replies are written to the python queue `que` given during initialization.
     """
 
@@ -78,14 +79,13 @@ class Transport(object):
         self.init = True
         logger.debug('USB init ok')
         self.last_agent_state = None
-        self.error_state = False
-        self.thread_active = False
-        self.event_thread = None
+        self.stream: Optional[SerialStream] = None
         self.usb_dev = None
         self.uport = None
 
     def quit(self):
-        self.thread_active = False
+        if self.stream is not None:
+            self.stream.stop()
 
     def search_board(self):
         """
@@ -170,12 +170,13 @@ class Transport(object):
 
         :param msg: Message string
         """
+        if self.stream is None:
+            return
         try:
-            self.usb_dev.write(msg)
-            self.usb_dev.flush()
+            self.stream.device.write(msg)
+            self.stream.device.flush()
         except Exception as e:
-            logger.error(f'Failed to write {msg}: {e}')
-            self.error_state = True
+            self.stream.error(f'Failed to write {msg}: {e}')
 
     def usb_read(self):
         """
@@ -200,58 +201,20 @@ class Transport(object):
         """
         self.uport = port
         try:
-            self.usb_dev = serial.Serial(port, 38400, timeout=0.1)
-            self.usb_dev.dtr = 0
+            device = self._open_port(port)
         except Exception as e:
             emsg = f'USB cannot open port {port}, {e}'
             logger.error(emsg)
             self.agent_state(self.que, 'offline', emsg)
             return False
         logger.debug(f'USB port {port} open')
-        self.thread_active = True
-        self.event_thread = threading.Thread(target=self.event_worker_thread, args=(self.que,))
-        self.event_thread.setDaemon(True)
-        self.event_thread.start()
+        self.stream = SerialStream(port, self._open_port, self.que.put,
+                                   lambda state, msg: self.agent_state(self.que, state, msg))
+        self.stream.start(device)
         return True
 
-    def event_worker_thread(self, que):
-        """
-        Background thread that sends data received via usb to the queue `que`.
-        """
-        logger.debug('USB worker thread started.')
-        self.agent_state(self.que, 'online', f'Connected to {self.uport}')
-        self.error_state = False
-        posted = False
-        while self.thread_active:
-            while self.error_state is True:
-                time.sleep(1.0)
-                try:
-                    self.usb_dev.close()
-                except Exception as e:
-                    logger.debug(f'Failed to close usb: {e}')
-                try:
-                    self.usb_dev = serial.Serial(
-                        self.uport, 38400, timeout=0.1)
-                    self.usb_dev.dtr = 0
-                    self.agent_state(self.que, 'online', f'Reconnected to {self.uport}')
-                    self.error_state = False
-                    posted = False
-                    break
-                except Exception as e:
-                    if posted is False:
-                        emsg = f'Failed to reconnect to {self.uport}, {e}'
-                        logger.warning(emsg)
-                        self.agent_state(self.que, 'offline', emsg)
-                        posted = True
-
-            self._usb_read(que)
-
-    def _usb_read(self, que):
-        try:
-            by = self.usb_dev.read(1024)
-            if len(by) > 0:
-                que.put(by)
-        except (OSError, serial.SerialException, TypeError) as e:
-            logger.error(f"Error reading from serial port, {e}")
-            time.sleep(0.1)
-            self.error_state = True
+    @staticmethod
+    def _open_port(port):
+        usb_dev = serial.Serial(port, 38400, timeout=0)
+        usb_dev.dtr = 0
+        return usb_dev
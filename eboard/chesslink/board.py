@@ -18,6 +18,7 @@ import queue
 
 from eboard.eboard import EBoard
 from utilities import DisplayMsg
+from tracing import tracer
 from dgt.api import Message, Dgt
 from dgt.util import ClockIcons
 
@@ -73,21 +74,17 @@ class ChessLinkBoard(EBoard):
             logger.info('incoming_board ready')
 
         while True:
-            if self.agent is not None:
-                try:
-                    result = self.appque.get(block=False)
-                    if 'cmd' in result and result['cmd'] == 'agent_state' and 'state' in result and 'message' in result:
-                        if result['state'] == 'offline':
-                            text = self._display_text(result['message'], result['message'], 'no/', bwait)
-                        else:
-                            text = Dgt.DISPLAY_TIME(force=True, wait=True, devs={'ser', 'i2c', 'web'})
-                        DisplayMsg.show(Message.DGT_NO_EBOARD_ERROR(text=text))
-                    elif 'cmd' in result and result['cmd'] == 'raw_board_position' and 'fen' in result:
-                        fen = result['fen'].split(' ')[0]
-                        DisplayMsg.show(Message.DGT_FEN(fen=fen, raw=True))
-                except queue.Empty:
-                    pass
-            time.sleep(0.1)
+            result = self.appque.get()
+            if 'cmd' in result and result['cmd'] == 'agent_state' and 'state' in result and 'message' in result:
+                if result['state'] == 'offline':
+                    text = self._display_text(result['message'], result['message'], 'no/', bwait)
+                else:
+                    text = Dgt.DISPLAY_TIME(force=True, wait=True, devs={'ser', 'i2c', 'web'})
+                DisplayMsg.show(Message.DGT_NO_EBOARD_ERROR(text=text))
+            elif 'cmd' in result and result['cmd'] == 'raw_board_position' and 'fen' in result:
+                fen = result['fen'].split(' ')[0]
+                tracer.instant('board fen', 'eboard', fen=fen)
+                DisplayMsg.show(Message.DGT_FEN(fen=fen, raw=True))
 
     def _connect(self):
         logger.info('connecting to board')
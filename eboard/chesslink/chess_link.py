@@ -36,13 +36,14 @@ import time
 import logging
 import sys
 import threading
-import queue
 import json
 import importlib
-import copy
+import re
 
 import eboard.chesslink.chess_link_protocol as clp
 import eboard.chesslink.chess_link_bluepy as tri
+from eboard.recorder import ReplayTransport, replay_transport, transport_queue
+from metrics import eboard_frames
 
 
 # See document:
@@ -51,6 +52,59 @@ import eboard.chesslink.chess_link_bluepy as tri
 
 logger = logging.getLogger(__name__)
 
+FIGURES = b'PNBRQK.pnbrqk'
+# board chars => signed `position` values as bytes, read them through a memoryview cast to 'b'
+FIGURE_VALUES = bytes.maketrans(FIGURES, bytes(f % 256 for f in [1, 2, 3, 4, 5, 6, 0, -1, -2, -3, -4, -5, -6]))
+EMPTY_RUN = re.compile(r'\.+')
+START_FEN = 'rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR'
+START_FEN_CABLE_LEFT = 'RNBKQBNR/PPPPPPPP/8/8/8/8/pppppppp/rnbkqbnr'
+
+
+def raw_to_flat(raw, orientation=True):
+    """
+    Convert the 64 chars of a Chess Link 's' reply to a flat 64 byte position in fen order (a8..h1).
+
+    :returns: flat position or None if raw contains invalid chars.
+    """
+    flat = raw.encode('ascii', errors='replace')
+    invalid = flat.translate(None, FIGURES)
+    if invalid:
+        logger.warning(f'Invalid char in raw position: {invalid}')
+        return None
+    return flat[::-1] if orientation is True else flat
+
+
+def flat_to_short_fen(flat):
+    """
+    Convert a flat 64 byte position (a8..h1) to the position part of a fen.
+    """
+    rows = flat.decode('ascii')
+    return '/'.join(EMPTY_RUN.sub(lambda run: str(len(run.group())), rows[i:i + 8]) for i in range(0, 64, 8))
+
+
+def flat_to_position(flat):
+    """
+    Convert a flat 64 byte position (a8..h1) to an 8x8 `position` array.
+    """
+    values = memoryview(flat.translate(FIGURE_VALUES)).cast('b')
+    return [values[(7 - y) * 8:(8 - y) * 8].tolist() for y in range(8)]
+
+
+def castling_rights(flat):
+    """
+    Return the rudimentary castling part of the fen for a flat position, see `position_to_fen()`.
+    """
+    castle = ''
+    if flat[60:61] == b'K' and flat[63:64] == b'R':
+        castle += 'K'
+    if flat[60:61] == b'K' and flat[56:57] == b'R':
+        castle += 'Q'
+    if flat[4:5] == b'k' and flat[7:8] == b'r':
+        castle += 'k'
+    if flat[4:5] == b'k' and flat[0:1] == b'r':
+        castle += 'q'
+    return castle or '-'
+
 
 class ChessLink:
     """
@@ -129,7 +183,7 @@ class ChessLink:
         self.board_mutex = threading.Lock()
         self.is_new_game = False
         self.trans = None
-        self.trque = queue.Queue()  # asyncio.Queue()
+        self.trque = transport_queue('chesslink')
         self.mill_config = None
         self.connected = False
         self.position = None
@@ -145,10 +199,15 @@ class ChessLink:
         self.event_thread.start()
 
         self.mill_config = None
-        try:
-            self._read_config()
-        except Exception as e:
-            logger.debug(f'No valid default configuration, starting board-scan: {e}')
+        self.trans = replay_transport(self.trque)
+        if self.trans is not None:
+            self.mill_config = {'transport': self.trans.get_name(), 'address': self.trans.path}
+            self.found_board = True
+        else:
+            try:
+                self._read_config()
+            except Exception as e:
+                logger.debug(f'No valid default configuration, starting board-scan: {e}')
         # These repetitions are caused by monolithic arch of bluepy single-threads.
         reps = 0
         # Should be replaced by async refactor at some point.
@@ -169,6 +228,9 @@ class ChessLink:
 
             if self.error_condition is False:
                 break
+            if isinstance(self.trans, ReplayTransport):
+                logger.error('Replay failed, no scan for a real board.')
+                break
             reps += 1
             self.found_board = False
             time.sleep(3)
@@ -245,6 +307,7 @@ class ChessLink:
         if self.trans is not None:
             self.trans.quit()
         self.thread_active = False
+        self.trque.put('')  # wake up the event worker
 
     def position_initialized(self):
         """
@@ -267,6 +330,8 @@ class ChessLink:
 
         :return: True on success, False on error
         """
+        if isinstance(self.trans, ReplayTransport):
+            return False  # a replay must not replace the configuration of the real board
         if 'transport' in self.mill_config:
             self.mill_config['orientation'] = self.orientation
         if 'btle_iface' not in self.mill_config:
@@ -290,130 +355,99 @@ class ChessLink:
         The event worker thread is automatically started during __init__.
         """
         logger.debug('Chess Link worker thread started.')
+        frames = eboard_frames('chesslink')
         while self.thread_active:
-            if self.trque.empty() is False:
-                msg = self.trque.get()
-                token = 'agent-state: '
-                if msg[:len(token)] == token:
-                    toks = msg[len(token):]
-                    i = toks.find(' ')
-                    if i != -1:
-                        state = toks[:i]
-                        emsg = toks[i + 1:]
-                    else:
-                        state = toks
-                        emsg = ''
-                    logger.info(f'Agent state of {self.name} changed to {state}, {emsg}')
-                    if state == 'offline':
-                        self.error_condition = True
+            msg = que.get()
+            token = 'agent-state: '
+            if msg[:len(token)] == token:
+                toks = msg[len(token):]
+                i = toks.find(' ')
+                if i != -1:
+                    state = toks[:i]
+                    emsg = toks[i + 1:]
+                else:
+                    state = toks
+                    emsg = ''
+                logger.info(f'Agent state of {self.name} changed to {state}, {emsg}')
+                if state == 'offline':
+                    self.error_condition = True
+                else:
+                    self.error_condition = False
+                self.appque.put({'cmd': 'agent_state', 'state': state, 'message': emsg,
+                                 'version': f'{self.version} ChessLink: {self.board_version}',
+                                 'class': 'board', 'actor': self.name})
+                continue
+
+            if len(msg) > 0:
+                frames.inc()
+                if msg[0] == 's':
+                    if len(msg) == 67:
+                        flat = raw_to_flat(msg[1:65], self.orientation)
                     else:
-                        self.error_condition = False
-                    self.appque.put({'cmd': 'agent_state', 'state': state, 'message': emsg,
-                                     'version': f'{self.version} ChessLink: {self.board_version}',
-                                     'class': 'board', 'actor': self.name})
-                    continue
-
-                if len(msg) > 0:
-                    if msg[0] == 's':
-                        if len(msg) == 67:
-                            rp = msg[1:65]
-                            val_pos = True
-                            position = [
-                                [0 for x in range(8)] for y in range(8)]
-                            if len(rp) == 64:
-                                for y in range(8):
-                                    for x in range(8):
-                                        c = rp[7 - x + y * 8]
-                                        i = self.figrep['ascii'].find(c)
-                                        if i == -1:
-                                            logger.warning(f'Invalid char in raw position: {c}')
-                                            val_pos = False
-                                            continue
-                                        else:
-                                            f = self.figrep['int'][i]
-                                            if self.orientation is True:
-                                                position[y][x] = f
-                                            else:
-                                                position[7 - y][7 - x] = f
-                            else:
-                                val_pos = False
-                                logger.warning(f'Error in board position, received {len(rp)}')
-                                continue
-                        else:
-                            val_pos = False
-                            logger.error(f'Incomplete board position, {msg}')
-                        if val_pos is True:
-                            fen = self.position_to_fen(position)
-                            sfen = self.short_fen(fen)
-                            if sfen == "RNBKQBNR/PPPPPPPP/8/8/8/8/pppppppp/rnbkqbnr":
-                                if self.orientation is True:
-                                    logger.debug('Cable-left board detected.')
-                                    self.orientation = False
-                                    self.write_configuration()
-                                    position_inv = copy.deepcopy(position)
-                                    for x in range(8):
-                                        for y in range(8):
-                                            position[x][y] = position_inv[7 - x][7 - y]
-                                else:
-                                    logger.debug('Cable-right board detected.')
-                                    self.orientation = True
-                                    self.write_configuration()
-                                    position_inv = copy.deepcopy(position)
-                                    for x in range(8):
-                                        for y in range(8):
-                                            position[x][y] = position_inv[7 - x][7 - y]
-                            fen = self.position_to_fen(position)
-                            sfen = self.short_fen(fen)
-
-                            if sfen == 'rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR':
-                                if self.is_new_game is False:
-                                    self.is_new_game = True  # XXX changed on cleanup
-                                    cmd = {'cmd': 'new_game', 'actor': self.name,
-                                           'orientation': self.orientation}  # XXX: orientation?!
-                                    self.new_game(position)
-                                    self.appque.put(cmd)
+                        flat = None
+                        logger.error(f'Incomplete board position, {msg}')
+                    if flat is not None:
+                        sfen = flat_to_short_fen(flat)
+                        if sfen == START_FEN_CABLE_LEFT:
+                            if self.orientation is True:
+                                logger.debug('Cable-left board detected.')
+                                self.orientation = False
                             else:
-                                self.is_new_game = False
-
-                            with mutex:
-                                self.position = copy.deepcopy(position)
-                                if self.reference_position is None:
-                                    self.reference_position = copy.deepcopy(position)
-                            self.appque.put(
-                                {'cmd': 'raw_board_position', 'fen': fen, 'actor': self.name})
-                            self._check_move(position)
-                    if msg[0] == 'v':
-                        logger.debug('got version reply')
-                        if len(msg) == 7:
-                            version = '{}.{}'.format(
-                                msg[1] + msg[2], msg[3] + msg[4])
-                            self.board_version = version
+                                logger.debug('Cable-right board detected.')
+                                self.orientation = True
+                            self.write_configuration()
+                            flat = flat[::-1]
+                            sfen = flat_to_short_fen(flat)
+                        fen = f'{sfen} w {castling_rights(flat)} - 0 1'
+                        position = flat_to_position(flat)
+
+                        if sfen == START_FEN:
+                            if self.is_new_game is False:
+                                self.is_new_game = True  # XXX changed on cleanup
+                                cmd = {'cmd': 'new_game', 'actor': self.name,
+                                       'orientation': self.orientation}  # XXX: orientation?!
+                                self.new_game(position)
+                                self.appque.put(cmd)
                         else:
-                            logger.warning(f'Bad length of version-reply: {len(version)}')
-
-                    if msg[0] == 'l':
-                        logger.debug('got led-set reply')
-                    if msg[0] == 'x':
-                        logger.debug('got led-off reply')
-                    if msg[0] == 'w':
-                        logger.debug('got write-register reply')
-                        if len(msg) == 7:
-                            reg_cont = '{}->{}'.format(
-                                msg[1] + msg[2], msg[3] + msg[4])
-                            logger.debug(f'Register written: {reg_cont}')
-                        else:
-                            logger.warning(f'Invalid length {len(msg)} for write-register reply')
-                    if msg[0] == 'r':
-                        logger.debug('got read-register reply')
-                        if len(msg) == 7:
-                            reg_cont = '{}->{}'.format(
-                                msg[1] + msg[2], msg[3] + msg[4])
-                            logger.debug(f'Register content: {reg_cont}')
-                        else:
-                            logger.warning(f'Invalid length {len(msg)} for read-register reply')
-
-            else:
-                time.sleep(0.01)
+                            self.is_new_game = False
+
+                        # position is a new array for every update and never changed afterwards
+                        with mutex:
+                            self.position = position
+                            if self.reference_position is None:
+                                self.reference_position = position
+                        self.appque.put(
+                            {'cmd': 'raw_board_position', 'fen': fen, 'actor': self.name})
+                        self._check_move(position, sfen)
+                if msg[0] == 'v':
+                    logger.debug('got version reply')
+                    if len(msg) == 7:
+                        version = '{}.{}'.format(
+                            msg[1] + msg[2], msg[3] + msg[4])
+                        self.board_version = version
+                    else:
+                        logger.warning(f'Bad length of version-reply: {len(version)}')
+
+                if msg[0] == 'l':
+                    logger.debug('got led-set reply')
+                if msg[0] == 'x':
+                    logger.debug('got led-off reply')
+                if msg[0] == 'w':
+                    logger.debug('got write-register reply')
+                    if len(msg) == 7:
+                        reg_cont = '{}->{}'.format(
+                            msg[1] + msg[2], msg[3] + msg[4])
+                        logger.debug(f'Register written: {reg_cont}')
+                    else:
+                        logger.warning(f'Invalid length {len(msg)} for write-register reply')
+                if msg[0] == 'r':
+                    logger.debug('got read-register reply')
+                    if len(msg) == 7:
+                        reg_cont = '{}->{}'.format(
+                            msg[1] + msg[2], msg[3] + msg[4])
+                        logger.debug(f'Register content: {reg_cont}')
+                    else:
+                        logger.warning(f'Invalid length {len(msg)} for read-register reply')
 
     def new_game(self, pos):
         """
@@ -427,13 +461,15 @@ class ChessLink:
         self.set_led_off()
         self.legal_moves = None
 
-    def _check_move(self, pos):
+    def _check_move(self, pos, fen):
         """
         Check, if current change on board is a legal move. If yes, put move into queue
         `appqueue`. This function is called by the background thread. In order for
         it to be called, `move_from` needs to have been called before.
+
+        :param pos: `position` array of the board
+        :param fen: short fen of pos
         """
-        fen = self.short_fen(self.position_to_fen(pos))
         if self.legal_moves is not None and fen in self.legal_moves:
             self.appque.put(
                 {'cmd': 'move', 'uci': self.legal_moves[fen], 'actor': self.name})
@@ -884,11 +920,7 @@ class ChessLink:
             self.orientation = orientation
             logger.info('Swapping board position')
             with self.board_mutex:
-                pos = copy.deepcopy(self.position)
-                for y in range(8):
-                    for x in range(8):
-                        pos[y][x] = self.position[7 - y][7 - x]
-                self.position = pos
+                self.position = [row[::-1] for row in reversed(self.position)]
         self.write_configuration()
 
     def get_orientation(self):
@@ -32,6 +32,7 @@ import time
 import os
 
 import eboard.chesslink.chess_link_protocol as clp
+from eboard.event_loop import ReconnectPolicy
 
 try:
     import bluepy  # type: ignore
@@ -80,6 +81,7 @@ class Transport():
         self.worker_thread_active = False
         self.worker_threader = None
         self.conn_state = None
+        self.policy = ReconnectPolicy()
 
         self.bp_path = os.path.dirname(os.path.abspath(bluepy.__file__))
         self.bp_helper = os.path.join(self.bp_path, 'bluepy-helper')
@@ -211,11 +213,11 @@ class Transport():
                 DefaultDelegate.__init__(self)
 
             def handleNotification(self, cHandle, data):
-                logger.debug(f'BLE: Handle: {cHandle}, data: {data}')
+                logger.debug('BLE: Handle: %s, data: %s', cHandle, data)
                 rcv = ''
                 for b in data:
                     rcv += chr(b & 127)
-                logger.debug('BLE received [{}]'.format(rcv))
+                logger.debug('BLE received [%s]', rcv)
                 self.chunks += rcv
                 if self.chunks[0] not in clp.protocol_replies:
                     logger.warning(f'Illegal reply start \'{self.chunks[0]}\' received, discarding')
@@ -225,7 +227,7 @@ class Transport():
                     mlen = clp.protocol_replies[self.chunks[0]]
                     if len(self.chunks) >= mlen:
                         valmsg = self.chunks[:mlen]
-                        logger.debug('bluepy_ble received complete msg: {}'.format(valmsg))
+                        logger.debug('bluepy_ble received complete msg: %s', valmsg)
                         if clp.check_block_crc(valmsg):
                             que.put(valmsg)
                         self.chunks = self.chunks[mlen:]
@@ -307,7 +309,7 @@ class Transport():
         while self.worker_thread_active is True:
             rep_err = False
             while bt_error is True:
-                time.sleep(1)
+                time.sleep(self.policy.next_delay())
                 bt_error = False
                 self.init = False
                 try:
@@ -319,6 +321,7 @@ class Transport():
                     bt_error = True
                 if bt_error is False:
                     logger.info(f'Bluetooth reconnected to {address}')
+                    self.policy.reset()
                     rx, tx = self.mil_open(address, mil, que)
                     time_last_out = time.time() + 0.2
                     self.init = True
@@ -349,12 +352,9 @@ class Transport():
 
             try:
                 rx.read()
-                mil.waitForNotifications(0.05)
-                # time.sleep(0.1)
+                mil.waitForNotifications(0.05)  # blocks till a notification arrives or 0.05s passed
             except Exception as e:
                 logger.warning(f'Bluetooth read error {e}')
                 bt_error = True
                 self.agent_state(que, 'offline', f'Connection to Bluetooth peripheral lost: {e}')
-                continue
-            time.sleep(0.01)
         mil.disconnect()
@@ -26,10 +26,10 @@
 ChessLink transport implementation for USB connections.
 """
 import logging
-import threading
-import time
+from typing import Optional
 
 import eboard.chesslink.chess_link_protocol as clp
+from eboard.event_loop import SerialStream
 
 try:
     import serial  # type: ignore
@@ -49,7 +49,7 @@ class Transport():
     This class does automatic hardware detection of any ChessLink board connected
     via USB and support Linux, macOS and Windows.
 
-    This transport uses an asynchronous background thread for hardware communcation.
+    This transport reads the board on the shared e-board event loop.
     All replies are written to the python queue `que` given during initialization.
     """
 
@@ -71,17 +71,18 @@ class Transport():
         logger.debug('USB init ok')
         self.protocol_debug = protocol_dbg
         self.last_agent_state = None
-        self.error_state = False
-        self.thread_active = False
-        self.event_thread = None
+        self.stream: Optional[SerialStream] = None
         self.usb_dev = None
         self.uport = None
+        self.cmd = ''  # reply received so far
+        self.cmd_size = 0  # bytes missing of the reply
 
     def quit(self):
         """
-        Initiate worker-thread stop
+        Stop reading the board
         """
-        self.thread_active = False
+        if self.stream is not None:
+            self.stream.stop()
 
     def search_board(self, iface=None):
         """
@@ -178,14 +179,17 @@ class Transport():
         for c in msg:
             bo = clp.add_odd_par(c)
             bts.append(bo)
+        usb_dev = self.usb_dev if self.stream is None else self.stream.device  # no stream while testing a port
         try:
             if self.protocol_debug is True:
                 logger.debug(f'Trying write <{bts}>')
-            self.usb_dev.write(bts)
-            self.usb_dev.flush()
+            usb_dev.write(bts)
+            usb_dev.flush()
         except Exception as e:
-            logger.error(f'Failed to write {msg}: {e}')
-            self.error_state = True
+            if self.stream is None:
+                logger.error(f'Failed to write {msg}: {e}')
+            else:
+                self.stream.error(f'Failed to write {msg}: {e}')
             return False
         if self.protocol_debug is True:
             logger.debug(f"Written '{msg}' as < {bts} > ok")
@@ -230,92 +234,49 @@ class Transport():
         """
         self.uport = port
         try:
-            self.usb_dev = serial.Serial(port, 38400, timeout=0.1)
-            self.usb_dev.dtr = 0
+            device = self._open_port(port)
         except Exception as e:
             emsg = f'USB cannot open port {port}, {e}'
             logger.error(emsg)
             self.agent_state(self.que, 'offline', emsg)
             return False
         logger.debug(f'USB port {port} open')
-        self.thread_active = True
-        self.event_thread = threading.Thread(
-            target=self.event_worker_thread, args=(self.que,))
-        self.event_thread.setDaemon(True)
-        self.event_thread.start()
+        self.stream = SerialStream(port, self._open_port, self._on_data, self._on_state)
+        self.stream.start(device)
         return True
 
-    def event_worker_thread(self, que):
+    @staticmethod
+    def _open_port(port):
+        usb_dev = serial.Serial(port, 38400, timeout=0)
+        usb_dev.dtr = 0
+        return usb_dev
+
+    def _on_state(self, state, msg):
+        if state == 'offline' and len(self.cmd) > 0:
+            logger.debug(f'USB command \'{self.cmd[0]}\' interrupted: {msg}')
+        self.cmd = ''
+        self.cmd_size = 0
+        self.agent_state(self.que, state, msg)
+
+    def _on_data(self, data):
         """
-        Background thread that sends data received via usb to the queue `que`.
+        Collect the replies from the bytes received via usb and send them to the queue `que`.
         """
-        logger.debug('USB worker thread started.')
-        cmd_started = False
-        cmd_size = 0
-        cmd = ''
-        self.agent_state(self.que, 'online', f'Connected to {self.uport}')
-        self.error_state = False
-        posted = False
-        while self.thread_active:
-            while self.error_state is True:
-                time.sleep(1.0)
-                try:
-                    self.usb_dev.close()
-                except Exception as e:
-                    logger.debug(f'Failed to close usb: {e}')
-                try:
-                    self.usb_dev = serial.Serial(
-                        self.uport, 38400, timeout=0.1)
-                    self.usb_dev.dtr = 0
-                    self.agent_state(self.que, 'online', f'Reconnected to {self.uport}')
-                    self.error_state = False
-                    posted = False
-                    break
-                except Exception as e:
-                    if posted is False:
-                        emsg = f'Failed to reconnect to {self.uport}, {e}'
-                        logger.warning(emsg)
-                        self.agent_state(self.que, 'offline', emsg)
-                        posted = True
-
-            b = ''
-            try:
-                if cmd_started is False:
-                    self.usb_dev.timeout = None
-                else:
-                    self.usb_dev.timeout = 0.2
-                by = self.usb_dev.read()
-                if len(by) > 0:
-                    b = chr(ord(by) & 127)
-                else:
-                    continue
-            except Exception as e:
-                if len(cmd) > 0:
-                    logger.debug(f'USB command \'{cmd[0]}\' interrupted: {e}')
-                time.sleep(0.1)
-                cmd_started = False
-                cmd_size = 0
-                cmd = ''
-                self.error_state = True
-                continue
-            if len(b) > 0:
-                if cmd_started is False:
-                    if b in clp.protocol_replies:
-                        cmd_started = True
-                        cmd_size = clp.protocol_replies[b]
-                        cmd = b
-                        cmd_size -= 1
-                else:
-                    cmd += b
-                    cmd_size -= 1
-                    if cmd_size == 0:
-                        cmd_started = False
-                        cmd_size = 0
-                        if self.protocol_debug is True:
-                            logger.debug(f'USB received cmd: {cmd}')
-                        if clp.check_block_crc(cmd):
-                            que.put(cmd)
-                        cmd = ''
+        for by in data:
+            b = chr(by & 127)
+            if self.cmd_size == 0:
+                if b in clp.protocol_replies:
+                    self.cmd = b
+                    self.cmd_size = clp.protocol_replies[b] - 1
+            else:
+                self.cmd += b
+                self.cmd_size -= 1
+                if self.cmd_size == 0:
+                    if self.protocol_debug is True:
+                        logger.debug(f'USB received cmd: {self.cmd}')
+                    if clp.check_block_crc(self.cmd):
+                        self.que.put(self.cmd)
+                    self.cmd = ''
 
     def get_name(self):
         """
@@ -11,10 +11,23 @@
 # You should have received a copy of the GNU General Public License
 # along with this program. If not, see <http://www.gnu.org/licenses/>.
 
-from typing import List
+from typing import Optional
 
 from eboard.eboard import to_short_fen, to_battery, get_upper_4_bits, get_lower_4_bits, check_reversed
 from eboard.eboard import Battery
+from eboard.frame_extractor import FrameExtractor, FrameSpec
+from metrics import eboard_frames
+
+POSITION = FrameSpec('position', bytes([0x01, 0x24]), length=38)
+BATTERY = FrameSpec('battery', bytes([0x2a, 0x02]), length=4)
+STONES = {0: ' ',
+          0x07: 'P', 0x06: 'R', 0x0a: 'N', 0x09: 'B', 0x0b: 'Q', 0x0c: 'K',
+          0x04: 'p', 0x08: 'r', 0x05: 'n', 0x03: 'b', 0x01: 'q', 0x02: 'k'}
+# both stones of each byte value, None if one of them is invalid
+STONE_PAIRS = [(STONES[get_upper_4_bits(b)], STONES[get_lower_4_bits(b)])
+               if get_upper_4_bits(b) in STONES and get_lower_4_bits(b) in STONES else None for b in range(256)]
+# position bytes in board order from a8 to h1
+BYTE_ORDER = [row * 4 + col for row in range(7, -1, -1) for col in range(3, -1, -1)]
 
 
 class ParserCallback(object):
@@ -33,67 +46,36 @@ class Parser(object):
 
     def __init__(self, callback: ParserCallback):
         self.callback = callback
-        self.buffer = bytearray()
-        self.last_board: List = []
+        self.extractor = FrameExtractor([POSITION, BATTERY])
+        self.frames = eboard_frames('chessnut')
+        self.last_position = b''
         self.reversed = False
 
     def parse(self, msg: bytearray):
-        # copy any previous buffer to the front
-        data = self.buffer + msg
-        self.buffer = bytearray()
-        if len(data) >= 3:
-            i = 0
-            while i < len(data):
-                if (i + 2) < len(data):
-                    if data[i] == 0x01 and data[i + 1] == 0x24:  # position
-                        new_pos, position_data = self._parse_position(data, i)
-                        board = self._to_board(position_data)
-                        if len(board) > 0 and None not in board:
-                            if self.last_board != board:
-                                self.last_board = board
-                                board, self.reversed = check_reversed(board, self.reversed, self.callback)
-                                self.callback.board_update(to_short_fen(board))
-                            i = new_pos
-                    elif (i + 3) < len(data) and data[i] == 0x2a and data[i + 1] == 0x02:  # battery
-                        self.callback.battery(*to_battery(data[i + 2], data[i + 3]))
-                        i += 3
-                i += 1
-        else:
-            self._add_to_buffer(msg)
-
-    def _parse_position(self, data, index):
-        data_length = 36
-        if len(data) >= (index + data_length + 2):
-            data = data[index + 2:]
-            index += data_length + 1
-            return index, data
-        else:
-            self._add_to_buffer(data)
-        return index, bytearray()
-
-    def _add_to_buffer(self, arr):
-        self.buffer += arr
+        self.extractor.extract(msg, self._parse_frame)
 
-    def _to_board(self, data):
-        if len(data) >= 32:
-            board = [None] * 64
-            i = 0
-            for row in range(7, -1, -1):
-                for col in range(3, -1, -1):
-                    board[i] = self._to_stone(get_upper_4_bits(data[row * 4 + col]))
-                    board[i + 1] = self._to_stone(get_lower_4_bits(data[row * 4 + col]))
-                    i += 2
-            i += 1
-            return board
-        else:
-            return []
+    def _parse_frame(self, spec: FrameSpec, frame: memoryview) -> bool:
+        self.frames.inc()
+        if spec is BATTERY:
+            self.callback.battery(*to_battery(frame[2], frame[3]))
+            return True
+        position = frame[2:34]
+        if position == self.last_position:
+            return True
+        board = self._to_board(position)
+        if board is None:
+            return False
+        self.last_position = position.tobytes()
+        board, self.reversed = check_reversed(board, self.reversed, self.callback)
+        self.callback.board_update(to_short_fen(board))
+        return True
 
     @staticmethod
-    def _to_stone(value):
-        translation = {0: ' ',
-                       0x07: 'P', 0x06: 'R', 0x0a: 'N', 0x09: 'B', 0x0b: 'Q', 0x0c: 'K',
-                       0x04: 'p', 0x08: 'r', 0x05: 'n', 0x03: 'b', 0x01: 'q', 0x02: 'k'}
-        if value in translation:
-            return translation[value]
-        else:
-            return None
+    def _to_board(data) -> Optional[list]:
+        board = []
+        for index in BYTE_ORDER:
+            stones = STONE_PAIRS[data[index]]
+            if stones is None:
+                return None
+            board.extend(stones)
+        return board
@@ -17,10 +17,10 @@
 import time
 import logging
 import threading
-import queue
 import json
 
 from eboard.move_debouncer import MoveDebouncer
+from eboard.recorder import ReplayTransport, replay_transport, transport_queue
 from eboard.ble_transport import Transport
 from eboard.chessnut.parser import Parser, ParserCallback, Battery
 from eboard.chessnut import command
@@ -51,7 +51,7 @@ class Protocol(ParserCallback):
         self.error_condition = False
         self.appque = appque
         self.board_mutex = threading.Lock()
-        self.trque = queue.Queue()
+        self.trque = transport_queue('chessnut')
         self.trans = None
         self.config = None
         self.connected = False
@@ -68,10 +68,15 @@ class Protocol(ParserCallback):
         self.event_thread.start()
 
         self.config = None
-        try:
-            self._read_config()
-        except Exception as e:
-            logger.debug(f'No valid default configuration, starting board-scan: {e}')
+        self.trans = replay_transport(self.trque)
+        if self.trans is not None:
+            self.config = {'address': self.trans.path}
+            self.device_in_config = True
+        else:
+            try:
+                self._read_config()
+            except Exception as e:
+                logger.debug(f'No valid default configuration, starting board-scan: {e}')
         while True:
             if not self.device_in_config:
                 self._search_board()
@@ -87,6 +92,9 @@ class Protocol(ParserCallback):
 
             if not self.error_condition:
                 break
+            if isinstance(self.trans, ReplayTransport):
+                logger.error('Replay failed, no scan for a real board.')
+                break
             self.device_in_config = False
             time.sleep(3)
 
@@ -146,6 +154,7 @@ class Protocol(ParserCallback):
         if self.trans is not None:
             self.trans.quit()
         self.thread_active = False
+        self.trque.put(b'')  # wake up the event worker
 
     def position_initialized(self):
         """
@@ -166,6 +175,8 @@ class Protocol(ParserCallback):
 
         :return: True on success, False on error
         """
+        if isinstance(self.trans, ReplayTransport):
+            return False  # a replay must not replace the configuration of the real board
         if 'btle_iface' not in self.config:
             self.config['btle_iface'] = 0
         try:
@@ -182,8 +193,8 @@ class Protocol(ParserCallback):
         """
         logger.debug('Chessnut worker thread started.')
         while self.thread_active:
-            if not self.trque.empty():
-                msg = self.trque.get()
+            msg = self.trque.get()
+            if msg:
                 token = 'agent-state: '
                 if msg[:len(token)] == token:
                     toks = msg[len(token):]
@@ -204,8 +215,6 @@ class Protocol(ParserCallback):
                     continue
 
                 self.parser.parse(msg)
-            else:
-                time.sleep(0.01)
 
     def board_update(self, short_fen: str):
         self.debouncer.update(short_fen)
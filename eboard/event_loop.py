@@ -0,0 +1,156 @@
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+import asyncio
+import logging
+from threading import Lock, Thread
+from typing import Any, Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class EventLoop(Thread):
+
+    """One asyncio event loop thread shared by the e-board transports, it is started on first use."""
+
+    def __init__(self):
+        super(EventLoop, self).__init__(name='eboard_loop', daemon=True)
+        self.loop = asyncio.new_event_loop()
+        self.lock = Lock()
+
+    def run(self):
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+
+    def call_soon(self, callback: Callable, *args):
+        """Run callback on the event loop, callable from any thread."""
+        with self.lock:
+            if not self.is_alive():
+                self.start()
+        self.loop.call_soon_threadsafe(callback, *args)
+
+
+event_loop = EventLoop()
+
+
+class ReconnectPolicy(object):
+
+    """Delays between reconnect attempts, growing from first to longest."""
+
+    def __init__(self, first: float = 1.0, longest: float = 8.0, factor: float = 2.0):
+        self.first = first
+        self.longest = longest
+        self.factor = factor
+        self.delay = first
+
+    def next_delay(self) -> float:
+        """Return the delay before the next attempt."""
+        delay = self.delay
+        self.delay = min(self.delay * self.factor, self.longest)
+        return delay
+
+    def reset(self):
+        """Start with the first delay again, after a successful connect."""
+        self.delay = self.first
+
+
+class SerialStream(object):
+
+    """
+    Read a serial port on the shared event loop and hand the received bytes to on_data.
+
+    The port is watched through its file descriptor, so no thread polls it. After a read or write
+    error the port is closed and opened again with the delays of the reconnect policy. on_state
+    gets 'online' or 'offline' and a message, on_data and on_state are called on the event loop.
+    """
+
+    def __init__(self, port: str, open_port: Callable[[str], Any], on_data: Callable[[bytes], None],
+                 on_state: Callable[[str, str], None], policy: Optional[ReconnectPolicy] = None):
+        """
+        :param port: name of the serial port
+        :param open_port: opens the port and returns a pyserial Serial with timeout 0
+        """
+        self.port = port
+        self.open_port = open_port
+        self.on_data = on_data
+        self.on_state = on_state
+        self.policy = policy or ReconnectPolicy()
+        self.device: Any = None
+        self.active = False
+        self.failed = False  # offline reported for the current reconnect attempts
+
+    def start(self, device):
+        """Start reading the opened device."""
+        self.device = device
+        self.active = True
+        event_loop.call_soon(self._watch, f'Connected to {self.port}')
+
+    def stop(self):
+        self.active = False
+        event_loop.call_soon(self._unwatch)
+
+    def error(self, message: str):
+        """Reconnect after a failed write, callable from any thread."""
+        event_loop.call_soon(self._reconnect, message)
+
+    def _watch(self, message: str):
+        if not self.active:
+            return
+        event_loop.loop.add_reader(self.device.fileno(), self._read)
+        self.policy.reset()
+        self.failed = False
+        self.on_state('online', message)
+
+    def _unwatch(self):
+        if self.device is None:
+            return
+        try:
+            event_loop.loop.remove_reader(self.device.fileno())
+        except Exception as e:
+            logger.debug(f'Failed to stop watching {self.port}: {e}')
+
+    def _read(self):
+        try:
+            data = self.device.read(self.device.in_waiting or 1)
+        except Exception as e:
+            self._reconnect(f'Error reading from {self.port}, {e}')
+            return
+        if data:
+            self.on_data(data)
+
+    def _reconnect(self, message: str):
+        if not self.active or self.device is None:
+            return
+        logger.error(message)
+        self._unwatch()
+        try:
+            self.device.close()
+        except Exception as e:
+            logger.debug(f'Failed to close {self.port}: {e}')
+        self.device = None
+        event_loop.loop.call_later(self.policy.next_delay(), self._open)
+
+    def _open(self):
+        if not self.active:
+            return
+        try:
+            self.device = self.open_port(self.port)
+        except Exception as e:
+            if not self.failed:
+                emsg = f'Failed to reconnect to {self.port}, {e}'
+                logger.warning(emsg)
+                self.on_state('offline', emsg)
+                self.failed = True
+            event_loop.loop.call_later(self.policy.next_delay(), self._open)
+            return
+        self._watch(f'Reconnected to {self.port}')
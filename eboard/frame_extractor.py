@@ -0,0 +1,109 @@
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+from typing import Callable, List, NamedTuple, Optional, Tuple
+
+
+class FrameSpec(NamedTuple):
+    """
+    A frame sent by an e-board: it starts with header and has a fixed length (header included)
+    or ends with terminator. Without header a frame starts right after the previous one.
+    """
+
+    name: str
+    header: bytes
+    length: int = 0
+    terminator: bytes = b''
+
+
+class FrameExtractor(object):
+    """
+    FrameExtractor collects the bytes received from an e-board and finds the frames of the given specs in them.
+    The bytes are kept in one buffer which is reused and compacted in place, so frames are handed out
+    as memoryviews without copying. Bytes before a frame header are dropped.
+    """
+
+    def __init__(self, specs: List[FrameSpec], size: int = 1024):
+        """
+        :param specs: frames to look for
+        :param size: initial buffer size, it grows if a frame doesnt fit
+        """
+        self.specs = specs
+        self.buffer = bytearray(size)
+        self.start = 0  # first byte not processed yet
+        self.end = 0  # end of the received bytes
+        self.keep = max(max(len(spec.header) for spec in specs) - 1, 0)  # bytes possibly starting a header
+
+    def extract(self, data: bytes, handler: Callable[[FrameSpec, memoryview], bool]):
+        """
+        Add the received data and call handler for every complete frame.
+
+        The frame memoryview is only valid during the call. If handler returns False, the frame is
+        taken as garbage and the search goes on right after its first byte.
+        """
+        self._append(data)
+        found = self._find_frame()
+        if found is None:
+            return
+        with memoryview(self.buffer) as view:
+            while found is not None:
+                spec, begin, stop = found
+                if handler(spec, view[begin:stop]):
+                    self.start = stop
+                else:
+                    self.start = begin + 1
+                found = self._find_frame() if self.start < self.end else None
+
+    def _append(self, data: bytes):
+        size = len(data)
+        if self.start == self.end:
+            self.start = self.end = 0
+        elif self.end + size > len(self.buffer) and self.start > 0:
+            length = self.end - self.start
+            self.buffer[:length] = self.buffer[self.start:self.end]
+            self.start, self.end = 0, length
+        if self.end + size > len(self.buffer):
+            self.buffer.extend(bytes(self.end + size - len(self.buffer)))
+        self.buffer[self.end:self.end + size] = data
+        self.end += size
+
+    def _find_frame(self) -> Optional[Tuple[FrameSpec, int, int]]:
+        """Return the first complete frame or None if more bytes are needed."""
+        while True:
+            begin, spec = self.end, None
+            for candidate in self.specs:
+                pos = self.buffer.find(candidate.header, self.start, self.end)
+                if pos != -1 and pos < begin:
+                    begin, spec = pos, candidate
+            if spec is None:
+                self.start = max(self.start, self.end - self.keep)  # drop the junk
+                return None
+            self.start = begin
+            if spec.length:
+                stop = begin + spec.length
+                return (spec, begin, stop) if stop <= self.end else None
+            body = begin + len(spec.header)
+            pos = self.buffer.find(spec.terminator, body, self.end)
+            restart = self.buffer.find(spec.header, body, self.end if pos == -1 else pos) if spec.header else -1
+            if restart != -1:
+                self.start = restart  # frame cut off by the next one
+                continue
+            return None if pos == -1 else (spec, begin, pos + len(spec.terminator))
+
+    def pending(self) -> bytes:
+        """Return the bytes not belonging to a complete frame yet."""
+        return bytes(self.buffer[self.start:self.end])
+
+    def clear(self):
+        """Drop the pending bytes."""
+        self.start = self.end = 0
@@ -18,6 +18,7 @@ import queue
 
 from eboard.eboard import EBoard
 from utilities import DisplayMsg
+from tracing import tracer
 from dgt.api import Message, Dgt
 from dgt.util import ClockIcons
 
@@ -105,6 +106,7 @@ class IChessOneBoard(EBoard):
 
     def _process_board_position(self, result):
         fen = result['fen'].split(' ')[0]
+        tracer.instant('board fen', 'eboard', fen=fen)
         DisplayMsg.show(Message.DGT_FEN(fen=fen, raw=True))
 
     def _process_battery_state(self, result):
@@ -12,10 +12,12 @@
 # along with this program. If not, see <http://www.gnu.org/licenses/>.
 
 from typing import Callable, List, Optional
-from threading import Timer
 
 import chess  # type: ignore
 
+from tracing import tracer
+from utilities import ScheduledCall, scheduler
+
 
 class MoveDebouncer(object):
     """
@@ -40,7 +42,7 @@ class MoveDebouncer(object):
         self.debounce_time_millis = debounce_time_millis
         self.callback = callback
         self.previous_fen = None
-        self.timer: Optional[Timer] = None
+        self.timer: Optional[ScheduledCall] = None
         self.previous_fens: List[str] = []
 
     def update(self, short_fen: str):
@@ -55,12 +57,15 @@ class MoveDebouncer(object):
         if self.timer is not None:
             self.timer.cancel()
         if self._shall_start_timer(short_fen):
-            self.timer = Timer(self.debounce_time_millis / 1000, self.callback, [short_fen])
-            self.timer.start()
+            self.timer = scheduler.schedule(self.debounce_time_millis / 1000, self._debounced, short_fen, tracer.now())
         else:
             self.callback(short_fen)
         self.previous_fens.append(short_fen)
 
+    def _debounced(self, short_fen: str, started: float):
+        tracer.complete('debounce', 'eboard', started, fen=short_fen)
+        self.callback(short_fen)
+
     def stop(self):
         if self.timer is not None:
             self.timer.cancel()
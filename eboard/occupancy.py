@@ -0,0 +1,70 @@
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+from typing import Dict, List
+
+import chess  # type: ignore
+
+START_OCCUPIED = chess.BB_RANK_1 | chess.BB_RANK_2 | chess.BB_RANK_7 | chess.BB_RANK_8
+
+
+def occupied_after(board: chess.Board, move: chess.Move) -> int:
+    """Return the occupied squares after move, as a 64 bit mask."""
+    occupied = board.occupied & ~chess.BB_SQUARES[move.from_square] | chess.BB_SQUARES[move.to_square]
+    if board.is_en_passant(move):
+        occupied &= ~chess.BB_SQUARES[move.to_square - 8 if board.turn == chess.WHITE else move.to_square + 8]
+    elif board.is_castling(move):
+        rank = chess.square_rank(move.from_square) * 8
+        if chess.square_file(move.to_square) > chess.square_file(move.from_square):
+            occupied ^= chess.BB_SQUARES[rank + 7] | chess.BB_SQUARES[rank + 5]
+        else:
+            occupied ^= chess.BB_SQUARES[rank] | chess.BB_SQUARES[rank + 3]
+    return occupied
+
+
+class OccupancyMoves(object):
+    """
+    The legal moves of a position, indexed by the occupied squares they lead to.
+
+    This is for e-boards which only see if a square is occupied. A scan is resolved by a dict lookup
+    of its 64 bit mask. A capture leaves the same squares occupied as lifting the capturing piece,
+    so it is only taken after both of its squares were seen empty. A castling is also found
+    when only the king got moved yet.
+    """
+
+    def __init__(self, board: chess.Board):
+        self.occupied = board.occupied
+        self.moves: Dict[int, List[chess.Move]] = {}  # occupied squares after the move => moves
+        self.lifted: Dict[int, List[chess.Move]] = {}  # both capture squares empty => captures
+        self.captures: List[chess.Move] = []  # captures whose squares were seen empty
+        for move in board.legal_moves:
+            if board.is_capture(move) and not board.is_en_passant(move):
+                lifted = self.occupied & ~(chess.BB_SQUARES[move.from_square] | chess.BB_SQUARES[move.to_square])
+                self.lifted.setdefault(lifted, []).append(move)
+                continue
+            self.moves.setdefault(occupied_after(board, move), []).append(move)
+            if board.is_castling(move):
+                king_moved = self.occupied ^ chess.BB_SQUARES[move.from_square] ^ chess.BB_SQUARES[move.to_square]
+                self.moves.setdefault(king_moved, []).append(move)
+
+    def resolve(self, occupied: int) -> List[chess.Move]:
+        """
+        Return the moves leading to the occupied squares of a scan. There is more than one
+        only for a promotion, one move for each piece.
+        """
+        if occupied in self.lifted:
+            self.captures = self.lifted[occupied]
+            return []
+        if self.captures and occupied == self.occupied & ~chess.BB_SQUARES[self.captures[0].from_square]:
+            return self.captures
+        return self.moves.get(occupied, [])
@@ -0,0 +1,185 @@
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Record the messages e-board transports hand to their protocol, and replay them without the board.
+
+A recording starts with RECORD_MAGIC and the length prefixed board name, followed by one header
+per message: the microseconds since the previous message, the kind (bytes or text) and the length.
+"""
+
+import logging
+import os
+import queue
+import struct
+import threading
+import time
+from typing import List, Optional, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+RECORD_MAGIC = b'PICOREC1'
+RECORD = struct.Struct('<IBH')
+BYTES = 0
+TEXT = 1
+MAX_DELAY = 0xffffffff
+
+Message = Union[bytes, str]
+
+record_folder: Optional[str] = None  # set by configure()
+replay_file: Optional[str] = None
+replay_speed = 1.0
+
+
+def configure(record: Optional[str], replay: Optional[str], speed: float = 1.0):
+    """
+    :param record: folder for the recordings of the transports, None to record nothing
+    :param replay: recording replayed instead of connecting to a board, None to use the board
+    :param speed: replay speed factor, 0 replays without delays
+    """
+    global record_folder, replay_file, replay_speed
+    record_folder = record
+    replay_file = replay
+    replay_speed = speed
+
+
+class Recorder(object):
+
+    """Write the messages of one e-board transport to a recording."""
+
+    def __init__(self, path: str, board: str):
+        self.file = open(path, 'wb')
+        name = board.encode()
+        self.file.write(RECORD_MAGIC + bytes([len(name)]) + name)
+        self.last_time = time.monotonic()
+        self.lock = threading.Lock()
+
+    def record(self, message: Message):
+        if isinstance(message, str):
+            kind, data = TEXT, message.encode()
+        else:
+            kind, data = BYTES, bytes(message)
+        with self.lock:
+            now = time.monotonic()
+            delay = min(int((now - self.last_time) * 1e6), MAX_DELAY)
+            self.last_time = now
+            self.file.write(RECORD.pack(delay, kind, len(data)) + data)
+            self.file.flush()
+
+    def close(self):
+        with self.lock:
+            self.file.close()
+
+
+def read_recording(path: str) -> Tuple[str, List[Tuple[float, Message]]]:
+    """Return the board name and the messages with their delay in seconds."""
+    with open(path, 'rb') as f:
+        content = f.read()
+    if not content.startswith(RECORD_MAGIC):
+        raise ValueError(f'{path} is no e-board recording')
+    pos = len(RECORD_MAGIC) + 1 + content[len(RECORD_MAGIC)]
+    board = content[len(RECORD_MAGIC) + 1:pos].decode()
+    messages: List[Tuple[float, Message]] = []
+    while pos + RECORD.size <= len(content):
+        delay, kind, length = RECORD.unpack_from(content, pos)
+        pos += RECORD.size
+        data = content[pos:pos + length]
+        pos += length
+        messages.append((delay / 1e6, data.decode() if kind == TEXT else data))
+    return board, messages
+
+
+class RecordingQueue(queue.Queue):
+
+    """A transport queue which records every message put into it."""
+
+    def __init__(self, recorder: Recorder):
+        super(RecordingQueue, self).__init__()
+        self.recorder = recorder
+
+    def put(self, item, block=True, timeout=None):
+        if item:  # not the wake up of the event worker
+            self.recorder.record(item)
+        super(RecordingQueue, self).put(item, block, timeout)
+
+
+def board_recorder(board: str) -> Optional[Recorder]:
+    """Return a recorder for the messages of board, None if recording is not configured."""
+    if record_folder is None:
+        return None
+    path = os.path.join(record_folder, time.strftime(f'{board}-%Y%m%d-%H%M%S.rec'))
+    logger.info('recording %s transport to %s', board, path)
+    return Recorder(path, board)
+
+
+def transport_queue(board: str) -> queue.Queue:
+    """Return the queue for the transport messages of board, recorded if configured."""
+    recorder = board_recorder(board)
+    return queue.Queue() if recorder is None else RecordingQueue(recorder)
+
+
+class ReplayTransport(object):
+
+    """A transport replaying a recording into the protocol queue, commands to the board are dropped."""
+
+    def __init__(self, que: queue.Queue, path: str, speed: float = 1.0):
+        self.que = que
+        self.path = path
+        self.speed = speed
+        self.thread_active = False
+
+    def is_init(self):
+        return True
+
+    def get_name(self):
+        return 'eboard.recorder'
+
+    def search_board(self, *args):
+        return self.path
+
+    def test_board(self, address):
+        return 'replay'
+
+    def open_mt(self, address):
+        try:
+            _, messages = read_recording(address)
+        except (OSError, ValueError) as e:
+            logger.error(f'Cannot replay {address}: {e}')
+            return False
+        self.thread_active = True
+        thread = threading.Thread(target=self._replay, args=(messages,), name='eboard_replay', daemon=True)
+        thread.start()
+        return True
+
+    def write_mt(self, msg):
+        return True
+
+    def quit(self):
+        self.thread_active = False
+
+    def _replay(self, messages: List[Tuple[float, Message]]):
+        for delay, message in messages:
+            if not self.thread_active:
+                return
+            if self.speed > 0 and delay > 0:
+                time.sleep(delay / self.speed)
+            self.que.put(message)
+        logger.info(f'replay of {self.path} finished')
+
+
+def replay_transport(que: queue.Queue) -> Optional[ReplayTransport]:
+    """Return a transport replaying the configured recording, None if no replay is configured."""
+    if replay_file is None:
+        return None
+    logger.info('replaying %s instead of connecting to the board', replay_file)
+    return ReplayTransport(que, replay_file, replay_speed)
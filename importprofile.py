@@ -0,0 +1,69 @@
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+import logging
+import os
+import subprocess
+import sys
+from typing import List, NamedTuple
+
+logger = logging.getLogger(__name__)
+
+
+class ImportTime(NamedTuple):
+    module: str
+    self_us: int  # time spent in the module itself
+    cumulative_us: int  # including the modules it imported first
+    depth: int  # 0 for the imported modules, 1 for the modules they import...
+
+
+def parse_importtime(output: str) -> List[ImportTime]:
+    """Parse the stderr of python -X importtime."""
+    times = []
+    for line in output.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        module = name.strip()
+        times.append(ImportTime(module, int(self_us), int(cumulative_us), (len(name) - len(name.lstrip()) - 1) // 2))
+    return times
+
+
+def import_times(modules: List[str]) -> List[ImportTime]:
+    """Import the modules in a new python process with an empty module cache, like at boot."""
+    code = ';'.join('import ' + module for module in modules)
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', code], stdout=subprocess.DEVNULL,
+                            stderr=subprocess.PIPE, universal_newlines=True, timeout=120,
+                            cwd=os.path.dirname(os.path.abspath(__file__)))
+    return parse_importtime(result.stderr)
+
+
+def report(times: List[ImportTime], top: int = 25) -> List[str]:
+    """Return the total of the imported modules and the modules taking the longest themselves."""
+    total = sum(item.cumulative_us for item in times if item.depth == 0)
+    lines = ['import time {:.0f}ms of {} modules'.format(total / 1000, len(times)),
+             '{:>8} {:>8}  {}'.format('self ms', 'cum ms', 'module')]
+    for item in sorted(times, key=lambda item: item.self_us, reverse=True)[:top]:
+        lines.append('{:8.1f} {:8.1f}  {}'.format(item.self_us / 1000, item.cumulative_us / 1000, item.module))
+    return lines
+
+
+def log_import_profile(modules: List[str]):
+    """Log the import times of the modules picochess needs at startup."""
+    try:
+        times = import_times(modules)
+    except (OSError, subprocess.SubprocessError) as exc:
+        logger.warning('import profile failed: %s', exc)
+        return
+    for line in report(times):
+        logger.warning('startup %s', line)
@@ -0,0 +1,105 @@
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+import atexit
+import logging
+import queue
+import threading
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, List
+
+from metrics import metrics
+
+
+def _dropped(reason: str):
+    return metrics.counter('picochess_log_records_dropped_total', 'Log records not written', reason=reason)
+
+
+class RateLimiter(logging.Filter):
+
+    """
+    Let pass at most rate records below warning per module and period.
+
+    The first record of a module after a period with dropped records tells how many were suppressed.
+    """
+
+    def __init__(self, rate: int, period: float):
+        super(RateLimiter, self).__init__()
+        self.rate = rate
+        self.period = period
+        self.windows: Dict[str, List] = {}  # logger name => [window start, passed, suppressed]
+        self.lock = threading.Lock()
+        self.suppressed = _dropped('rate')
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        with self.lock:
+            window = self.windows.setdefault(record.name, [record.created, 0, 0])
+            if record.created - window[0] >= self.period:
+                if window[2]:
+                    record.msg = '[{} records suppressed] {}'.format(window[2], record.msg)
+                window[:] = [record.created, 0, 0]
+            if window[1] >= self.rate:
+                window[2] += 1
+                self.suppressed.inc()
+                return False
+            window[1] += 1
+        return True
+
+
+class BoundedQueueHandler(QueueHandler):
+
+    """Put the records in a bounded queue, and drop them instead of waiting if the writer falls behind."""
+
+    def __init__(self, que: queue.Queue):
+        super(BoundedQueueHandler, self).__init__(que)
+        self.full = _dropped('full')
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.full.inc()
+
+
+class _Listener(QueueListener):
+
+    def enqueue_sentinel(self):
+        self.queue.put(self._sentinel)  # wait for room, the writer is still emptying the queue
+
+    def stop(self):
+        if self._thread is not None:  # already stopped before the exit
+            super(_Listener, self).stop()
+
+
+def start_logging(handler: logging.Handler, level: int, size: int = 10000, rate: int = 200,
+                  period: float = 1.0) -> QueueListener:
+    """
+    Log to handler from a writer thread, so that slow SD card writes dont block the picochess threads.
+
+    The records are formatted by the logging thread, the writer thread only writes them.
+    """
+    que: queue.Queue = queue.Queue(maxsize=size)
+    queue_handler = BoundedQueueHandler(que)
+    queue_handler.addFilter(RateLimiter(rate, period))
+    logging.basicConfig(
+        level=level,
+        format="%(asctime)s.%(msecs)03d %(levelname)7s %(module)10s - %(funcName)s: %(message)s",
+        datefmt="%Y-%m-%d %H:%M:%S",
+        handlers=[queue_handler],
+    )
+    listener = _Listener(que, handler)
+    listener.start()
+    atexit.register(listener.stop)
+    return listener
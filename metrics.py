@@ -0,0 +1,186 @@
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+import os
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Tuple, Union
+
+from utilities import dgtdisplay_devices, dispatch_queue, evt_queue, msgdisplay_devices
+
+Labels = Tuple[Tuple[str, str], ...]
+Sample = Tuple[str, str, str, Dict[str, str], float]  # name, type, help, labels, value
+
+
+class Counter(object):
+
+    """A value only going up, like the number of searches."""
+
+    def __init__(self):
+        self.value = 0.0
+        self.lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0):
+        with self.lock:
+            self.value += amount
+
+    def samples(self, name: str) -> List[Tuple[str, float]]:
+        return [(name, self.value)]
+
+
+class Gauge(object):
+
+    """A value going up and down, like the nodes per second of the last search."""
+
+    def __init__(self):
+        self.value = 0.0
+
+    def set(self, value: float):
+        self.value = value
+
+    def samples(self, name: str) -> List[Tuple[str, float]]:
+        return [(name, self.value)]
+
+
+class Summary(object):
+
+    """Count and sum of observed values, like the time of each search."""
+
+    def __init__(self):
+        self.count = 0
+        self.sum = 0.0
+        self.lock = threading.Lock()
+
+    def observe(self, value: float):
+        with self.lock:
+            self.count += 1
+            self.sum += value
+
+    def samples(self, name: str) -> List[Tuple[str, float]]:
+        with self.lock:
+            return [(name + '_count', self.count), (name + '_sum', self.sum)]
+
+
+Metric = Union[Counter, Gauge, Summary]
+
+
+class Metrics(object):
+
+    """
+    The runtime metrics of picochess, rendered in the Prometheus text format for the /metrics page.
+
+    The modules get their counters once by name and labels and update them in their hot paths.
+    Values only known on request (like queue sizes) come from collectors called while rendering.
+    """
+
+    def __init__(self):
+        self.families: Dict[str, Tuple[str, str, Dict[Labels, Metric]]] = {}  # name => type, help, labels => metric
+        self.collectors: List[Callable[[], Iterable[Sample]]] = []
+        self.lock = threading.Lock()
+
+    def _metric(self, kind: str, factory, name: str, help_text: str, labels: Dict[str, str]):
+        key = tuple(sorted(labels.items()))
+        with self.lock:
+            family = self.families.setdefault(name, (kind, help_text, {}))
+            if family[0] != kind:
+                raise ValueError('metric {} is a {}'.format(name, family[0]))
+            metric = family[2].get(key)
+            if metric is None:
+                metric = family[2][key] = factory()
+            return metric
+
+    def counter(self, name: str, help_text: str, **labels: str) -> Counter:
+        return self._metric('counter', Counter, name, help_text, labels)
+
+    def gauge(self, name: str, help_text: str, **labels: str) -> Gauge:
+        return self._metric('gauge', Gauge, name, help_text, labels)
+
+    def summary(self, name: str, help_text: str, **labels: str) -> Summary:
+        return self._metric('summary', Summary, name, help_text, labels)
+
+    def add_collector(self, collector: Callable[[], Iterable[Sample]]):
+        """Add a function returning samples when the metrics are rendered."""
+        self.collectors.append(collector)
+
+    def render(self) -> str:
+        """Return all metrics in the Prometheus text exposition format."""
+        families: Dict[str, Tuple[str, str, List[Tuple[str, Dict[str, str], float]]]] = {}
+        with self.lock:
+            registered = [(name, kind, help_text, list(metrics.items()))
+                          for name, (kind, help_text, metrics) in self.families.items()]
+        for name, kind, help_text, metrics in registered:
+            samples = families.setdefault(name, (kind, help_text, []))[2]
+            for key, metric in metrics:
+                samples.extend((sample, dict(key), value) for sample, value in metric.samples(name))
+        for collector in self.collectors:
+            for name, kind, help_text, labels, value in collector():
+                families.setdefault(name, (kind, help_text, []))[2].append((name, labels, value))
+
+        lines = []
+        for name in sorted(families):
+            kind, help_text, samples = families[name]
+            lines.append('# HELP {} {}'.format(name, help_text))
+            lines.append('# TYPE {} {}'.format(name, kind))
+            for sample, labels, value in samples:
+                lines.append('{}{} {}'.format(sample, _format_labels(labels), _format_value(value)))
+        return '\n'.join(lines) + '\n'
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ''
+    escaped = (str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+               for value in labels.values())
+    return '{' + ','.join('{}="{}"'.format(key, value) for key, value in zip(labels, escaped)) + '}'
+
+
+def _format_value(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def _resident_memory() -> int:
+    try:
+        with open('/proc/self/statm') as statm:
+            return int(statm.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        import resource  # not on windows
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024  # peak only, better than nothing
+
+
+def runtime_samples() -> Iterable[Sample]:
+    """Return the queue sizes, threads and memory of picochess."""
+    yield 'picochess_queue_size', 'gauge', 'Items waiting in a queue', {'queue': 'evt_queue'}, evt_queue.qsize()
+    yield 'picochess_queue_size', 'gauge', 'Items waiting in a queue', {'queue': 'dispatch_queue'}, \
+        dispatch_queue.qsize()
+    for queue_name, devices in (('msg_queue', msgdisplay_devices), ('dgt_queue', dgtdisplay_devices)):
+        seen: Dict[str, int] = {}
+        for device in list(devices):
+            display = type(device).__name__
+            seen[display] = seen.get(display, 0) + 1
+            if seen[display] > 1:
+                display += str(seen[display])
+            que = device.msg_queue if queue_name == 'msg_queue' else device.dgt_queue
+            yield 'picochess_queue_size', 'gauge', 'Items waiting in a queue', \
+                {'queue': queue_name, 'display': display}, que.qsize()
+    yield 'picochess_threads', 'gauge', 'Running threads', {}, threading.active_count()
+    yield 'process_resident_memory_bytes', 'gauge', 'Resident memory size in bytes', {}, _resident_memory()
+    yield 'process_cpu_seconds_total', 'counter', 'User and system CPU time in seconds', {}, time.process_time()
+
+
+metrics = Metrics()
+metrics.add_collector(runtime_samples)
+
+
+def eboard_frames(board: str) -> Counter:
+    """Return the counter of the frames received from an e-board, its rate is the frame rate."""
+    return metrics.counter('picochess_eboard_frames_total', 'Frames received from the e-board', board=board)
@@ -18,12 +18,13 @@
 import threading
 import base64
 import datetime
+import json
 import logging
 import os
 import queue
+import time
 import dgt.util
 import mimetypes
-import requests
 import chess  # type: ignore
 import chess.pgn  # type: ignore
 import subprocess
@@ -34,7 +35,7 @@ from email.mime.audio import MIMEAudio
 from email.mime.base import MIMEBase
 from email.mime.image import MIMEImage
 from email.mime.text import MIMEText
-from typing import Optional
+from typing import List, Optional, Tuple
 from timecontrol import TimeControl
 from utilities import DisplayMsg
 from dgt.api import Dgt, Message
@@ -196,6 +197,8 @@ class Emailer(object):
 
     """Handle eMail with subject, body and an attached file."""
 
+    SMTP_TIMEOUT = 30  # seconds, a hanging mail server must not hold back the outbox forever
+
     def __init__(self, email=None, mailgun_key=None):
         if email:  # check if email address is provided by picochess.ini
             self.email = email
@@ -226,6 +229,7 @@ class Emailer(object):
             logger.debug("SMTP Mail delivery: Import standard SMTP Lib (no SSL encryption)")
             from smtplib import SMTP
         conn = False
+        success = False
         try:
             outer = MIMEMultipart()
             outer["Subject"] = subject  # put subject to mail
@@ -255,7 +259,7 @@ class Emailer(object):
             outer.attach(msg)
 
             logger.debug("SMTP Mail delivery: trying to connect to " + self.smtp_server)
-            conn = SMTP(self.smtp_server)  # contact smtp server
+            conn = SMTP(self.smtp_server, timeout=self.SMTP_TIMEOUT)  # contact smtp server
             conn.set_debuglevel(False)  # no debug info from smtp lib
             if self.smtp_user is not None and self.smtp_pass is not None:
                 logger.debug("SMTP Mail delivery: trying to log to SMTP Server")
@@ -264,6 +268,7 @@ class Emailer(object):
             logger.debug("SMTP Mail delivery: trying to send email")
             conn.sendmail(self.smtp_from, self.email, outer.as_string())
             logger.debug("SMTP Mail delivery: successfuly delivered message to SMTP server")
+            success = True
         except Exception as smtp_exc:
             logger.error("SMTP Mail delivery: Failed")
             logger.error("SMTP Mail delivery: " + str(smtp_exc))
@@ -271,19 +276,28 @@ class Emailer(object):
             if conn:
                 conn.close()
             logger.debug("SMTP Mail delivery: Ended")
+        return success
 
     def _use_mailgun(self, subject, body):
-        out = requests.post(
-            "https://api.mailgun.net/v3/picochess.org/messages",
-            auth=("api", self.mailgun_key),
-            data={
-                "from": "Your PicoChess computer <no-reply@picochess.org>",
-                "to": self.email,
-                "subject": subject,
-                "text": body,
-            },
-        )
+        import requests  # slow to import on a Pi, only needed for mailgun
+
+        try:
+            out = requests.post(
+                "https://api.mailgun.net/v3/picochess.org/messages",
+                auth=("api", self.mailgun_key),
+                data={
+                    "from": "Your PicoChess computer <no-reply@picochess.org>",
+                    "to": self.email,
+                    "subject": subject,
+                    "text": body,
+                },
+                timeout=30,
+            )
+        except requests.exceptions.RequestException as mailgun_exc:
+            logger.error("Mailgun delivery: " + str(mailgun_exc))
+            return False
         logger.debug(out)
+        return out.ok
 
     def set_smtp(self, sserver=None, sencryption=None, suser=None, spass=None, sfrom=None):
         """Store information for SMTP based mail delivery."""
@@ -293,15 +307,128 @@ class Emailer(object):
         self.smtp_pass = spass
         self.smtp_from = sfrom
 
-    def send(self, subject: str, body: str, path: str):
-        """Send the email out."""
+    def channels(self) -> List[str]:
+        """Return the configured delivery channels, "mailgun" and/or "smtp"."""
+        channels = []
         if self.email:  # check if email address to send the pgn to is provided
-            if (
-                self.mailgun_key
-            ):  # check if we have mailgun-key available to send the pgn successful
-                self._use_mailgun(subject=subject, body=body)
+            if self.mailgun_key:  # check if we have mailgun-key available to send the pgn successful
+                channels.append("mailgun")
             if self.smtp_server:  # check if smtp server address provided
-                self._use_smtp(subject=subject, body=body, path=path)
+                channels.append("smtp")
+        return channels
+
+    def send_by(self, channel: str, subject: str, body: str, path: str) -> bool:
+        """Send the email out on one channel and return False if the delivery failed."""
+        if channel == "mailgun":
+            return self._use_mailgun(subject=subject, body=body)
+        return self._use_smtp(subject=subject, body=body, path=path)
+
+    def send(self, subject: str, body: str, path: str) -> bool:
+        """Send the email out and return False if a delivery failed."""
+        success = True
+        for channel in self.channels():
+            success = self.send_by(channel, subject, body, path) and success
+        return success
+
+
+class PgnOutbox(threading.Thread):
+
+    """Deliver the emails of finished games without blocking the PgnDisplay.
+
+    Mails are stored as json files inside the outbox folder before any delivery attempt,
+    so they survive a restart. Failed deliveries are retried with an increasing delay, only on
+    the channels which failed, and all mails due at the same time are sent together as one email.
+    """
+
+    RETRY_DELAY = 30  # seconds until the first retry, doubled with every failed attempt
+    RETRY_DELAY_MAX = 3600
+    MAX_ATTEMPTS = 12
+
+    def __init__(self, emailer: Optional[Emailer], outbox_path: str = "games" + os.sep + "outbox"):
+        super(PgnOutbox, self).__init__(daemon=True)
+        self.emailer = emailer
+        self.outbox_path = outbox_path
+        self.wakeup: queue.Queue = queue.Queue()
+
+    def add_mail(self, subject: str, body: str, path: str):
+        """Store a mail in the outbox and wake up the delivery."""
+        self._enqueue_mail(subject, body, path)
+        self.wakeup.put(None)
+
+    def _enqueue_mail(self, subject: str, body: str, path: str):
+        os.makedirs(self.outbox_path, exist_ok=True)
+        mail = {"subject": subject, "body": body, "path": path, "attempts": 0, "next_try": 0.0,
+                "channels": self.emailer.channels() if self.emailer else []}
+        mail_name = os.path.join(self.outbox_path, "{:.6f}.json".format(time.time()))
+        with open(mail_name + ".tmp", "w") as mail_file:
+            json.dump(mail, mail_file)
+        os.replace(mail_name + ".tmp", mail_name)  # only complete mails show up in the outbox
+
+    def _pending_mails(self) -> List[Tuple[str, dict]]:
+        try:
+            mail_names = sorted(name for name in os.listdir(self.outbox_path) if name.endswith(".json"))
+        except FileNotFoundError:
+            return []
+        mails = []
+        for name in mail_names:
+            mail_name = os.path.join(self.outbox_path, name)
+            try:
+                with open(mail_name) as mail_file:
+                    mails.append((mail_name, json.load(mail_file)))
+            except (OSError, ValueError):
+                logger.warning("removing unreadable outbox mail [%s]", mail_name)
+                os.remove(mail_name)
+        return mails
+
+    def _deliver(self):
+        """Send all mails which are due, batched by subject and attachment."""
+        now = time.time()
+        batches: dict = {}
+        for mail_name, mail in self._pending_mails():
+            if mail["next_try"] <= now:
+                channels = tuple(mail.get("channels", self.emailer.channels()))  # mails of older versions
+                batches.setdefault((mail["subject"], mail["path"], channels), []).append((mail_name, mail))
+
+        for (subject, path, channels), mails in batches.items():
+            logger.debug("delivering %i mail(s) from outbox", len(mails))
+            body = "\n\n".join(mail["body"] for _, mail in mails)
+            failed = [channel for channel in channels if not self.emailer.send_by(channel, subject, body, path)]
+            if not failed:
+                for mail_name, _ in mails:
+                    os.remove(mail_name)
+                continue
+            for mail_name, mail in mails:
+                mail["channels"] = failed  # dont send it again where it was delivered
+                mail["attempts"] += 1
+                if mail["attempts"] >= self.MAX_ATTEMPTS:
+                    logger.error("giving up on outbox mail [%s] after %i attempts", mail_name, mail["attempts"])
+                    os.remove(mail_name)
+                    continue
+                delay = min(self.RETRY_DELAY_MAX, self.RETRY_DELAY * 2 ** (mail["attempts"] - 1))
+                mail["next_try"] = now + delay
+                logger.debug("outbox mail [%s] failed, next try in %is", mail_name, delay)
+                with open(mail_name, "w") as mail_file:
+                    json.dump(mail, mail_file)
+
+    def _next_wakeup(self) -> Optional[float]:
+        """Return the seconds until the next retry is due or None if there is nothing to send."""
+        if not (self.emailer and self.emailer.email):
+            return None  # the mails wait for an email address
+        mails = self._pending_mails()
+        if not mails:
+            return None
+        return max(0.0, min(mail["next_try"] for _, mail in mails) - time.time())
+
+    def run(self):
+        """Call by threading.Thread start() function."""
+        logger.info("pgn outbox ready")
+        while True:
+            try:
+                self.wakeup.get(timeout=self._next_wakeup())
+            except queue.Empty:
+                pass
+            if self.emailer and self.emailer.email:
+                self._deliver()
 
 
 class PgnDisplay(DisplayMsg, threading.Thread):
@@ -331,6 +458,7 @@ class PgnDisplay(DisplayMsg, threading.Thread):
         self.mode = ""
         self.startime = datetime.datetime.now().strftime("%H:%M:%S")
         self.last_saved_game = None
+        self.outbox = PgnOutbox(emailer)
 
     def _generate_pgn_from_message(self, message):
         pgn_game = chess.pgn.Game().from_board(message.game)
@@ -464,32 +592,41 @@ class PgnDisplay(DisplayMsg, threading.Thread):
     def _save_and_email_pgn(self, message):
         logger.debug("Saving game to [%s]", self.file_name)
         pgn_game = self._generate_pgn_from_message(message)
-        pgn_game_last = pgn_game
 
         # If we already saved the exact same game, do not
         # save it again, and do not send an email
-        logger.debug(
-            "Comparing current game to last save game:\nCurrent Game: %s\nLast Saved Game: %s",
-            pgn_game,
-            self.last_saved_game,
-        )
-        if str(pgn_game) == str(self.last_saved_game):
+        current_game, last_saved_game = str(pgn_game), str(self.last_saved_game)  # exporting is expensive
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                "Comparing current game to last save game:\nCurrent Game: %s\nLast Saved Game: %s",
+                current_game,
+                last_saved_game,
+            )
+        if current_game == last_saved_game:
             logger.debug("Current game is the same as last saved gamed, skipping")
             return
         self.last_saved_game = pgn_game
 
+        # the files are written right away, so the game is saved even at a shutdown
+        try:
+            self._write_game(pgn_game)
+        except OSError as write_exc:
+            logger.error("could not save game to [%s]: %s", self.file_name, write_exc)
+        # sending the email is done by the outbox thread
+        if self.emailer and self.emailer.email:
+            self.outbox.add_mail("Game PGN", current_game, self.file_name)
+
+    def _write_game(self, pgn_game: chess.pgn.Game):
         # Save to last game file
         with open(self.last_file_name, "w") as last_file:
             last_exporter = chess.pgn.FileExporter(last_file)
-            pgn_game_last.accept(last_exporter)
+            pgn_game.accept(last_exporter)
 
         # Append to all games file
         with open(self.file_name, "a") as file:
             exporter = chess.pgn.FileExporter(file)
             pgn_game.accept(exporter)
 
-        self.emailer.send("Game PGN", str(pgn_game), self.file_name)
-
     def _save_pgn(self, message):
         l_file_name = "games" + os.sep + message.pgn_filename
         logger.debug("Saving PGN game to [%s]", l_file_name)
@@ -637,6 +774,7 @@ class PgnDisplay(DisplayMsg, threading.Thread):
     def run(self):
         """Call by threading.Thread start() function."""
         logger.info("msg_queue ready")
+        self.outbox.start()
         while True:
             # Check if we have something to display
             try:
@@ -30,13 +30,15 @@ import logging
 from logging.handlers import RotatingFileHandler
 import time
 import queue
-import paramiko
 import math
-from typing import Any, List, Optional, Set, Tuple
+from typing import Any, List, Optional, Set, Tuple, Union
 
 from configuration import Configuration
-from uci.engine import UciShell, UciEngine
+from uci.engine import UciShell, UciEngine, UciTcpShell, is_engine_host_address
 from uci.engine_provider import EngineProvider
+from uci.standby import EngineStandby
+from uci.speculation import SpeculativeBrain
+from uci.evalcache import eval_cache
 from uci.rating import Rating, determine_result
 import chess  # type: ignore
 import chess.pgn  # type: ignore
@@ -45,6 +47,11 @@ import chess.uci  # type: ignore
 
 from timecontrol import TimeControl
 from theme import calc_theme
+from importprofile import log_import_profile
+from logqueue import start_logging
+from metrics import metrics
+from startup import Startup
+from tracing import MOVE_EVENTS, trace_args, tracer
 from utilities import (
     get_location,
     update_picochess,
@@ -64,7 +71,6 @@ from utilities import (
     get_engine_mame_par,
 )
 from pgn import Emailer, PgnDisplay, ModeInfo
-from server import WebServer
 from picotalker import PicoTalkerDisplay
 from dispatcher import Dispatcher
 
@@ -72,14 +78,10 @@ from dgt.api import Dgt, Message, Event
 import dgt.util
 from dgt.util import GameResult, TimeMode, Mode, PlayMode, PicoComment, PicoCoach
 from dgt.hw import DgtHw
-from dgt.pi import DgtPi
 from dgt.display import DgtDisplay
 from eboard.eboard import EBoard
+import eboard.recorder
 from dgt.board import DgtBoard, Rev2Info
-from eboard.chesslink.board import ChessLinkBoard
-from eboard.chessnut.board import ChessnutBoard
-from eboard.ichessone.board import IChessOneBoard
-from eboard.certabo.board import CertaboBoard
 from dgt.translate import DgtTranslate
 from dgt.menu import DgtMenu
 
@@ -432,6 +434,8 @@ class PicochessState:
 
 
 def check_ssh(host, username, password) -> bool:
+    import paramiko  # slow to import, only needed for remote engines
+
     try:
         s = paramiko.SSHClient()
         s.set_missing_host_key_policy(paramiko.AutoAddPolicy())
@@ -1162,6 +1166,7 @@ def main() -> None:
         else:
             delay = 4
             state.delay_fen_error = 4
+        # own thread: the handler sleeps and talks to the engine, too slow for the shared scheduler
         state.fen_timer = threading.Timer(delay, expired_fen_timer, args=[state])
         state.fen_timer.start()
         state.fen_timer_running = True
@@ -1193,6 +1198,18 @@ def main() -> None:
                 time.sleep(0.05)
                 logger.warning("engine is still not waiting")
             uci_dict = timec.uci()
+            speculated = (
+                speculation.lookup(game, uci_dict)
+                if state.interaction_mode == Mode.BRAIN and not searchlist  # excluded moves were not searched
+                else None
+            )
+            if speculated:
+                logger.info("speculative brain answers with [%s]", speculated.bestmove)
+                Observable.fire(
+                    Event.BEST_MOVE(move=speculated.bestmove, ponder=speculated.ponder, inbook=False)
+                )
+                state.automatic_takeback = False
+                return
             if searchlist:
                 # molli: otherwise might lead to problems with internal books
                 uci_dict["searchmoves"] = state.searchmoves.all(game)
@@ -1216,6 +1233,7 @@ def main() -> None:
         """Start a new ponder search on the current game."""
         DisplayMsg.show(msg)
         engine.position(copy.deepcopy(game))
+        engine.show_cached_evaluation()
         engine.ponder()
 
     def observe(game: chess.Board, msg: Message):
@@ -1223,6 +1241,16 @@ def main() -> None:
         analyse(game, msg)
         state.start_clock()
 
+    def predict_user_moves(game: chess.Board):
+        """Return the moves the user will probably play, most likely first."""
+        moves = [
+            entry.move()
+            for entry in sorted(bookreader.find_all(game), key=lambda entry: entry.weight, reverse=True)
+        ]
+        if picotutor_mode(state):
+            moves.extend(state.picotutor.get_best_moves(game))
+        return moves
+
     def brain(game: chess.Board, timec: TimeControl, state: PicochessState):
         """Start a new permanent brain search on the game with pondering move made."""
         assert not state.done_computer_fen, (
@@ -1236,13 +1264,16 @@ def main() -> None:
                 state.pb_move,
                 game_copy.fen(),
             )
-            engine.position(game_copy)
-            engine.brain(timec.uci())
+            game_copy.pop()
+            speculation.start(
+                engine, game_copy, state.pb_move, lambda: predict_user_moves(game_copy), timec.uci()
+            )
         else:
             logger.info("ignore permanent brain cause no pondering move available")
 
     def stop_search_and_clock(ponder_hit=False):
         """Depending on the interaction mode stop search and clock."""
+        speculation.cancel(keep_brain=ponder_hit)
         if state.interaction_mode in (Mode.NORMAL, Mode.BRAIN, Mode.TRAINING):
             state.stop_clock()
             if engine.is_waiting():
@@ -1260,6 +1291,7 @@ def main() -> None:
 
     def stop_search():
         """Stop current search."""
+        speculation.cancel(keep_brain=False)
         engine.stop()
         if not emulation_mode():
             while not engine.is_waiting():
@@ -1274,11 +1306,13 @@ def main() -> None:
         state.take_back_locked = False
 
         logger.info("user move [%s] sliding: %s", move, sliding)
+        tracer.instant("user move", "main", move=move.uci())
         if move not in state.game.legal_moves:
             logger.warning("illegal move [%s]", move)
         else:
             if state.interaction_mode == Mode.BRAIN:
-                ponder_hit = move == state.pb_move
+                speculation.cancel()
+                ponder_hit = speculation.is_brain_on(move) and move == state.pb_move
                 logger.info(
                     "pondering move: [%s] res: Ponder%s",
                     state.pb_move,
@@ -2263,6 +2297,23 @@ def main() -> None:
             state.start_clock()
             state.legal_fens = compute_legal_fens(state.game.copy())
 
+    def start_local_engine(file: str) -> UciEngine:
+        """Use the standby engine if it was prepared for the file, otherwise start it."""
+        mame_par = calc_engine_mame_par()
+        if engine_standby:
+            standby = engine_standby.take(file, mame_par)
+            if standby:
+                return standby
+        return UciEngine(file=file, uci_shell=uci_local_shell, mame_par=mame_par)
+
+    def prepare_standby_engine(last_file: str):
+        """Warm up the next standby engine after the engine in use changed."""
+        if not engine_standby or remote_engine_mode():
+            return
+        standby_file = last_file if args.engine_standby == "last" else args.engine_standby
+        if standby_file != state.engine_file:
+            engine_standby.prepare(standby_file, calc_engine_mame_par())
+
     def calc_engine_mame_par():
         return get_engine_mame_par(
             state.dgtmenu.get_engine_rspeed(), state.dgtmenu.get_engine_rsound()
@@ -2270,6 +2321,7 @@ def main() -> None:
 
     def takeback(state: PicochessState):
         stop_search_and_clock()
+        speculation.clear()
         l_error = False
         try:
             state.game.pop()
@@ -2312,12 +2364,7 @@ def main() -> None:
         handler = RotatingFileHandler(
             "logs" + os.sep + args.log_file, maxBytes=1 * 1024 * 1024, backupCount=5
         )
-        logging.basicConfig(
-            level=getattr(logging, args.log_level.upper()),
-            format="%(asctime)s.%(msecs)03d %(levelname)7s %(module)10s - %(funcName)s: %(message)s",
-            datefmt="%Y-%m-%d %H:%M:%S",
-            handlers=[handler],
-        )
+        start_logging(handler, getattr(logging, args.log_level.upper()))
     logging.getLogger("chess.engine").setLevel(
         logging.INFO
     )  # don't want to get so many python-chess uci messages
@@ -2332,6 +2379,8 @@ def main() -> None:
     if unknown:
         logger.warning("invalid parameter given %s", unknown)
 
+    # The slow startup steps run as parallel stages, the main thread waits for their results once it needs them
+    startup = Startup()
     EngineProvider.init()
 
     Rev2Info.set_dgtpi(args.dgtpi)
@@ -2350,15 +2399,24 @@ def main() -> None:
     except KeyError:
         board_type = dgt.util.EBoard.DGT
     ModeInfo.set_eboard_type(board_type)
+    eboard.recorder.configure(args.eboard_record, args.eboard_replay, args.eboard_replay_speed)
 
-    # wire some dgt classes
+    # wire some dgt classes, only the driver of the used eboard is imported
     if board_type == dgt.util.EBoard.CHESSLINK:
+        from eboard.chesslink.board import ChessLinkBoard
+
         dgtboard: EBoard = ChessLinkBoard()
     elif board_type == dgt.util.EBoard.CHESSNUT:
+        from eboard.chessnut.board import ChessnutBoard
+
         dgtboard = ChessnutBoard()
     elif board_type == dgt.util.EBoard.ICHESSONE:
+        from eboard.ichessone.board import IChessOneBoard
+
         dgtboard = IChessOneBoard()
     elif board_type == dgt.util.EBoard.CERTABO:
+        from eboard.certabo.board import CertaboBoard
+
         dgtboard = CertaboBoard()
     else:
         dgtboard = DgtBoard(
@@ -2439,24 +2497,41 @@ def main() -> None:
         # samples: no sounds
         sample_beeper = False
 
-    pico_talker = PicoTalkerDisplay(
-        args.user_voice,
-        args.computer_voice,
-        args.speed_voice,
-        args.enable_setpieces_voice,
-        args.comment_factor,
-        sample_beeper,
-        sample_beeper_level,
-        board_type,
-    )
+    def start_voice():
+        pico_talker = PicoTalkerDisplay(
+            args.user_voice,
+            args.computer_voice,
+            args.speed_voice,
+            args.enable_setpieces_voice,
+            args.comment_factor,
+            sample_beeper,
+            sample_beeper_level,
+            board_type,
+        )
+        pico_talker.start()
+        return pico_talker
 
-    pico_talker.start()
+    def connect_eboard():
+        if args.dgtpi:
+            from dgt.pi import DgtPi
+
+            DgtPi(dgtboard).start()
+        else:
+            logger.debug("(ser) starting the board connection")
+            dgtboard.run()  # a clock can only be online together with the board, so we must start it infront
+        DgtHw(dgtboard).start()
+
+    def start_web_server():
+        from server import WebServer  # tornado and flask are slow to import, not needed without web server
+
+        WebServer(args.web_server_port, dgtboard, startup.result("location")).start()
+
+    startup.add("voice", start_voice)
 
     # Launch web server
     if args.web_server_port:
-        WebServer(
-            args.web_server_port, dgtboard, calc_theme(args.theme, state.set_location)
-        ).start()
+        startup.add("location", lambda: calc_theme(args.theme, state.set_location))
+        startup.add("web", start_web_server, after=["location"])
         dgtdispatcher.register("web")
 
     if board_type == dgt.util.EBoard.NOEBOARD:
@@ -2464,13 +2539,9 @@ def main() -> None:
     else:
         # Connect to DGT board
         logger.debug("starting PicoChess in board mode")
+        startup.add("eboard", connect_eboard)
         if args.dgtpi:
-            DgtPi(dgtboard).start()
             dgtdispatcher.register("i2c")
-        else:
-            logger.debug("(ser) starting the board connection")
-            dgtboard.run()  # a clock can only be online together with the board, so we must start it infront
-        DgtHw(dgtboard).start()
         dgtdispatcher.register("ser")
 
     # The class Dispatcher sends DgtApi messages at the correct (delayed) time out
@@ -2505,9 +2576,6 @@ def main() -> None:
         12, display_ip_info, args=[state]
     )  # give RaspberyPi 10sec time to startup its network devices
     ip_info_thread.start()
-
-    state.fen_timer = threading.Timer(4, expired_fen_timer, args=[state])
-    state.fen_timer_running = False
     ###########################################
 
     # try the given engine first and if that fails the first from "engines.ini" then exit
@@ -2516,27 +2584,58 @@ def main() -> None:
     engine_remote_home = args.engine_remote_home.rstrip(os.sep)
 
     engine_name = None
-    uci_remote_shell = None
+    uci_remote_shell: Optional[Union[UciShell, UciTcpShell]] = None
 
     uci_local_shell = UciShell(hostname="", username="", key_file="", password="")
+    speculation = SpeculativeBrain(args.engine_brain_candidates, args.engine_brain_slice)
+    eval_cache.configure(args.eval_cache_size, args.eval_cache_file)
+    engine_standby = (
+        EngineStandby(uci_local_shell, args.engine_standby_memory) if args.engine_standby else None
+    )
 
     if engine_file is None:
         engine_file = EngineProvider.installed_engines[0]["file"]
 
     state.engine_file = engine_file
     state.artwork_in_use = False
-    if "/mame/" in engine_file and state.dgtmenu.get_engine_rdisplay():
-        time.sleep(20)
-        engine_file_art = engine_file + "_art"
-        my_file = Path(engine_file_art)
-        if my_file.is_file():
-            state.artwork_in_use = True
-            engine_file = engine_file_art
-
-    engine = UciEngine(
-        file=engine_file, uci_shell=uci_local_shell, mame_par=calc_engine_mame_par()
+
+    if args.pgn_elo and args.pgn_elo.isnumeric() and args.rating_deviation:
+        state.rating = Rating(float(args.pgn_elo), float(args.rating_deviation))
+    args.engine_level = None if args.engine_level == "None" else args.engine_level
+    if args.engine_level == '""':
+        args.engine_level = None
+    engine_opt, level_index = get_engine_level_dict(args.engine_level)
+
+    def start_engine():
+        file_name = state.engine_file
+        if "/mame/" in file_name and state.dgtmenu.get_engine_rdisplay():
+            time.sleep(20)
+            engine_file_art = file_name + "_art"
+            my_file = Path(engine_file_art)
+            if my_file.is_file():
+                state.artwork_in_use = True
+                file_name = engine_file_art
+
+        uci_engine = UciEngine(
+            file=file_name, uci_shell=uci_local_shell, mame_par=calc_engine_mame_par()
+        )
+        try:
+            uci_engine.get_name()
+        except AttributeError:
+            return uci_engine, file_name  # not started, reported by the main thread
+        uci_engine.startup(engine_opt, state.rating)
+        return uci_engine, file_name
+
+    state.comment_file = get_comment_file()
+    startup.add("engine", start_engine)
+    startup.add(
+        "tutor",
+        lambda: PicoTutor(
+            i_engine_path=tutor_engine, i_comment_file=state.comment_file, i_lang=args.language
+        ),
     )
 
+    engine, engine_file = startup.result("engine")
     try:
         engine_name = engine.get_name()
     except AttributeError:
@@ -2563,13 +2662,8 @@ def main() -> None:
     bookreader = chess.polyglot.open_reader(all_books[book_index]["file"])
     state.searchmoves = AlternativeMover()
 
-    if args.pgn_elo and args.pgn_elo.isnumeric() and args.rating_deviation:
-        state.rating = Rating(float(args.pgn_elo), float(args.rating_deviation))
-    args.engine_level = None if args.engine_level == "None" else args.engine_level
-    if args.engine_level == '""':
-        args.engine_level = None
-    engine_opt, level_index = get_engine_level_dict(args.engine_level)
-    engine.startup(engine_opt, state.rating)
+    if engine_standby and args.engine_standby != "last":
+        prepare_standby_engine(state.engine_file)
 
     if (
         emulation_mode()
@@ -2607,6 +2701,9 @@ def main() -> None:
         "rspeed": round(float(args.rspeed), 2),
     }
 
+    pico_talker = startup.result("voice")  # the displays must be listening to the startup messages
+    if args.web_server_port:
+        startup.result("web")
     DisplayMsg.show(Message.SYSTEM_INFO(info=sys_info))
     DisplayMsg.show(
         Message.STARTUP_INFO(
@@ -2662,10 +2759,7 @@ def main() -> None:
     logger.debug("lc0: set_add_timecontrol after startup")
     set_add_timecontrol(state)
 
-    state.comment_file = get_comment_file()
-    state.picotutor = PicoTutor(
-        i_engine_path=tutor_engine, i_comment_file=state.comment_file, i_lang=args.language
-    )
+    state.picotutor = startup.result("tutor")
     state.picotutor.set_status(
         state.dgtmenu.get_picowatcher(),
         state.dgtmenu.get_picocoach(),
@@ -2682,6 +2776,15 @@ def main() -> None:
     if state.dgtmenu.get_enginename():
         DisplayMsg.show(Message.ENGINE_NAME(engine_name=state.engine_text))
 
+    for name in startup.stages:
+        startup.result(name)  # a failed stage stops picochess, like before it ran in parallel
+    for line in startup.report():
+        logger.log(logging.WARNING if args.profile_startup else logging.INFO, "startup %s", line)
+    if args.profile_startup:
+        # the modules imported at startup, measured in a new python process not to slow down this one
+        modules = ["picochess", type(dgtboard).__module__] + (["server"] if args.web_server_port else [])
+        threading.Thread(target=log_import_profile, args=(modules,), daemon=True).start()
+
     # Event loop
     logger.info("evt_queue ready")
     while True:
@@ -2690,6 +2793,8 @@ def main() -> None:
         except queue.Empty:
             pass
         else:
+            started = time.monotonic()
+            trace_start = tracer.now()
             logger.debug("received event from evt_queue: %s", event)
             if isinstance(event, Event.FEN):
                 process_fen(event.fen, state)
@@ -2706,6 +2811,8 @@ def main() -> None:
                     DisplayMsg.show(Message.DGT_FEN(fen=fen, raw=False))
 
             elif isinstance(event, Event.LEVEL):
+                speculation.clear()
+                engine.forget_cached_evaluations()
                 if event.options:
                     engine.startup(event.options, state.rating)
                 state.new_engine_level = event.level_name
@@ -2725,6 +2832,8 @@ def main() -> None:
                 # Stop the old engine cleanly
                 if not emulation_mode():
                     stop_search()
+                speculation.clear()
+                engine.forget_cached_evaluations()
                 # Closeout the engine process and threads
 
                 engine_file = event.eng["file"]
@@ -2743,9 +2852,17 @@ def main() -> None:
                 remote_file = engine_remote_home + os.sep + help_str
 
                 flag_eng = False
-                flag_eng = check_ssh(
-                    args.engine_remote_server, args.engine_remote_user, args.engine_remote_pass
-                )
+                if uci_remote_shell:
+                    flag_eng = uci_remote_shell.is_connected()
+                elif is_engine_host_address(args.engine_remote_server):
+                    uci_remote_shell = UciTcpShell(
+                        args.engine_remote_server, token=args.engine_remote_pass or ""
+                    )
+                    flag_eng = uci_remote_shell.is_connected()
+                else:
+                    flag_eng = check_ssh(
+                        args.engine_remote_server, args.engine_remote_user, args.engine_remote_pass
+                    )
 
                 logger.debug("molli check_ssh:%s", flag_eng)
                 DisplayMsg.show(Message.ENGINE_SETUP())
@@ -2786,11 +2903,7 @@ def main() -> None:
                             mame_par=calc_engine_mame_par(),
                         )
                     else:
-                        engine = UciEngine(
-                            file=engine_file,
-                            uci_shell=uci_local_shell,
-                            mame_par=calc_engine_mame_par(),
-                        )
+                        engine = start_local_engine(engine_file)
                     try:
                         engine_name = engine.get_name()
                     except AttributeError:
@@ -2979,6 +3092,7 @@ def main() -> None:
                         state.new_engine_level = state.old_engine_level
                     else:
                         state.searchmoves.reset()
+                        prepare_standby_engine(old_file)
                         msg = Message.ENGINE_READY(
                             eng=event.eng,
                             engine_name=engine_name,
@@ -3184,6 +3298,7 @@ def main() -> None:
                 time.sleep(1)
 
             elif isinstance(event, Event.NEW_GAME):
+                speculation.clear()
                 last_move_no = state.game.fullmove_number
                 state.takeback_active = False
                 state.automatic_takeback = False
@@ -4484,6 +4599,7 @@ def main() -> None:
                     DisplayMsg.show(Message.PICOCOMMENT(picocomment=event.picocomment))
 
             elif isinstance(event, Event.SET_TIME_CONTROL):
+                speculation.clear()
                 state.time_control.stop_internal(log=False)
                 
                 tc_init = event.tc_init
@@ -4601,6 +4717,9 @@ def main() -> None:
                 stop_search()
                 state.stop_clock()
                 engine.quit()
+                if engine_standby:
+                    engine_standby.quit()
+                eval_cache.save()
 
                 try:
                     if uci_remote_shell:
@@ -4631,6 +4750,9 @@ def main() -> None:
                 stop_search()
                 state.stop_clock()
                 engine.quit()
+                if engine_standby:
+                    engine_standby.quit()
+                eval_cache.save()
                 result = GameResult.ABORT
                 DisplayMsg.show(
                     Message.GAME_ENDS(
@@ -4650,6 +4772,9 @@ def main() -> None:
                 stop_search()
                 state.stop_clock()
                 engine.quit()
+                if engine_standby:
+                    engine_standby.quit()
+                eval_cache.save()
                 result = GameResult.ABORT
                 DisplayMsg.show(
                     Message.GAME_ENDS(
@@ -4710,6 +4835,11 @@ def main() -> None:
                 logger.warning("event not handled : [%s]", event)
 
             evt_queue.task_done()
+            metrics.summary(
+                "picochess_event_seconds", "Time the main loop took for an event", event=repr(event)
+            ).observe(time.monotonic() - started)
+            if isinstance(event, MOVE_EVENTS):
+                tracer.complete(repr(event), "main", trace_start, **trace_args(event))
 
 
 if __name__ == "__main__":
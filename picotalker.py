@@ -15,7 +15,8 @@
 # You should have received a copy of the GNU General Public License
 # along with this program. If not, see <http://www.gnu.org/licenses/>.
 
-# This version uses sox. It does not use pygame or ogg123 -RR
+# This version plays the voices through one pygame mixer stream and uses sox to decode them
+# (and for the speed factor). Without pygame it falls back to sox play. -RR
 # To install sox use:
 # sudo apt install sox
 
@@ -23,20 +24,144 @@ import threading
 import logging
 import subprocess
 import queue
+from collections import OrderedDict
 from pathlib import Path
 from shutil import which
 from random import randint
 import os
 import time
+from typing import Any, Dict, Type
 
 import chess  # type: ignore
 from utilities import DisplayMsg
 from dgt.api import Message
+from tracing import tracer
 from dgt.util import GameResult, PlayMode, Voice, EBoard
 
 logger = logging.getLogger(__name__)
 
 
+class AudioEngine(object):
+
+    """Decode the voice files once and play them through one persistent output stream."""
+
+    def __init__(self, cache_bytes: int = 16 * 1024 * 1024):
+        self.cache_bytes = cache_bytes
+        self.cache: OrderedDict = OrderedDict()  # (file, speed_factor) => pcm data
+        self.cached_bytes = 0
+        self.lock = threading.Lock()
+        self.mixer: Any = None  # pygame.mixer once started
+        self.mixer_error: Type[Exception] = OSError
+        self.mixer_format = (22050, -16, 1)  # frequency, size, channels
+        self.initialized = False
+
+    def _init_mixer(self):
+        self.initialized = True
+        os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+        try:
+            import pygame  # type: ignore
+        except ImportError:
+            logger.info("pygame not installed, using sox play")
+            return
+        try:
+            pygame.mixer.init(*self.mixer_format, buffer=1024)
+        except pygame.error as exc:  # no audio device
+            logger.info("audio engine not available, using sox play: %s", exc)
+            return
+        self.mixer_format = pygame.mixer.get_init()
+        self.mixer = pygame.mixer
+        self.mixer_error = pygame.error
+        logger.info("audio engine started with %s", self.mixer_format)
+
+    def _decode(self, voice_file: str, speed_factor: float):
+        """Return the sound of voice_file as pcm data in the mixer format."""
+        frequency, size, channels = self.mixer_format
+        if which("sox"):
+            command = ["sox", voice_file, "-t", "raw", "-r", str(frequency), "-e", "signed" if size < 0 else "unsigned",
+                       "-b", str(abs(size)), "-c", str(channels), "-"]
+            if speed_factor != 1.0:
+                command += ["tempo", str(speed_factor)]
+            return subprocess.run(command, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, check=True).stdout
+        return self.mixer.Sound(voice_file).get_raw()
+
+    def pcm(self, voice_file: str, speed_factor: float):
+        """Return the (cached) pcm data of voice_file."""
+        key = (voice_file, speed_factor)
+        with self.lock:
+            data = self.cache.get(key)
+            if data is not None:
+                self.cache.move_to_end(key)
+                return data
+        data = self._decode(voice_file, speed_factor)
+        with self.lock:
+            self.cache[key] = data
+            self.cached_bytes += len(data)
+            while self.cached_bytes > self.cache_bytes and len(self.cache) > 1:
+                self.cached_bytes -= len(self.cache.popitem(last=False)[1])
+        return data
+
+    def play(self, voice_files: list, speed_factor: float) -> bool:
+        """Play the voice_files one after another, return False if the engine is not available."""
+        if not self.initialized:
+            self._init_mixer()
+        if self.mixer is None:
+            return False
+        try:
+            data = b"".join(self.pcm(voice_file, speed_factor) for voice_file in voice_files)
+            channel = self.mixer.Sound(buffer=data).play()
+        except (OSError, subprocess.CalledProcessError, self.mixer_error) as exc:
+            logger.warning("audio engine failed: %s", exc)
+            return False
+        while channel is not None and channel.get_busy():  # block like sox play did
+            time.sleep(0.01)
+        return True
+
+
+audio_engine = AudioEngine()
+
+
+class VoiceManifest(object):
+
+    """Files of a voice folder, read once and only read again after the folder changed."""
+
+    manifests: Dict[str, "VoiceManifest"] = {}
+    lock = threading.Lock()
+
+    def __init__(self, voice_path: str, mtime_ns: int):
+        self.voice_path = voice_path
+        self.mtime_ns = mtime_ns
+        self.counts: Dict[str, int] = {}
+        try:
+            self.files = frozenset(entry.name for entry in os.scandir(voice_path) if entry.is_file())
+        except OSError:
+            logger.warning("voice path [%s] can not be read", voice_path)
+            self.files = frozenset()
+
+    @classmethod
+    def of(cls, voice_path: str) -> "VoiceManifest":
+        """Return the manifest of voice_path."""
+        try:
+            mtime_ns = os.stat(voice_path).st_mtime_ns
+        except OSError:
+            mtime_ns = -1
+        with cls.lock:
+            manifest = cls.manifests.get(voice_path)
+            if manifest is None or manifest.mtime_ns != mtime_ns:
+                manifest = VoiceManifest(voice_path, mtime_ns)
+                cls.manifests[voice_path] = manifest
+            return manifest
+
+    def has(self, file_name: str) -> bool:
+        """Return if the voice has this file."""
+        return file_name in self.files
+
+    def count(self, prefix: str) -> int:
+        """Return the number of files starting with prefix (e.g. a comment group)."""
+        if prefix not in self.counts:
+            self.counts[prefix] = sum(1 for file_name in self.files if file_name.startswith(prefix))
+        return self.counts[prefix]
+
+
 class PicoTalker(object):
 
     """Handle the human speaking of events."""
@@ -63,29 +188,33 @@ class PicoTalker(object):
         self.speed_factor = speed_factor if which("play") else 1.0  # check for "sox" package
 
     def talk(self, sounds):
-        """Speak out the sound part by using sox play."""
+        """Speak out the sound parts as one utterance by the audio engine or sox play."""
         if not self.voice_path:
             logger.debug("picotalker turned off")
             return False
 
         vpath = self.voice_path
-        result = False
+        manifest = VoiceManifest.of(vpath)
+        voice_files = []
         for part in sounds:
             voice_file = vpath + "/" + part
-            if Path(voice_file).is_file():
-                command = ["play", voice_file, "tempo", str(self.speed_factor)]
-                try:  # use blocking call
-                    subprocess.call(
-                        command, shell=False, stdout=subprocess.PIPE, stderr=subprocess.PIPE
-                    )
-                    result = True
-                except OSError as os_exc:
-                    logger.warning("OSError: %s => turn voice OFF", os_exc)
-                    self.voice_path = None
-                    return False
+            if manifest.has(part):
+                voice_files.append(voice_file)
             else:
                 logger.warning("voice file not found %s", voice_file)
-        return result
+        if not voice_files:
+            return False
+        if audio_engine.play(voice_files, self.speed_factor):
+            return True
+
+        command = ["play"] + voice_files + ["tempo", str(self.speed_factor)]  # sox plays the files in a row
+        try:  # use blocking call
+            subprocess.call(command, shell=False, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        except OSError as os_exc:
+            logger.warning("OSError: %s => turn voice OFF", os_exc)
+            self.voice_path = None
+            return False
+        return True
 
 
 class PicoTalkerDisplay(DisplayMsg, threading.Thread):
@@ -196,11 +325,8 @@ class PicoTalkerDisplay(DisplayMsg, threading.Thread):
         """
         c_group_no = 0
 
-        if self.computer_picotalker is not None:
-            path = self.computer_picotalker.voice_path
-            for file in os.listdir(path):
-                if file.startswith(filestring):
-                    c_group_no += 1
+        if self.computer_picotalker is not None and self.computer_picotalker.voice_path:
+            c_group_no = VoiceManifest.of(self.computer_picotalker.voice_path).count(filestring)
 
         return c_group_no
 
@@ -601,6 +727,7 @@ class PicoTalkerDisplay(DisplayMsg, threading.Thread):
                                 self.talk(["player_move.ogg"], self.BEEPER)
                             self.comment("beforecmove")
                             self.talk(self.say_last_move(game_copy), self.COMPUTER)
+                            tracer.instant("voice COMPUTER_MOVE", "voice", move=message.move.uci())
                             self.move_comment()
                             self.comment("cmove")
                             previous_move = message.move
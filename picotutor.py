@@ -24,6 +24,8 @@ import chess.uci  # type: ignore
 import chess.engine  # type: ignore
 from random import randint
 from dgt.util import PicoComment, PicoCoach
+from uci.evalcache import CachingInfoHandler, engine_identity, eval_cache
+from uci.informer import SearchMetrics
 from typing import Tuple
 
 # PicoTutor Constants
@@ -264,6 +266,11 @@ class PicoTutor:
         else:
             return "", False
 
+    def _identity(self):
+        # the tutor engines search with other options than the play engine, keep their evaluations apart
+        return engine_identity(self.engine_path, {"MultiPV": self.max_valid_moves, "Contempt": 0,
+                                                  "Threads": c.NUM_THREADS})
+
     def reset(self):
         self.pos = False
         self.legal_moves = []
@@ -287,10 +294,12 @@ class PicoTutor:
             self.engine2.setoption({"Threads": c.NUM_THREADS})
             self.engine.isready()
             self.engine2.isready()
-            self.info_handler = chess.uci.InfoHandler()
-            self.info_handler2 = chess.uci.InfoHandler()
+            self.info_handler = CachingInfoHandler(self.engine, self._identity())
+            self.info_handler2 = CachingInfoHandler(self.engine2, self._identity())
             self.engine.info_handlers.append(self.info_handler)
             self.engine2.info_handlers.append(self.info_handler2)
+            self.engine.info_handlers.append(SearchMetrics(self.engine, "tutor_deep"))
+            self.engine2.info_handlers.append(SearchMetrics(self.engine2, "tutor_low"))
             self.engine.position(self.board)
             self.engine2.position(self.board)
 
@@ -328,10 +337,12 @@ class PicoTutor:
         self.engine2.setoption({"Threads": c.NUM_THREADS})
         self.engine.isready()
         self.engine2.isready()
-        self.info_handler = chess.uci.InfoHandler()
-        self.info_handler2 = chess.uci.InfoHandler()
+        self.info_handler = CachingInfoHandler(self.engine, self._identity())
+        self.info_handler2 = CachingInfoHandler(self.engine2, self._identity())
         self.engine.info_handlers.append(self.info_handler)
         self.engine2.info_handlers.append(self.info_handler2)
+        self.engine.info_handlers.append(SearchMetrics(self.engine, "tutor_deep"))
+        self.engine2.info_handlers.append(SearchMetrics(self.engine2, "tutor_low"))
         self.engine.position(self.board)
         self.engine2.position(self.board)
 
@@ -483,11 +494,15 @@ class PicoTutor:
 
     def start(self):
         # after newgame event
-        if self.engine2:
+        # positions evaluated before (e.g. after a takeback) are taken from the cache
+        multipv = min(self.max_valid_moves, self.board.legal_moves.count())
+        if self.engine2 and not eval_cache.restore(
+            self.board, self.info_handler2, c.LOW_DEPTH, multipv, exact=True
+        ):
             self.engine2.position(self.board)
             self.engine2.go(depth=c.LOW_DEPTH, async_callback=True)
 
-        if self.engine:
+        if self.engine and not eval_cache.restore(self.board, self.info_handler, c.DEEP_DEPTH, multipv):
             self.engine.position(self.board)
             self.engine.go(depth=c.DEEP_DEPTH, async_callback=True)
 
@@ -757,6 +772,16 @@ class PicoTutor:
             return
         return self.mate, self.hint_move, self.pv_best_move, self.pv_user_move
 
+    def get_best_moves(self, game: chess.Board):
+        """Return the first moves of the tutor's MultiPV lines for game, best line first."""
+        if not (self.coach_on or self.watcher_on) or not self.info_handler:
+            return []
+        if self.board.fen() != game.fen():
+            return []
+        with self.info_handler:
+            pv_list = dict(self.info_handler.info["pv"])
+        return [pv_list[pv_key][0] for pv_key in sorted(pv_list) if pv_list[pv_key]]
+
     def get_pos_analysis(self):
         if not (self.coach_on or self.watcher_on):
             return
@@ -30,6 +30,8 @@ from tornado.ioloop import IOLoop  # type: ignore
 from tornado.websocket import WebSocketHandler  # type: ignore
 
 from utilities import Observable, DisplayMsg, hms_time, RepeatedTimer
+from metrics import metrics
+from tracing import tracer
 from web.picoweb import picoweb as pw
 
 from dgt.api import Dgt, Event, Message
@@ -191,6 +193,15 @@ class InfoHandler(ServerRequestHandler):
         if action == "get_clock_text":
             if "clock_text" in self.shared:
                 self.write(self.shared["clock_text"])
+        if action == "get_trace":
+            self.set_header("Content-Disposition", "inline; filename=picochess-trace.json")
+            self.write(tracer.chrome_trace())
+
+
+class MetricsHandler(ServerRequestHandler):
+    def get(self, *args, **kwargs):
+        self.set_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.write(metrics.render())
 
 
 class ChessBoardHandler(ServerRequestHandler):
@@ -224,6 +235,7 @@ class WebServer(threading.Thread):
                 (r"/event", EventHandler, dict(shared=shared)),
                 (r"/dgt", DGTHandler, dict(shared=shared)),
                 (r"/info", InfoHandler, dict(shared=shared)),
+                (r"/metrics", MetricsHandler, dict(shared=shared)),
                 (r"/help", HelpHandler, dict(theme=theme)),
                 (r"/channel", ChannelHandler, dict(shared=shared)),
                 (r".*", tornado.web.FallbackHandler, {"fallback": wsgi_app}),
@@ -830,8 +842,12 @@ class WebDisplay(DisplayMsg, threading.Thread):
         else:  # Default
             pass
 
+    def _traced_task(self, message):
+        with tracer.message_span(message, "web"):
+            self.task(message)
+
     def _create_task(self, msg):
-        IOLoop.instance().add_callback(callback=lambda: self.task(msg))
+        IOLoop.instance().add_callback(callback=lambda: self._traced_task(msg))
 
     def run(self):
         """Call by threading.Thread start() function."""
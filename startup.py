@@ -0,0 +1,98 @@
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from metrics import metrics
+from tracing import tracer
+
+logger = logging.getLogger(__name__)
+
+
+class Stage(object):
+
+    """A startup step running in its own thread once the stages it depends on are done."""
+
+    def __init__(self, name: str, func: Callable[[], Any], after: Sequence[str]):
+        self.name = name
+        self.func = func
+        self.after = after
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+        self.started = 0.0
+        self.finished = 0.0
+
+
+class Startup(object):
+
+    """
+    Run the independent startup stages of picochess in parallel, in the order of their dependencies.
+
+    A stage starts as soon as it is added, the main thread goes on with its own startup
+    and asks for a result() once it needs it.
+    """
+
+    def __init__(self):
+        self.stages: Dict[str, Stage] = {}
+        self.begin = time.monotonic()
+
+    def add(self, name: str, func: Callable[[], Any], after: Sequence[str] = ()):
+        """Start a stage running func after the stages named in after."""
+        for dependency in after:
+            if dependency not in self.stages:
+                raise ValueError('stage {} depends on unknown stage {}'.format(name, dependency))
+        stage = self.stages[name] = Stage(name, func, after)
+        threading.Thread(target=self._run, args=(stage,), name='startup-' + name, daemon=True).start()
+
+    def _run(self, stage: Stage):
+        for dependency in stage.after:
+            self.stages[dependency].done.wait()
+        failed = [dependency for dependency in stage.after if self.stages[dependency].error is not None]
+        trace_start = tracer.now()
+        stage.started = time.monotonic()
+        try:
+            if failed:
+                raise RuntimeError('stage {} not run, {} failed'.format(stage.name, ','.join(failed)))
+            stage.result = stage.func()
+        except BaseException as exc:  # raised again in the main thread by result()
+            logger.exception('startup stage %s failed', stage.name)
+            stage.error = exc
+        finally:
+            stage.finished = time.monotonic()
+            tracer.complete(stage.name, 'startup', trace_start)
+            metrics.gauge('picochess_startup_stage_seconds', 'Time a startup stage took',
+                          stage=stage.name).set(round(stage.finished - stage.started, 3))
+            stage.done.set()
+
+    def result(self, name: str):
+        """Wait for the stage and return its result, or raise its exception."""
+        stage = self.stages[name]
+        stage.done.wait()
+        if stage.error is not None:
+            raise stage.error
+        return stage.result
+
+    def report(self) -> List[str]:
+        """Return the start and duration of each finished stage and the time till now, relative to the begin."""
+        lines = ['{:<10} {:>8} {:>8}'.format('stage', 'start s', 'time s')]
+        for stage in sorted(self.stages.values(), key=lambda stage: stage.started):
+            if stage.done.is_set():
+                lines.append('{:<10} {:8.2f} {:8.2f}{}'.format(stage.name, stage.started - self.begin,
+                                                               stage.finished - stage.started,
+                                                               ' failed' if stage.error else ''))
+        lines.append('{:<10} {:8.2f}'.format('ready', time.monotonic() - self.begin))
+        return lines
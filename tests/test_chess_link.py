@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+import unittest
+
+from eboard.chesslink.chess_link import (ChessLink, castling_rights, flat_to_position, flat_to_short_fen,
+                                         raw_to_flat)
+
+# raw 's' reply chars of the start position, cable right
+RAW_START = 'RNBKQBNR' + 'PPPPPPPP' + '.' * 32 + 'pppppppp' + 'rnbkqbnr'
+# after 1. e4 e5 2. Nf3
+RAW_OPEN = 'R.BKQBNR' + 'PPP.PPPP' + '..N.....' + '...P....' + '...p....' + '........' + 'ppp.pppp' + 'rnbkqbnr'
+
+
+def nested_position(raw, orientation):
+    """Build the `position` array like the event worker did before the flat representation."""
+    figrep = {'int': [1, 2, 3, 4, 5, 6, 0, -1, -2, -3, -4, -5, -6], 'ascii': 'PNBRQK.pnbrqk'}
+    position = [[0 for x in range(8)] for y in range(8)]
+    for y in range(8):
+        for x in range(8):
+            f = figrep['int'][figrep['ascii'].find(raw[7 - x + y * 8])]
+            if orientation is True:
+                position[y][x] = f
+            else:
+                position[7 - y][7 - x] = f
+    return position
+
+
+class TestChessLinkPosition(unittest.TestCase):
+
+    def setUp(self):
+        self.chess_link = ChessLink.__new__(ChessLink)  # no board connection
+        self.chess_link.figrep = {'int': [1, 2, 3, 4, 5, 6, 0, -1, -2, -3, -4, -5, -6], 'ascii': 'PNBRQK.pnbrqk'}
+
+    def test_start_position(self):
+        flat = raw_to_flat(RAW_START)
+        self.assertEqual('rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR', flat_to_short_fen(flat))
+        self.assertEqual('KQkq', castling_rights(flat))
+
+    def test_same_as_nested_position(self):
+        for raw in (RAW_START, RAW_OPEN):
+            for orientation in (True, False):
+                flat = raw_to_flat(raw, orientation)
+                position = nested_position(raw, orientation)
+                self.assertEqual(position, flat_to_position(flat))
+                fen = self.chess_link.position_to_fen(position)
+                self.assertEqual(fen, f'{flat_to_short_fen(flat)} w {castling_rights(flat)} - 0 1')
+
+    def test_open_position(self):
+        flat = raw_to_flat(RAW_OPEN)
+        self.assertEqual('rnbqkbnr/pppp1ppp/8/4p3/4P3/5N2/PPPP1PPP/RNBQKB1R', flat_to_short_fen(flat))
+
+    def test_invalid_char(self):
+        self.assertIsNone(raw_to_flat('x' + RAW_START[1:]))
+
+
+if __name__ == '__main__':
+    unittest.main()
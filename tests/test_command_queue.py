@@ -0,0 +1,94 @@
+import threading
+import time
+import unittest
+
+from dgt.command_queue import CommandQueue
+from dgt.util import DgtClk, DgtCmd
+
+
+def text_3k(text: str, beep=0):
+    return [DgtCmd.DGT_CLOCK_MESSAGE, 0x0c, DgtClk.DGT_CMD_CLOCK_START_MESSAGE, DgtClk.DGT_CMD_CLOCK_ASCII] + \
+        list(text.ljust(8).encode()) + [beep, DgtClk.DGT_CMD_CLOCK_END_MESSAGE]
+
+
+END_TEXT = [DgtCmd.DGT_CLOCK_MESSAGE, 0x03, DgtClk.DGT_CMD_CLOCK_START_MESSAGE, DgtClk.DGT_CMD_CLOCK_END,
+            DgtClk.DGT_CMD_CLOCK_END_MESSAGE]
+SET_AND_RUN = [DgtCmd.DGT_CLOCK_MESSAGE, 0x0a, DgtClk.DGT_CMD_CLOCK_START_MESSAGE, DgtClk.DGT_CMD_CLOCK_SETNRUN,
+               0, 5, 0, 0, 5, 0, 1, DgtClk.DGT_CMD_CLOCK_END_MESSAGE]
+LEDS_OFF = [DgtCmd.DGT_SET_LEDS, 0x04, 0x00, 0x40, 0x40, DgtClk.DGT_CMD_CLOCK_END_MESSAGE]
+
+
+def leds_on(from_square: int, to_square: int):
+    return [DgtCmd.DGT_SET_LEDS, 0x04, 0x01, from_square, to_square, DgtClk.DGT_CMD_CLOCK_END_MESSAGE]
+
+
+class TestCommandQueue(unittest.TestCase):
+
+    def setUp(self):
+        self.queue = CommandQueue()
+
+    def put(self, *messages):
+        for message in messages:
+            self.queue.put(message, b'')
+
+    def messages(self):
+        return [message for message, _ in self.queue.get()]
+
+    def test_board_commands_batched(self):
+        self.put([DgtCmd.DGT_SEND_BRD], [DgtCmd.DGT_RETURN_SERIALNR])
+        self.assertEqual([[DgtCmd.DGT_SEND_BRD], [DgtCmd.DGT_RETURN_SERIALNR]], self.messages())
+
+    def test_newer_text_supersedes_waiting_text(self):
+        self.put(text_3k('first'))
+        self.assertEqual([text_3k('first')], self.messages())
+        self.put(text_3k('second'), text_3k('third'))
+        self.queue.acked()
+        self.assertEqual([text_3k('third')], self.messages())
+
+    def test_set_and_run_keeps_order(self):
+        self.put(text_3k('first'), SET_AND_RUN, END_TEXT, text_3k('second'))
+        sent = []
+        for _ in range(4):
+            sent += self.messages()
+            self.queue.acked()
+        self.assertEqual([text_3k('first'), SET_AND_RUN, END_TEXT, text_3k('second')], sent)
+
+    def test_end_text_supersedes_waiting_text(self):
+        self.put(SET_AND_RUN, text_3k('first'), END_TEXT)
+        self.assertEqual([SET_AND_RUN], self.messages())
+        self.queue.acked()
+        self.assertEqual([END_TEXT], self.messages())
+
+    def test_clock_waits_for_ack(self):
+        self.put(text_3k('first'), SET_AND_RUN)
+        self.assertEqual([text_3k('first')], self.messages())
+        sent = []
+        thread = threading.Thread(target=lambda: sent.extend(self.messages()))
+        thread.start()
+        time.sleep(0.1)
+        self.assertEqual([], sent)
+        self.queue.acked()
+        thread.join(2)
+        self.assertEqual([SET_AND_RUN], sent)
+
+    def test_board_commands_pass_waiting_clock(self):
+        self.put(text_3k('first'), text_3k('second'))
+        self.messages()
+        self.put([DgtCmd.DGT_SEND_BRD])
+        self.assertEqual([[DgtCmd.DGT_SEND_BRD]], self.messages())
+
+    def test_missing_ack_times_out(self):
+        self.queue = CommandQueue(ack_timeout=0.05)
+        self.put(text_3k('first'), SET_AND_RUN)
+        self.messages()
+        self.assertEqual([SET_AND_RUN], self.messages())
+
+    def test_leds_merged(self):
+        self.put(leds_on(1, 2), leds_on(1, 2), [DgtCmd.DGT_SEND_BRD], leds_on(3, 4))
+        self.assertEqual([leds_on(1, 2), [DgtCmd.DGT_SEND_BRD], leds_on(3, 4)], self.messages())
+        self.put(leds_on(1, 2), leds_on(3, 4), LEDS_OFF, leds_on(5, 6))
+        self.assertEqual([LEDS_OFF, leds_on(5, 6)], self.messages())
+
+
+if __name__ == '__main__':
+    unittest.main()
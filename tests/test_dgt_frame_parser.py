@@ -0,0 +1,73 @@
+import unittest
+
+from dgt.frame_parser import Frame, FrameParser
+from dgt.util import DgtMsg
+
+START_DUMP = bytes([0x08, 0x09, 0x0a, 0x0c, 0x0b, 0x0a, 0x09, 0x08] + [0x07] * 8 + [0x00] * 32 + [0x01] * 8 +
+                   [0x02, 0x03, 0x04, 0x06, 0x05, 0x04, 0x03, 0x02])
+
+# board start up: version, serial number, board dump, e2e4 as field updates and a clock ack
+BOARD_STREAM = bytes.fromhex(
+    '930005' '0112'
+    '910008' '3132333435'
+    '860043') + START_DUMP + bytes.fromhex(
+    '8e0005' '3400'
+    '8e0005' '2401'
+    '8d000a' '1a10081a0a0020'
+)
+
+BOARD_FRAMES = [
+    Frame(DgtMsg.DGT_MSG_VERSION.value, (0x01, 0x12), 2),
+    Frame(DgtMsg.DGT_MSG_SERIALNR.value, (0x31, 0x32, 0x33, 0x34, 0x35), 5),
+    Frame(DgtMsg.DGT_MSG_BOARD_DUMP.value, tuple(START_DUMP), 64),
+    Frame(DgtMsg.DGT_MSG_FIELD_UPDATE.value, (0x34, 0x00), 2),
+    Frame(DgtMsg.DGT_MSG_FIELD_UPDATE.value, (0x24, 0x01), 2),
+    Frame(DgtMsg.DGT_MSG_BWTIME.value, (0x1a, 0x10, 0x08, 0x1a, 0x0a, 0x00, 0x20), 7),
+]
+
+
+class TestFrameParser(unittest.TestCase):
+
+    def setUp(self):
+        self.parser = FrameParser()
+
+    def replay(self, stream: bytes, chunk_size: int):
+        frames = []
+        for pos in range(0, len(stream), chunk_size):
+            frames += self.parser.feed(stream[pos:pos + chunk_size])
+        return frames
+
+    def test_replay_in_chunks(self):
+        for chunk_size in (1, 2, 3, 5, 7, 64, len(BOARD_STREAM)):
+            self.parser.reset()
+            self.assertEqual(BOARD_FRAMES, self.replay(BOARD_STREAM, chunk_size), 'chunk size %i' % chunk_size)
+            self.assertEqual(b'', self.parser.buffer)
+
+    def test_incomplete_message_kept(self):
+        self.assertEqual([], self.parser.feed(bytes.fromhex('8e00')))
+        self.assertEqual([], self.parser.feed(bytes.fromhex('0534')))
+        self.assertEqual([Frame(DgtMsg.DGT_MSG_FIELD_UPDATE.value, (0x34, 0x00), 2)],
+                         self.parser.feed(bytes.fromhex('00')))
+
+    def test_resync_after_noise(self):
+        frames = self.parser.feed(bytes.fromhex('0102' '8e0005' '3400'))
+        self.assertEqual([Frame(DgtMsg.DGT_MSG_FIELD_UPDATE.value, (0x34, 0x00), 2)], frames)
+
+    def test_illegal_data_starts_new_message(self):
+        frames = self.parser.feed(bytes.fromhex('860043' '0809' '8e0005' '2401'))
+        self.assertEqual([Frame(DgtMsg.DGT_MSG_FIELD_UPDATE.value, (0x24, 0x01), 2)], frames)
+
+    def test_illegal_length_skipped(self):
+        frames = self.parser.feed(bytes.fromhex('8e0002' '8e0005' '3400'))
+        self.assertEqual([Frame(DgtMsg.DGT_MSG_FIELD_UPDATE.value, (0x34, 0x00), 2)], frames)
+
+    def test_ee_moves_ignored(self):
+        self.assertEqual([], self.parser.feed(bytes.fromhex('8f3e03') + bytes(0x1000)))
+        self.assertTrue(self.parser.is_skipping())
+        frames = self.parser.feed(bytes(0xf00) + bytes.fromhex('8e0005' '3400'))
+        self.assertFalse(self.parser.is_skipping())
+        self.assertEqual([Frame(DgtMsg.DGT_MSG_FIELD_UPDATE.value, (0x34, 0x00), 2)], frames)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,35 @@
+import threading
+import unittest
+
+from serial import SerialException  # type: ignore
+
+from dgt.board import DgtBoard
+from dgt.util import DgtClk, DgtCmd
+
+
+class BrokenSerial(object):
+    def write(self, data):
+        raise SerialException('device disconnected')
+
+    def close(self):
+        pass
+
+
+class TestDgtBoard(unittest.TestCase):
+    def setUp(self):
+        self.board = DgtBoard('/dev/null', False, False, False)
+        self.board.last_clock_command = [DgtCmd.DGT_CLOCK_MESSAGE, 0x03, 0x03, DgtClk.DGT_CMD_CLOCK_BEEP, 0x00]
+
+    def resend_returns(self) -> bool:
+        resend = threading.Thread(target=self.board._resend_clock_command, daemon=True)
+        resend.start()
+        resend.join(2)
+        return not resend.is_alive()
+
+    def test_resend_without_serial_returns(self):
+        self.assertTrue(self.resend_returns())
+
+    def test_resend_on_lost_serial_returns(self):
+        self.board.serial = BrokenSerial()
+        self.assertTrue(self.resend_returns())
+        self.assertIsNone(self.board.serial)
@@ -0,0 +1,73 @@
+import os
+import queue
+import unittest
+
+from eboard.event_loop import ReconnectPolicy, SerialStream
+
+
+class PipeDevice(object):
+    """A serial port replaced by the read end of a pipe."""
+
+    def __init__(self):
+        self.read_fd, self.write_fd = os.pipe()
+        self.fail = False
+
+    def fileno(self):
+        return self.read_fd
+
+    @property
+    def in_waiting(self):
+        return 0
+
+    def read(self, size):
+        data = os.read(self.read_fd, size)
+        if self.fail:
+            raise OSError('device disconnected')
+        return data
+
+    def close(self):
+        os.close(self.read_fd)
+        os.close(self.write_fd)
+
+
+class TestReconnectPolicy(unittest.TestCase):
+
+    def test_delays_grow_till_longest(self):
+        policy = ReconnectPolicy(first=1.0, longest=4.0)
+        self.assertEqual([1.0, 2.0, 4.0, 4.0], [policy.next_delay() for _ in range(4)])
+        policy.reset()
+        self.assertEqual(1.0, policy.next_delay())
+
+
+class TestSerialStream(unittest.TestCase):
+
+    def setUp(self):
+        self.events: queue.Queue = queue.Queue()
+        self.devices = [PipeDevice(), PipeDevice()]
+        self.stream = SerialStream('pipe', lambda port: self.devices[1], self.events.put,
+                                   lambda state, msg: self.events.put(state),
+                                   ReconnectPolicy(first=0.01))
+
+    def tearDown(self):
+        self.stream.stop()
+
+    def test_data_handed_over(self):
+        self.stream.start(self.devices[0])
+        self.assertEqual('online', self.events.get(timeout=2))
+        os.write(self.devices[0].write_fd, b'ab')
+        self.assertEqual(b'a', self.events.get(timeout=2))
+        self.assertEqual(b'b', self.events.get(timeout=2))
+
+    def test_reconnect_after_read_error(self):
+        self.stream.start(self.devices[0])
+        self.assertEqual('online', self.events.get(timeout=2))
+        self.devices[0].fail = True
+        os.write(self.devices[0].write_fd, b'a')
+        self.assertEqual('online', self.events.get(timeout=2))
+        self.assertIs(self.devices[1], self.stream.device)
+        os.write(self.devices[1].write_fd, b'c')
+        self.assertEqual(b'c', self.events.get(timeout=2))
+
+
+if __name__ == '__main__':
+    unittest.main()
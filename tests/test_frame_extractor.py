@@ -0,0 +1,68 @@
+import unittest
+
+from eboard.frame_extractor import FrameExtractor, FrameSpec
+
+POSITION = FrameSpec('position', bytes([0x01, 0x24]), length=6)
+BATTERY = FrameSpec('battery', bytes([0x2a, 0x02]), length=4)
+LINE = FrameSpec('line', b'', terminator=b'\r\n')
+BOARD = FrameSpec('board', b':', terminator=b'\r\n')
+
+
+class TestFrameExtractor(unittest.TestCase):
+
+    def setUp(self):
+        self.frames = []
+
+    def handler(self, spec, frame):
+        self.frames.append((spec.name, frame.tobytes()))
+        return True
+
+    def test_fixed_length_frames_in_chunks(self):
+        stream = bytes.fromhex('9876' '012401020304' '2a026401' '0124050607')
+        for chunk_size in (1, 2, 3, 5, len(stream)):
+            self.frames = []
+            extractor = FrameExtractor([POSITION, BATTERY])
+            for pos in range(0, len(stream), chunk_size):
+                extractor.extract(stream[pos:pos + chunk_size], self.handler)
+            self.assertEqual([('position', bytes.fromhex('012401020304')), ('battery', bytes.fromhex('2a026401'))],
+                             self.frames, 'chunk size %i' % chunk_size)
+            self.assertEqual(bytes.fromhex('0124050607'), extractor.pending())
+
+    def test_rejected_frame_searched_again(self):
+        extractor = FrameExtractor([POSITION])
+        extractor.extract(bytes.fromhex('0124' '012402030405'), lambda spec, frame: self.handler(spec, frame) and
+                          frame[2] != 0x01)
+        self.assertEqual([('position', bytes.fromhex('012401240203')), ('position', bytes.fromhex('012402030405'))],
+                         self.frames)
+        self.assertEqual(b'', extractor.pending())
+
+    def test_terminated_frames(self):
+        extractor = FrameExtractor([LINE])
+        extractor.extract(b'1 2\r', self.handler)
+        extractor.extract(b'\n3 4\r\n5', self.handler)
+        self.assertEqual([('line', b'1 2\r\n'), ('line', b'3 4\r\n')], self.frames)
+        self.assertEqual(b'5', extractor.pending())
+
+    def test_cut_off_frame_dropped(self):
+        extractor = FrameExtractor([BOARD])
+        extractor.extract(b'junk:1 2:3 4\r\n:5', self.handler)
+        self.assertEqual([('board', b':3 4\r\n')], self.frames)
+        self.assertEqual(b':5', extractor.pending())
+
+    def test_buffer_grows_and_compacts(self):
+        extractor = FrameExtractor([LINE], size=4)
+        extractor.extract(b'123456\r\n78', self.handler)
+        for _ in range(10):
+            extractor.extract(b'9\r\n78', self.handler)
+        self.assertEqual([('line', b'123456\r\n')] + [('line', b'789\r\n')] * 10, self.frames)
+        self.assertEqual(len(b'123456\r\n78'), len(extractor.buffer))
+
+    def test_clear(self):
+        extractor = FrameExtractor([POSITION])
+        extractor.extract(bytes.fromhex('012401'), self.handler)
+        extractor.clear()
+        self.assertEqual(b'', extractor.pending())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,28 @@
+import unittest
+
+from importprofile import ImportTime, import_times, parse_importtime, report
+
+OUTPUT = '''import time: self [us] | cumulative | imported package
+import time:       120 |        120 |     _io
+import time:       300 |        420 |   io
+import time:      1000 |       1500 | theme
+import time:        50 |         50 | dgt
+'''
+
+
+class TestImportProfile(unittest.TestCase):
+
+    def test_parse_importtime(self):
+        times = parse_importtime(OUTPUT)
+        self.assertEqual(ImportTime('_io', 120, 120, 2), times[0])
+        self.assertEqual(ImportTime('theme', 1000, 1500, 0), times[2])
+        self.assertEqual(4, len(times))
+
+    def test_report(self):
+        lines = report(parse_importtime(OUTPUT), top=2)
+        self.assertEqual('import time 2ms of 4 modules', lines[0])
+        self.assertEqual(['theme', 'io'], [line.split()[-1] for line in lines[2:]])
+
+    def test_import_times(self):
+        modules = [item.module for item in import_times(['json'])]
+        self.assertIn('json', modules)
@@ -0,0 +1,71 @@
+import logging
+import queue
+import unittest
+
+from logqueue import BoundedQueueHandler, RateLimiter, start_logging
+
+
+def make_record(name: str, created: float, level: int = logging.DEBUG, msg: str = 'message %s'):
+    record = logging.LogRecord(name, level, __file__, 1, msg, ('arg',), None)
+    record.created = created
+    return record
+
+
+class ListHandler(logging.Handler):
+
+    def __init__(self):
+        super(ListHandler, self).__init__()
+        self.lines = []
+
+    def emit(self, record):
+        self.lines.append(self.format(record))
+
+
+class TestRateLimiter(unittest.TestCase):
+
+    def test_rate_per_module(self):
+        limiter = RateLimiter(rate=2, period=1.0)
+        passed = [limiter.filter(make_record('dispatcher', 10.0 + i / 10)) for i in range(4)]
+        self.assertEqual([True, True, False, False], passed)
+        self.assertTrue(limiter.filter(make_record('pgn', 10.3)))
+
+    def test_warnings_always_pass(self):
+        limiter = RateLimiter(rate=0, period=1.0)
+        self.assertTrue(limiter.filter(make_record('dispatcher', 10.0, logging.WARNING)))
+        self.assertFalse(limiter.filter(make_record('dispatcher', 10.0, logging.INFO)))
+
+    def test_suppressed_records_are_reported(self):
+        limiter = RateLimiter(rate=1, period=1.0)
+        for created in (10.0, 10.1, 10.2):
+            limiter.filter(make_record('dispatcher', created))
+        record = make_record('dispatcher', 11.5)
+        self.assertTrue(limiter.filter(record))
+        self.assertEqual('[2 records suppressed] message arg', record.getMessage())
+
+
+class TestBoundedQueueHandler(unittest.TestCase):
+
+    def test_full_queue_drops(self):
+        que = queue.Queue(maxsize=1)
+        handler = BoundedQueueHandler(que)
+        handler.handle(make_record('pgn', 10.0, msg='first %s'))
+        handler.handle(make_record('pgn', 10.0, msg='second %s'))
+        self.assertEqual(1, que.qsize())
+        self.assertEqual('first arg', que.get().getMessage())
+
+
+class TestStartLogging(unittest.TestCase):
+
+    def test_records_reach_the_handler(self):
+        root = logging.getLogger()
+        handlers, level = root.handlers[:], root.level
+        root.handlers = []
+        target = ListHandler()
+        try:
+            listener = start_logging(target, logging.DEBUG)
+            logging.getLogger('picochess').debug('move %s', 'e2e4')
+            listener.stop()
+        finally:
+            root.handlers, root.level = handlers, level
+        self.assertEqual(1, len(target.lines))
+        self.assertTrue(target.lines[0].endswith('DEBUG test_logqueue - test_records_reach_the_handler: move e2e4'))
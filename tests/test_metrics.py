@@ -0,0 +1,76 @@
+import unittest
+from types import SimpleNamespace
+
+import chess  # type: ignore
+
+from metrics import Metrics, metrics, runtime_samples
+from uci.informer import SearchMetrics
+from utilities import DisplayMsg
+
+
+class TestMetrics(unittest.TestCase):
+
+    def test_render_counter_and_gauge(self):
+        registry = Metrics()
+        registry.counter('frames_total', 'Frames', board='dgt').inc()
+        registry.counter('frames_total', 'Frames', board='dgt').inc(2)
+        registry.gauge('nps', 'Nodes per second').set(1500)
+        self.assertEqual('# HELP frames_total Frames\n'
+                         '# TYPE frames_total counter\n'
+                         'frames_total{board="dgt"} 3.0\n'
+                         '# HELP nps Nodes per second\n'
+                         '# TYPE nps gauge\n'
+                         'nps 1500\n', registry.render())
+
+    def test_render_summary(self):
+        registry = Metrics()
+        summary = registry.summary('event_seconds', 'Event time', event='EVT_FEN')
+        summary.observe(0.25)
+        summary.observe(0.5)
+        lines = registry.render().splitlines()
+        self.assertIn('event_seconds_count{event="EVT_FEN"} 2', lines)
+        self.assertIn('event_seconds_sum{event="EVT_FEN"} 0.75', lines)
+
+    def test_label_values_are_escaped(self):
+        registry = Metrics()
+        registry.counter('c', 'C', engine='a "b"\\').inc()
+        self.assertIn('c{engine="a \\"b\\"\\\\"} 1.0', registry.render().splitlines())
+
+    def test_kind_of_a_name_is_fixed(self):
+        registry = Metrics()
+        registry.counter('c', 'C')
+        with self.assertRaises(ValueError):
+            registry.gauge('c', 'C')
+
+    def test_collector(self):
+        registry = Metrics()
+        registry.add_collector(lambda: [('size', 'gauge', 'Size', {'queue': 'q'}, 4)])
+        self.assertIn('size{queue="q"} 4', registry.render().splitlines())
+
+    def test_runtime_samples(self):
+        display = DisplayMsg()
+        display.msg_queue.put('message')
+        samples = {(name, tuple(sorted(labels.items()))): value for name, _, _, labels, value in runtime_samples()}
+        self.assertEqual(1, samples[('picochess_queue_size', (('display', 'DisplayMsg'), ('queue', 'msg_queue')))])
+        self.assertIn(('picochess_queue_size', (('queue', 'evt_queue'),)), samples)
+        self.assertGreaterEqual(samples[('picochess_threads', ())], 1)
+        self.assertGreater(samples[('process_resident_memory_bytes', ())], 0)
+
+
+class TestSearchMetrics(unittest.TestCase):
+
+    def test_search_and_ponder(self):
+        engine = SimpleNamespace(pondering=False)
+        handler = SearchMetrics(engine, 'test')
+        handler.on_go()
+        handler.nps(250000)
+        handler.on_bestmove(chess.Move.from_uci('e2e4'), None)
+        self.assertEqual(250000, handler.info['nps'])
+        engine.pondering = True
+        handler.on_go()
+        handler.on_bestmove(chess.Move.from_uci('e7e5'), None)
+
+        lines = metrics.render().splitlines()
+        self.assertIn('picochess_engine_nps{searcher="test"} 250000', lines)
+        self.assertIn('picochess_engine_searches_total{mode="search",searcher="test"} 1.0', lines)
+        self.assertIn('picochess_engine_search_seconds_count{mode="ponder",searcher="test"} 1', lines)
@@ -19,42 +19,41 @@ from unittest.mock import patch
 from eboard.move_debouncer import MoveDebouncer
 
 
-@patch('eboard.move_debouncer.Timer.cancel')
-@patch('eboard.move_debouncer.Timer.start')
+@patch('eboard.move_debouncer.scheduler')
 class TestMoveDebouncer(unittest.TestCase):
 
-    def test_timer_is_started_for_extendable_move(self, MockedTimer_start, MockedTimer_cancel):
+    def test_timer_is_started_for_extendable_move(self, MockedScheduler):
         d = MoveDebouncer(1000, lambda fen: None)
         d.update('rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR')  # start position
         d.update('rnbqkbnr/pppppppp/8/8/8/8/PPPP1PPP/RNBQKBNR')  # pawn on e2 picked up
         d.update('rnbqkbnr/pppppppp/8/8/8/4P3/PPPP1PPP/RNBQKBNR')  # pawn put down on e3
-        MockedTimer_start.assert_called_once()
-        MockedTimer_cancel.assert_not_called()
+        MockedScheduler.schedule.assert_called_once()
+        MockedScheduler.schedule.return_value.cancel.assert_not_called()
 
-    def test_timer_is_canceled_for_non_extendable_move(self, MockedTimer_start, MockedTimer_cancel):
+    def test_timer_is_canceled_for_non_extendable_move(self, MockedScheduler):
         d = MoveDebouncer(1000, lambda fen: None)
         d.update('rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR')  # start position
         d.update('rnbqkbnr/pppppppp/8/8/8/8/PPPP1PPP/RNBQKBNR')  # pawn on e2 picked up
         d.update('rnbqkbnr/pppppppp/8/8/8/4P3/PPPP1PPP/RNBQKBNR')  # pawn put down on e3
-        MockedTimer_start.reset_mock()
+        MockedScheduler.schedule.reset_mock()
         d.update('rnbqkbnr/pppppppp/8/8/4P3/8/PPPP1PPP/RNBQKBNR')  # pawn put down on e4
-        MockedTimer_cancel.assert_called_once()
-        MockedTimer_start.assert_not_called()
+        MockedScheduler.schedule.return_value.cancel.assert_called_once()
+        MockedScheduler.schedule.assert_not_called()
 
-    def test_rook_move_is_extendable(self, MockedTimer_start, MockedTimer_cancel):
+    def test_rook_move_is_extendable(self, MockedScheduler):
         d = MoveDebouncer(1000, lambda fen: None)
         d.update('rn1qk2r/pp2ppbp/2p2np1/3p1b1P/3P4/4PN2/PPP1BPP1/RNBQK2R')
         d.update('rn1qk2r/pp2ppbp/2p2np1/3p1b1P/3P4/4PN2/PPP1BPP1/RNBQK3')  # remove rook from h1
         d.update('rn1qk2r/pp2ppbp/2p2np1/3p1b1P/3P4/4PN2/PPP1BPPR/RNBQK3')  # place rook on h2
         d.update('rn1qk2r/pp2ppbp/2p2np1/3p1b1P/3P4/4PN1R/PPP1BPP1/RNBQK3')  # place rook on h3
-        self.assertEqual(2, MockedTimer_start.call_count)
+        self.assertEqual(2, MockedScheduler.schedule.call_count)
 
-    def test_ignore_knight_move(self, MockedTimer_start, MockedTimer_cancel):
+    def test_ignore_knight_move(self, MockedScheduler):
         d = MoveDebouncer(1000, lambda fen: None)
         d.update('rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR')  # start position
         d.update('rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKB1R')  # Knight on g1 picked up
         d.update('rnbqkbnr/pppppppp/8/8/8/5N2/PPPPPPPP/RNBQKB1R')  # Knight put down on f3
-        MockedTimer_start.assert_not_called()
+        MockedScheduler.schedule.assert_not_called()
 
 
 if __name__ == '__main__':
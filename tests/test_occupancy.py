@@ -0,0 +1,65 @@
+import unittest
+
+import chess  # type: ignore
+
+from eboard.occupancy import START_OCCUPIED, OccupancyMoves, occupied_after
+
+
+def lift(occupied: int, *squares: int) -> int:
+    for square in squares:
+        occupied &= ~chess.BB_SQUARES[square]
+    return occupied
+
+
+def place(occupied: int, *squares: int) -> int:
+    for square in squares:
+        occupied |= chess.BB_SQUARES[square]
+    return occupied
+
+
+class TestOccupancyMoves(unittest.TestCase):
+
+    def test_start_occupied(self):
+        self.assertEqual(chess.Board().occupied, START_OCCUPIED)
+
+    def test_occupied_after_every_move(self):
+        board = chess.Board('r3k2r/pPp2ppp/8/3pP3/8/8/PPPP1PPP/R3K2R w KQkq d6 0 1')
+        for move in board.legal_moves:
+            board.push(move)
+            occupied = board.occupied
+            board.pop()
+            self.assertEqual(occupied, occupied_after(board, move), move.uci())
+
+    def test_non_capture_move(self):
+        moves = OccupancyMoves(chess.Board())
+        self.assertEqual([], moves.resolve(lift(START_OCCUPIED, chess.E2)))
+        self.assertEqual([chess.Move.from_uci('e2e4')], moves.resolve(place(lift(START_OCCUPIED, chess.E2), chess.E4)))
+
+    def test_capture_after_both_squares_lifted(self):
+        board = chess.Board('rnbqkbnr/ppp1pppp/8/3p4/4P3/8/PPPP1PPP/RNBQKBNR w KQkq d6 0 2')
+        moves = OccupancyMoves(board)
+        self.assertEqual([], moves.resolve(lift(board.occupied, chess.E4)))
+        self.assertEqual([], moves.resolve(lift(board.occupied, chess.E4, chess.D5)))
+        self.assertEqual([chess.Move.from_uci('e4d5')], moves.resolve(lift(board.occupied, chess.E4)))
+
+    def test_en_passant(self):
+        board = chess.Board('rnbqkbnr/pp2pppp/8/2pP4/8/8/PPPP1PPP/RNBQKBNR w KQkq c6 0 3')
+        moves = OccupancyMoves(board)
+        self.assertEqual([chess.Move.from_uci('d5c6')], moves.resolve(place(lift(board.occupied, chess.D5, chess.C5),
+                                                                            chess.C6)))
+
+    def test_castling_with_king_moved_first(self):
+        board = chess.Board('rnbqk2r/pppp1ppp/5n2/2b1p3/2B1P3/5N2/PPPP1PPP/RNBQK2R w KQkq - 4 4')
+        moves = OccupancyMoves(board)
+        castling = [chess.Move.from_uci('e1g1')]
+        self.assertEqual(castling, moves.resolve(place(lift(board.occupied, chess.E1), chess.G1)))
+        self.assertEqual(castling, moves.resolve(place(lift(board.occupied, chess.E1, chess.H1), chess.G1, chess.F1)))
+
+    def test_promotion_moves(self):
+        board = chess.Board('4k3/P7/8/8/8/8/8/4K3 w - - 0 1')
+        moves = OccupancyMoves(board).resolve(place(lift(board.occupied, chess.A7), chess.A8))
+        self.assertEqual({chess.QUEEN, chess.ROOK, chess.BISHOP, chess.KNIGHT}, {move.promotion for move in moves})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,9 +1,13 @@
 import chess  # type: ignore[import]
 import datetime
+import json
+import os
+import tempfile
+import time
 import unittest
 
 from dgt.util import PlayMode
-from pgn import PgnDisplay
+from pgn import PgnDisplay, PgnOutbox
 
 EMPTY_GAME = """[Event "PicoChess Game"]
 [Site "?"]
@@ -43,3 +47,110 @@ class TestPgnDisplay(unittest.TestCase):
         )
 
         self.assertEqual(str(pgn), empty_game)
+
+
+class FakeEmailer:
+    def __init__(self, results, channels=("smtp",)):
+        self.email = "player@example.com"
+        self.results = list(results)
+        self.configured = list(channels)
+        self.sent = []
+        self.used = []
+
+    def channels(self):
+        return self.configured
+
+    def send_by(self, channel, subject, body, path):
+        self.sent.append((subject, body, path))
+        self.used.append(channel)
+        return self.results.pop(0)
+
+
+class TestPgnOutbox(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.outbox_path = os.path.join(self.tmp_dir.name, "outbox")
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_game_is_written_and_mail_queued(self):
+        emailer = FakeEmailer([])
+        display = PgnDisplay(os.path.join(self.tmp_dir.name, "games.pgn"), emailer)
+        display.last_file_name = os.path.join(self.tmp_dir.name, "last_game.pgn")
+        display.outbox = PgnOutbox(emailer, self.outbox_path)
+        game = chess.pgn.Game()
+
+        display._write_game(game)
+        display.outbox.add_mail("Game PGN", str(game), display.file_name)
+
+        self.assertTrue(os.path.isfile(display.file_name))
+        self.assertTrue(os.path.isfile(display.last_file_name))
+        self.assertEqual(1, len(display.outbox._pending_mails()))
+        self.assertEqual([], emailer.sent)
+
+    def test_mails_are_batched(self):
+        emailer = FakeEmailer([True])
+        outbox = PgnOutbox(emailer, self.outbox_path)
+        outbox._enqueue_mail("Game PGN", "game 1", "games.pgn")
+        outbox._enqueue_mail("Game PGN", "game 2", "games.pgn")
+
+        outbox._deliver()
+
+        self.assertEqual([("Game PGN", "game 1\n\ngame 2", "games.pgn")], emailer.sent)
+        self.assertEqual([], outbox._pending_mails())
+        self.assertIsNone(outbox._next_wakeup())
+
+    def test_failed_mail_is_kept_for_retry(self):
+        emailer = FakeEmailer([False])
+        outbox = PgnOutbox(emailer, self.outbox_path)
+        outbox._enqueue_mail("Game PGN", "game 1", "games.pgn")
+
+        outbox._deliver()
+
+        mails = outbox._pending_mails()
+        self.assertEqual(1, len(mails))
+        self.assertEqual(1, mails[0][1]["attempts"])
+        self.assertGreater(outbox._next_wakeup(), PgnOutbox.RETRY_DELAY - 5)
+        outbox._deliver()  # not due yet, so nothing is sent again
+        self.assertEqual(1, len(emailer.sent))
+
+    def test_mail_is_dropped_after_max_attempts(self):
+        emailer = FakeEmailer([False])
+        outbox = PgnOutbox(emailer, self.outbox_path)
+        outbox._enqueue_mail("Game PGN", "game 1", "games.pgn")
+        outbox.MAX_ATTEMPTS = 1
+
+        outbox._deliver()
+
+        self.assertEqual([], outbox._pending_mails())
+
+    def test_failed_channel_is_retried_alone(self):
+        emailer = FakeEmailer([True, False, False], channels=("mailgun", "smtp"))
+        outbox = PgnOutbox(emailer, self.outbox_path)
+        outbox._enqueue_mail("Game PGN", "game 1", "games.pgn")
+
+        outbox._deliver()
+        mail_name, mail = outbox._pending_mails()[0]
+        self.assertEqual(["smtp"], mail["channels"])
+        mail["next_try"] = 0.0
+        with open(mail_name, "w") as mail_file:
+            json.dump(mail, mail_file)
+        outbox._deliver()
+
+        self.assertEqual(["mailgun", "smtp", "smtp"], emailer.used)
+
+    def test_outbox_without_emailer_blocks(self):
+        PgnOutbox(FakeEmailer([]), self.outbox_path)._enqueue_mail("Game PGN", "game 1", "games.pgn")
+        outbox = PgnOutbox(None, self.outbox_path)
+        wakeups = []
+
+        def next_wakeup():
+            wakeups.append(time.monotonic())
+            return PgnOutbox._next_wakeup(outbox)
+
+        outbox._next_wakeup = next_wakeup
+        outbox.start()
+        time.sleep(0.2)
+        self.assertEqual(1, len(wakeups))  # waiting on the queue instead of looping
+        self.assertEqual(1, len(outbox._pending_mails()))
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+from typing import List
+
+from picotalker import AudioEngine, PicoTalker, VoiceManifest
+
+
+class MockChannel(object):
+    def get_busy(self):
+        return False
+
+
+class MockSound(object):
+    played: List[str] = []
+
+    def __init__(self, buffer=None):
+        self.buffer = buffer
+
+    def play(self):
+        MockSound.played.append(self.buffer)
+        return MockChannel()
+
+
+class MockMixer(object):
+    Sound = MockSound
+
+
+class TestAudioEngine(unittest.TestCase):
+    def setUp(self):
+        MockSound.played = []
+        self.engine = AudioEngine(cache_bytes=10)
+        self.engine.initialized = True
+        self.engine.mixer = MockMixer()
+
+    @patch.object(AudioEngine, '_decode', side_effect=lambda voice_file, speed_factor: voice_file.encode())
+    def test_utterance_is_one_sound(self, decode_mock):
+        self.assertTrue(self.engine.play(['ab', 'cd'], 1.0))
+        self.assertTrue(self.engine.play(['cd'], 1.0))
+        self.assertEqual([b'abcd', b'cd'], MockSound.played)
+        self.assertEqual(2, decode_mock.call_count)
+
+        self.engine.play(['cd'], 1.1)
+        self.assertEqual(3, decode_mock.call_count)
+
+    @patch.object(AudioEngine, '_decode', side_effect=lambda voice_file, speed_factor: voice_file.encode())
+    def test_cache_size(self, _):
+        self.engine.play(['12345', '67890', 'abc'], 1.0)
+        self.assertEqual([('67890', 1.0), ('abc', 1.0)], list(self.engine.cache))
+        self.assertEqual(8, self.engine.cached_bytes)
+
+    def test_not_available(self):
+        self.engine.mixer = None
+        self.assertFalse(self.engine.play(['ab'], 1.0))
+
+
+class TestPicoTalker(unittest.TestCase):
+    @patch('picotalker.subprocess.call')
+    @patch('picotalker.audio_engine')
+    def test_sox_fallback(self, audio_engine_mock, call_mock):
+        audio_engine_mock.play.return_value = False
+        talker = PicoTalker('en:al', 1.0)
+        self.assertTrue(talker.talk(['1.ogg', 'missing.ogg', '2.ogg']))
+        command = call_mock.call_args[0][0]
+        self.assertEqual(['play', 'talker/voices/en/al/1.ogg', 'talker/voices/en/al/2.ogg', 'tempo', '1.0'], command)
+
+    @patch('picotalker.subprocess.call')
+    @patch('picotalker.audio_engine')
+    def test_audio_engine(self, audio_engine_mock, call_mock):
+        audio_engine_mock.play.return_value = True
+        talker = PicoTalker('en:al', 1.0)
+        self.assertTrue(talker.talk(['1.ogg']))
+        audio_engine_mock.play.assert_called_once_with(['talker/voices/en/al/1.ogg'], 1.0)
+        call_mock.assert_not_called()
+
+
+class TestVoiceManifest(unittest.TestCase):
+    def test_manifest(self):
+        with tempfile.TemporaryDirectory() as voice_path:
+            for name in ('f_check1.ogg', 'f_check2.ogg', 'f_chat1.ogg', 'Ka.ogg'):
+                open(os.path.join(voice_path, name), 'w').close()
+            os.utime(voice_path, ns=(10 ** 9, 10 ** 9))
+            manifest = VoiceManifest.of(voice_path)
+            self.assertTrue(manifest.has('Ka.ogg'))
+            self.assertFalse(manifest.has('Kb.ogg'))
+            self.assertEqual(2, manifest.count('f_check'))
+            self.assertEqual(1, manifest.count('f_chat'))
+            self.assertIs(manifest, VoiceManifest.of(voice_path))
+
+            open(os.path.join(voice_path, 'f_check3.ogg'), 'w').close()
+            os.utime(voice_path, ns=(2 * 10 ** 9, 2 * 10 ** 9))
+            self.assertEqual(3, VoiceManifest.of(voice_path).count('f_check'))
+
+    def test_missing_folder(self):
+        manifest = VoiceManifest.of('talker/voices/xx/missing')
+        self.assertFalse(manifest.has('Ka.ogg'))
+        self.assertEqual(0, manifest.count('f_check'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,100 @@
+import json
+import os
+import queue
+import tempfile
+import unittest
+
+from eboard import recorder
+from eboard.chesslink.chess_link import START_FEN_CABLE_LEFT, ChessLink
+from eboard.recorder import Recorder, RecordingQueue, ReplayTransport, read_recording
+
+
+class TestRecorder(unittest.TestCase):
+
+    def setUp(self):
+        self.folder = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.folder.name, 'certabo.rec')
+
+    def tearDown(self):
+        self.folder.cleanup()
+
+    def record(self, *messages):
+        que = RecordingQueue(Recorder(self.path, 'certabo'))
+        for message in messages:
+            que.put(message)
+        que.recorder.close()
+        return que
+
+    def test_read_recording(self):
+        que = self.record('agent-state: online Connected', b':1 2 3\r\n', b'')
+        board, messages = read_recording(self.path)
+        self.assertEqual('certabo', board)
+        self.assertEqual(['agent-state: online Connected', b':1 2 3\r\n'], [message for _, message in messages])
+        self.assertTrue(all(delay >= 0 for delay, _ in messages))
+        self.assertEqual(3, que.qsize())  # the wake up message is passed on, but not recorded
+
+    def test_no_recording(self):
+        with open(self.path, 'wb') as f:
+            f.write(b'no recording')
+        self.assertRaises(ValueError, read_recording, self.path)
+
+    def test_replay(self):
+        self.record(b'first', b'second')
+        que: queue.Queue = queue.Queue()
+        transport = ReplayTransport(que, self.path, speed=0)
+        self.assertTrue(transport.open_mt(transport.search_board()))
+        self.assertEqual(b'first', que.get(timeout=2))
+        self.assertEqual(b'second', que.get(timeout=2))
+
+    def test_replay_missing_file(self):
+        transport = ReplayTransport(queue.Queue(), os.path.join(self.folder.name, 'missing.rec'))
+        self.assertFalse(transport.open_mt(transport.path))
+
+
+class TestReplayConfiguration(unittest.TestCase):
+
+    def setUp(self):
+        self.folder = tempfile.TemporaryDirectory()
+        self.cwd = os.getcwd()
+        os.chdir(self.folder.name)
+        self.config = json.dumps({'transport': 'chess_link_usb', 'address': '/dev/ttyUSB0', 'orientation': True,
+                                  'btle_iface': 0, 'autodetect': True, 'protocol_debug': False}, indent=4)
+        with open('chess_link_config.json', 'w') as f:
+            f.write(self.config)
+
+    def tearDown(self):
+        recorder.configure(None, None)
+        os.chdir(self.cwd)
+        self.folder.cleanup()
+
+    def assertConfigUnchanged(self):
+        with open('chess_link_config.json') as f:
+            self.assertEqual(self.config, f.read())
+
+    def test_replay_cable_left(self):
+        flat = ''.join('.' * int(c) if c.isdigit() else c for c in START_FEN_CABLE_LEFT.replace('/', ''))
+        que = RecordingQueue(Recorder('chesslink.rec', 'chesslink'))
+        que.put('agent-state: online Connected')
+        que.put('s' + flat[::-1] + '00')
+        que.recorder.close()
+        recorder.configure(None, 'chesslink.rec', 0)
+        appque: queue.Queue = queue.Queue()
+        board = ChessLink(appque, 'chesslink')
+        try:
+            while appque.get(timeout=2)['cmd'] != 'raw_board_position':
+                pass
+            self.assertFalse(board.get_orientation())  # the cable-left start position was detected
+        finally:
+            board.quit()
+        self.assertConfigUnchanged()
+
+    def test_replay_missing_file(self):
+        recorder.configure(None, 'missing.rec', 0)
+        board = ChessLink(queue.Queue(), 'chesslink')  # returns without scanning for a real board
+        board.quit()
+        self.assertTrue(board.error_condition)
+        self.assertConfigUnchanged()
+
+
+if __name__ == '__main__':
+    unittest.main()
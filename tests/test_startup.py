@@ -0,0 +1,53 @@
+import threading
+import time
+import unittest
+
+from startup import Startup
+
+
+class TestStartup(unittest.TestCase):
+
+    def test_stages_run_in_parallel(self):
+        startup = Startup()
+        both_running = threading.Barrier(2, timeout=5)
+        startup.add('engine', lambda: both_running.wait() is not None and 'engine')
+        startup.add('voice', lambda: both_running.wait() is not None and 'voice')
+        self.assertEqual('engine', startup.result('engine'))
+        self.assertEqual('voice', startup.result('voice'))
+
+    def test_dependency_order(self):
+        startup = Startup()
+        order = []
+
+        def location():
+            time.sleep(0.05)
+            order.append('location')
+            return 'dark'
+
+        startup.add('location', location)
+        startup.add('web', lambda: order.append('web') or startup.result('location'), after=['location'])
+        self.assertEqual('dark', startup.result('web'))
+        self.assertEqual(['location', 'web'], order)
+
+    def test_unknown_dependency(self):
+        with self.assertRaises(ValueError):
+            Startup().add('web', lambda: None, after=['location'])
+
+    def test_errors_are_raised_by_result(self):
+        def no_network():
+            raise OSError('no network')
+
+        startup = Startup()
+        startup.add('location', no_network)
+        startup.add('web', lambda: 'web', after=['location'])
+        with self.assertRaises(OSError):
+            startup.result('location')
+        with self.assertRaises(RuntimeError):
+            startup.result('web')
+
+    def test_report(self):
+        startup = Startup()
+        startup.add('tutor', lambda: None)
+        startup.result('tutor')
+        lines = startup.report()
+        self.assertEqual(['stage', 'tutor', 'ready'], [line.split()[0] for line in lines])
@@ -0,0 +1,65 @@
+import json
+import os
+import tempfile
+import threading
+import unittest
+
+import chess  # type: ignore
+
+from dgt.api import Message
+from tracing import Tracer, trace_args
+
+
+class TestTracer(unittest.TestCase):
+
+    def test_spans_and_instants(self):
+        tracer = Tracer()
+        with tracer.span('EVT_FEN', 'main', fen='8/8/8/8/8/8/8/8'):
+            pass
+        tracer.instant('board fen', 'eboard')
+        events = tracer.chrome_trace()['traceEvents']
+        self.assertEqual(['X', 'i', 'M'], [event['ph'] for event in events])
+        self.assertEqual({'fen': '8/8/8/8/8/8/8/8'}, events[0]['args'])
+        self.assertGreaterEqual(events[0]['dur'], 0)
+        self.assertLessEqual(events[0]['ts'], events[1]['ts'])
+        self.assertEqual(threading.current_thread().name, events[2]['args']['name'])
+
+    def test_complete_across_functions(self):
+        tracer = Tracer()
+        started = tracer.now()
+        tracer.complete('search', 'engine', started, move='e2e4')
+        phase, name, cat, start, duration = tracer.events[0][:5]
+        self.assertEqual(('X', 'search', 'engine', started), (phase, name, cat, start))
+        self.assertGreaterEqual(duration, 0)
+
+    def test_ring_buffer_keeps_last_events(self):
+        tracer = Tracer(size=3)
+        for number in range(5):
+            tracer.instant(str(number), 'test')
+        self.assertEqual(['2', '3', '4'], [event[1] for event in tracer.events])
+        tracer.clear()
+        self.assertEqual([], tracer.chrome_trace()['traceEvents'])
+
+    def test_message_span_only_for_moves(self):
+        tracer = Tracer()
+        move = chess.Move.from_uci('e2e4')
+        with tracer.message_span(Message.COMPUTER_MOVE(move=move, ponder=None, game=None, wait=False), 'web'):
+            pass
+        with tracer.message_span(Message.SYSTEM_SHUTDOWN(), 'web'):
+            pass
+        self.assertEqual(1, len(tracer.events))
+        self.assertEqual(('X', 'MSG_COMPUTER_MOVE', 'web'), tracer.events[0][:3])
+        self.assertEqual({'move': 'e2e4'}, tracer.events[0][-1])
+
+    def test_trace_args(self):
+        message = Message.USER_MOVE_DONE(move=chess.Move.from_uci('g1f3'), fen='fen', turn=chess.WHITE, game=None)
+        self.assertEqual({'move': 'g1f3', 'fen': 'fen'}, trace_args(message))
+
+    def test_dump(self):
+        tracer = Tracer()
+        tracer.instant('board fen', 'eboard')
+        with tempfile.TemporaryDirectory() as folder:
+            file_name = os.path.join(folder, 'trace.json')
+            tracer.dump(file_name)
+            with open(file_name) as trace_file:
+                self.assertEqual(tracer.chrome_trace(), json.load(trace_file))
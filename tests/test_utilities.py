@@ -1,6 +1,8 @@
+import threading
+import time
 import unittest
 
-from utilities import get_engine_mame_par
+from utilities import RepeatedTimer, Scheduler, get_engine_mame_par
 
 
 class TestUtilities(unittest.TestCase):
@@ -12,5 +14,48 @@ class TestUtilities(unittest.TestCase):
         self.assertEqual('-nothrottle', get_engine_mame_par(0.009, True))
 
 
+class TestScheduler(unittest.TestCase):
+
+    def test_calls_in_time_order(self):
+        scheduler = Scheduler()
+        calls = []
+        done = threading.Event()
+        scheduler.schedule(0.06, done.set)
+        scheduler.schedule(0.04, calls.append, 'second')
+        scheduler.schedule(0.02, calls.append, 'first')
+        self.assertTrue(done.wait(2))
+        self.assertEqual(['first', 'second'], calls)
+
+    def test_cancel(self):
+        scheduler = Scheduler()
+        calls = []
+        done = threading.Event()
+        call = scheduler.schedule(0.02, calls.append, 'cancelled')
+        self.assertTrue(call.is_pending())
+        call.cancel()
+        self.assertFalse(call.is_pending())
+        scheduler.schedule(0.04, done.set)
+        self.assertTrue(done.wait(2))
+        self.assertEqual([], calls)
+
+    def test_failing_call(self):
+        scheduler = Scheduler()
+        done = threading.Event()
+        scheduler.schedule(0, lambda: 1 / 0)
+        scheduler.schedule(0.01, done.set)
+        self.assertTrue(done.wait(2))
+
+    def test_repeated_timer(self):
+        calls = []
+        timer = RepeatedTimer(0.01, calls.append, 1)
+        timer.start()
+        time.sleep(0.1)
+        timer.stop()
+        count = len(calls)
+        time.sleep(0.05)
+        self.assertGreater(count, 2)
+        self.assertEqual(count, len(calls))
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+import os
+import stat
+import sys
+import tempfile
+import threading
+import unittest
+
+import chess.uci  # type: ignore
+
+from uci.engine import UciTcpShell, is_engine_host_address
+from uci.engine_host import EngineHost, is_loopback, resolve_engine_file
+
+FAKE_ENGINE = """#!{python}
+import sys
+for line in sys.stdin:
+    cmd = line.strip()
+    if cmd == 'uci':
+        print('id name Fake Engine')
+        print('uciok')
+        sys.stdout.flush()
+    elif cmd == 'isready':
+        print('readyok')
+        sys.stdout.flush()
+    elif cmd == 'quit':
+        break
+"""
+
+
+class TestEngineHost(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.engine_path = self.tmp_dir.name
+        engine_file = os.path.join(self.engine_path, 'a-fake')
+        with open(engine_file, 'w') as file:
+            file.write(FAKE_ENGINE.format(python=sys.executable))
+        os.chmod(engine_file, os.stat(engine_file).st_mode | stat.S_IEXEC)
+        with open(engine_file + '.uci', 'w') as file:
+            file.write('[Level@00]\nSkill Level = 0\n')
+        self.server = EngineHost(('127.0.0.1', 0), self.engine_path, token='secret')
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.address = 'tcp://127.0.0.1:{}'.format(self.server.server_address[1])
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self.tmp_dir.cleanup()
+
+    def test_engine_runs_on_host(self):
+        shell = UciTcpShell(self.address, token='secret')
+        engine = chess.uci.spur_spawn_engine(shell, ['/a-fake'])
+        engine.uci()
+        self.assertEqual('Fake Engine', engine.name)
+        engine.isready()
+        engine.quit()
+        self.assertFalse(engine.is_alive())
+        shell.close()
+
+    def test_read_file(self):
+        shell = UciTcpShell(self.address, token='secret')
+        with shell.open(self.engine_path + os.sep + 'a-fake.uci') as file:
+            self.assertEqual('[Level@00]\nSkill Level = 0\n', file.read())
+        with self.assertRaises(FileNotFoundError):
+            shell.open('../outside.uci')
+        shell.close()
+
+    def test_unknown_engine(self):
+        shell = UciTcpShell(self.address, token='secret')
+        with self.assertRaises(OSError):
+            shell.spawn(['b-missing'], store_pid=True, allow_error=True, stdout=None)
+        shell.close()
+
+    def test_wrong_token(self):
+        shell = UciTcpShell(self.address, token='wrong')
+        self.assertFalse(shell.is_connected())
+
+    def test_resolve_engine_file(self):
+        self.assertIsNone(resolve_engine_file(self.engine_path, '../etc/passwd'))
+        self.assertEqual(os.path.realpath(os.path.join(self.engine_path, 'etc', 'passwd')),
+                         resolve_engine_file(self.engine_path, '/etc/passwd'))
+        self.assertEqual(os.path.realpath(os.path.join(self.engine_path, 'a-fake')),
+                         resolve_engine_file(self.engine_path, 'a-fake'))
+
+    def test_is_loopback(self):
+        self.assertTrue(is_loopback('127.0.0.1'))
+        self.assertTrue(is_loopback('::1'))
+        self.assertTrue(is_loopback('localhost'))
+        self.assertFalse(is_loopback('0.0.0.0'))
+        self.assertFalse(is_loopback('board.local'))
+
+    def test_engine_host_address(self):
+        self.assertTrue(is_engine_host_address('tcp://192.168.1.2:9898'))
+        self.assertTrue(is_engine_host_address('unix:///tmp/engines.sock'))
+        self.assertFalse(is_engine_host_address('192.168.1.2'))
+        self.assertFalse(is_engine_host_address(None))
+
+
+if __name__ == '__main__':
+    unittest.main()
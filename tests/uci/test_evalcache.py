@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+import os
+import tempfile
+import unittest
+
+import chess  # type: ignore
+import chess.uci  # type: ignore
+
+from uci.evalcache import CachingInfoHandler, EvalCache, Evaluation, engine_identity
+
+
+def evaluation(depth, lines=1):
+    moves = [chess.Move.from_uci(move) for move in ('e2e4', 'd2d4', 'g1f3')[:lines]]
+    return Evaluation(depth, moves[0], {i + 1: [move] for i, move in enumerate(moves)},
+                      {i + 1: chess.uci.Score(30 - i, None) for i in range(lines)})
+
+
+class TestEvalCache(unittest.TestCase):
+    def setUp(self):
+        self.board = chess.Board()
+
+    def test_depth(self):
+        cache = EvalCache()
+        cache.put(self.board, evaluation(5, lines=3))
+        cache.put(self.board, evaluation(17, lines=3))
+        cache.put(self.board, evaluation(20))
+        self.assertEqual(20, cache.get(self.board).depth)
+        self.assertEqual(17, cache.get(self.board, depth=17, multipv=3).depth)
+        self.assertEqual(5, cache.get(self.board, depth=5, multipv=3, exact=True).depth)
+        self.assertIsNone(cache.get(self.board, depth=21))
+        self.assertIsNone(cache.get(self.board, depth=6, exact=True))
+
+    def test_least_recently_used_dropped(self):
+        cache = EvalCache(size=2)
+        black_move = evaluation(10)._replace(bestmove=chess.Move.from_uci('e7e5'))
+        boards = []
+        for move in ('e2e4', 'd2d4', 'c2c4'):
+            board = chess.Board()
+            board.push_uci(move)
+            boards.append(board)
+        cache.put(boards[0], black_move)
+        cache.put(boards[1], black_move)
+        cache.get(boards[0])
+        cache.put(boards[2], black_move)
+        self.assertIsNotNone(cache.get(boards[0]))
+        self.assertIsNone(cache.get(boards[1]))
+        self.assertIsNotNone(cache.get(boards[2]))
+
+    def test_illegal_bestmove(self):
+        cache = EvalCache()
+        cache.put(self.board, evaluation(10)._replace(bestmove=chess.Move.from_uci('e7e5')))
+        self.assertIsNone(cache.get(self.board))
+
+    def test_store_and_restore(self):
+        cache = EvalCache()
+        info = {'depth': 12, 'pv': {1: [chess.Move.from_uci('e2e4'), chess.Move.from_uci('e7e5')]},
+                'score': {1: chess.uci.Score(25, None)}}
+        cache.store(self.board, info, chess.Move.from_uci('e2e4'), 'tutor')
+        cache.store(self.board, {'depth': 14, 'pv': {}, 'score': {}}, None, 'tutor')
+
+        self.assertFalse(cache.restore(self.board, CachingInfoHandler(identity='engine'), 12, 1))
+        handler = CachingInfoHandler(identity='tutor')
+        self.assertFalse(cache.restore(self.board, handler, 13, 1))
+        self.assertTrue(cache.restore(self.board, handler, 12, 1))
+        self.assertEqual(12, handler.info['depth'])
+        self.assertEqual(info['pv'], handler.info['pv'])
+        self.assertEqual(info['score'], handler.info['score'])
+
+    def test_engines_apart(self):
+        cache = EvalCache()
+        play = engine_identity('engines/a-stockf', {'Skill Level': '5'})
+        tutor = engine_identity('engines/a-stockf', {'MultiPV': 3})
+        cache.put(self.board, evaluation(20), play)
+        cache.put(self.board, evaluation(10), tutor)
+        self.assertEqual(20, cache.get(self.board, engine=play).depth)
+        self.assertEqual(10, cache.get(self.board, engine=tutor).depth)
+        self.assertIsNone(cache.get(self.board, engine=engine_identity('engines/a-stockf', {'Skill Level': '20'})))
+
+        cache.forget(play)
+        self.assertIsNone(cache.get(self.board, engine=play))
+        self.assertEqual(10, cache.get(self.board, engine=tutor).depth)
+
+    def test_save_and_load(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            file_name = os.path.join(tmp_dir, 'evaluations.cache')
+            cache = EvalCache(file_name=file_name)
+            cache.put(self.board, evaluation(17, lines=3), 'engine')
+            cache.save()
+
+            loaded = EvalCache()
+            loaded.configure(10, file_name)
+            self.assertEqual(evaluation(17, lines=3), loaded.get(self.board, engine='engine'))
+            self.assertIsNone(loaded.get(self.board))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+import io
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from uci.read import read_engine_ini
+import uci.read
+
+ENGINES_INI = """[a-stockf]
+name = Stockfish 16
+small = stkf16
+medium = Stockf16
+large = Stockfish16
+elo = 3500
+"""
+
+STOCKFISH_UCI = """[Level@00]
+Skill Level = 0
+
+[Level@01]
+Skill Level = 1
+"""
+
+
+class RemoteShellMock:
+    def __init__(self, files):
+        self.files = files
+        self.opened = []
+
+    def open(self, name, mode):
+        self.opened.append(name)
+        if name not in self.files:
+            raise FileNotFoundError(name)
+        return io.StringIO(self.files[name])
+
+
+class TestReadEngineIni(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.engine_path = self.tmp_dir.name
+        with open(os.path.join(self.engine_path, 'engines.ini'), 'w') as file:
+            file.write(ENGINES_INI)
+        with open(os.path.join(self.engine_path, 'a-stockf.uci'), 'w') as file:
+            file.write(STOCKFISH_UCI)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_read_engines(self):
+        library = read_engine_ini(engine_path=self.engine_path, filename='engines.ini')
+        self.assertEqual(1, len(library))
+        self.assertEqual('Stockfish 16', library[0]['name'])
+        self.assertEqual(self.engine_path + os.sep + 'a-stockf', library[0]['file'])
+        self.assertEqual({'Level@00': {'Skill Level': '0'}, 'Level@01': {'Skill Level': '1'}}, library[0]['level_dict'])
+        self.assertEqual('Stockfish16', library[0]['text'].web_text)
+
+    def test_catalog_is_used_when_files_unchanged(self):
+        first = read_engine_ini(engine_path=self.engine_path, filename='engines.ini')
+        with patch('uci.read._parse_engines', wraps=uci.read._parse_engines) as parse_mock:
+            second = read_engine_ini(engine_path=self.engine_path, filename='engines.ini')
+            parse_mock.assert_not_called()
+        self.assertEqual(first[0]['level_dict'], second[0]['level_dict'])
+        self.assertEqual(first[0]['name'], second[0]['name'])
+
+    def test_catalog_is_refreshed_when_uci_file_changes(self):
+        read_engine_ini(engine_path=self.engine_path, filename='engines.ini')
+        with open(os.path.join(self.engine_path, 'a-stockf.uci'), 'a') as file:
+            file.write('\n[Level@02]\nSkill Level = 2\n')
+        library = read_engine_ini(engine_path=self.engine_path, filename='engines.ini')
+        self.assertIn('Level@02', library[0]['level_dict'])
+
+    def test_remote_engines_are_read_from_the_shell(self):
+        shell = RemoteShellMock({'/remote/engines.ini': ENGINES_INI, '/remote/a-stockf.uci': STOCKFISH_UCI})
+        library = read_engine_ini(engine_shell=shell, engine_path='/remote', filename='engines.ini')
+        self.assertEqual(['/remote/engines.ini', '/remote/a-stockf.uci'], shell.opened)
+        self.assertEqual({'Level@00': {'Skill Level': '0'}, 'Level@01': {'Skill Level': '1'}}, library[0]['level_dict'])
+        self.assertEqual('/remote/a-stockf', library[0]['file'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+import time
+import unittest
+
+import chess  # type: ignore
+import chess.uci  # type: ignore
+
+from uci.speculation import SpeculativeBrain, expected_move_time
+
+
+class MockEngine(object):
+    def __init__(self):
+        self.game = None
+        self.searches = []
+        self.waiting = True
+
+    def position(self, game):
+        self.game = game.copy()
+
+    def brain(self, time_dict):
+        self.searches.append(('brain', self.game.peek()))
+        self.waiting = False
+
+    def ponder(self):
+        self.searches.append(('ponder', self.game.peek()))
+        self.waiting = False
+
+    def stop(self):
+        self.waiting = True
+        bestmove = next(iter(self.game.legal_moves))
+        return chess.uci.BestMove(bestmove, None)
+
+
+class TestSpeculativeBrain(unittest.TestCase):
+    def setUp(self):
+        self.game = chess.Board()
+        self.e4 = chess.Move.from_uci('e2e4')
+        self.d4 = chess.Move.from_uci('d2d4')
+        self.c4 = chess.Move.from_uci('c2c4')
+        self.engine = MockEngine()
+
+    def wait_for_brain(self, speculation):
+        for _ in range(200):
+            if len(self.engine.searches) > 1 and speculation.is_brain_on(self.e4):
+                return
+            time.sleep(0.01)
+        self.fail('speculation did not return to the ponder move')
+
+    def test_single_candidate(self):
+        speculation = SpeculativeBrain(candidates=1)
+        speculation.start(self.engine, self.game, self.e4, lambda: [self.d4], {})
+        self.assertEqual([('brain', self.e4)], self.engine.searches)
+        self.assertTrue(speculation.is_brain_on(self.e4))
+        self.assertIsNone(speculation.worker)
+
+    def test_candidates_in_turn(self):
+        speculation = SpeculativeBrain(candidates=3, slice_time=0.01)
+        speculation.start(self.engine, self.game, self.e4, lambda: [self.e4, self.d4, self.c4, self.d4], {})
+        self.wait_for_brain(speculation)
+        speculation.cancel()
+        self.assertEqual([('brain', self.e4), ('ponder', self.d4), ('ponder', self.c4), ('brain', self.e4)],
+                         self.engine.searches)
+        self.assertFalse(self.engine.waiting)  # ponderhit still possible
+
+        game_d4 = self.game.copy()
+        game_d4.push(self.d4)
+        self.assertEqual(next(iter(game_d4.legal_moves)), speculation.lookup(game_d4, {'movetime': 1}).bestmove)
+        self.assertIsNone(speculation.lookup(game_d4, {'movetime': 60000}))
+        self.assertIsNone(speculation.lookup(game_d4, {'depth': 10}))
+
+    def test_cancel_stops_predicted_move(self):
+        speculation = SpeculativeBrain(candidates=2, slice_time=0.2)
+        speculation.start(self.engine, self.game, self.e4, lambda: [self.d4], {})
+        for _ in range(200):
+            if speculation.searching == self.d4:
+                break
+            time.sleep(0.01)
+        speculation.cancel()
+        self.assertTrue(self.engine.waiting)
+        self.assertFalse(speculation.is_brain_on(self.e4))
+        game_d4 = self.game.copy()
+        game_d4.push(self.d4)
+        self.assertIsNotNone(speculation.lookup(game_d4, {'movetime': 0}))
+
+    def test_clear_forgets_speculations(self):
+        speculation = SpeculativeBrain(candidates=2, slice_time=0.01)
+        speculation.start(self.engine, self.game, self.e4, lambda: [self.d4], {})
+        self.wait_for_brain(speculation)
+        speculation.clear()
+        game_d4 = self.game.copy()
+        game_d4.push(self.d4)
+        self.assertIsNone(speculation.lookup(game_d4, {'movetime': 0}))
+        self.assertFalse(speculation.is_brain_on(self.e4))
+
+    def test_expected_move_time(self):
+        self.assertEqual(5, expected_move_time(self.game, {'movetime': 5000}))
+        self.assertEqual(3, expected_move_time(self.game, {'wtime': 80000, 'btime': 10000, 'winc': 1000}))
+        self.assertEqual(1, expected_move_time(self.game, {'wtime': 10000, 'btime': 10000, 'movestogo': 10}))
+        self.assertIsNone(expected_move_time(self.game, {'nodes': 1000}))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+import os
+import threading
+import unittest
+from unittest.mock import patch
+
+from uci.engine import UciShell
+from uci.standby import EngineStandby
+
+
+class MockProcess(object):
+    def pid(self):
+        return 4711
+
+
+class MockEngine(object):
+    def __init__(self, *args, **kwargs):
+        self.name = 'Mocked engine'
+        self.options = {}
+        self.info_handlers = list()
+        self.process = MockProcess()
+        self.quitted = False
+
+    def uci(self):
+        pass
+
+    def quit(self):
+        self.quitted = True
+        return 0
+
+
+@patch('uci.standby.available_memory_mb', new=lambda: None)
+@patch('chess.uci.popen_engine', new=MockEngine)
+class TestEngineStandby(unittest.TestCase):
+    @patch('uci.standby.process_memory_mb', new=lambda pid: 100)
+    def test_take_prepared_engine(self):
+        standby = EngineStandby(UciShell(), 256)
+        standby.prepare('engines/a-stockf', '')
+        engine = standby.take('engines/a-stockf', '')
+        self.assertIsNotNone(engine)
+        self.assertEqual('engines/a-stockf', engine.get_file())
+        self.assertIsNone(standby.take('engines/a-stockf', ''))
+
+    @patch('uci.standby.process_memory_mb', new=lambda pid: 100)
+    def test_take_with_relative_path(self):
+        standby = EngineStandby(UciShell(), 256)
+        standby.prepare(os.path.abspath('engines/a-stockf'), '')
+        self.assertIsNotNone(standby.take('engines/../engines/a-stockf', ''))
+
+    @patch('uci.standby.process_memory_mb', new=lambda pid: 100)
+    def test_take_other_engine(self):
+        standby = EngineStandby(UciShell(), 256)
+        standby.prepare('engines/a-stockf', '')
+        self.assertIsNone(standby.take('engines/b-texel', ''))
+
+    @patch('uci.standby.process_memory_mb', new=lambda pid: 100)
+    def test_prepare_replaces_standby_engine(self):
+        standby = EngineStandby(UciShell(), 256)
+        standby.prepare('engines/a-stockf', '')
+        first = standby.take('engines/a-stockf', '')
+        standby.prepare('engines/a-stockf', '')
+        standby._thread.join()
+        old_engine = standby._engine
+        standby.prepare('engines/b-texel', '')
+        self.assertTrue(old_engine.engine.quitted)
+        self.assertFalse(first.engine.quitted)
+        self.assertIsNotNone(standby.take('engines/b-texel', ''))
+
+    @patch('uci.standby.process_memory_mb', new=lambda pid: 1000)
+    def test_engine_over_memory_budget_is_dropped(self):
+        standby = EngineStandby(UciShell(), 256)
+        standby.prepare('engines/a-stockf', '')
+        self.assertIsNone(standby.take('engines/a-stockf', ''))
+        self.assertIsNone(standby.get_file())
+
+    @patch('uci.standby.process_memory_mb', new=lambda pid: 100)
+    def test_hanging_startup_is_dropped(self):
+        started = threading.Event()
+        release = threading.Event()
+        engines = []
+
+        class HangingEngine(MockEngine):
+            def uci(self):
+                engines.append(self)
+                started.set()
+                release.wait(5)
+
+        standby = EngineStandby(UciShell(), 256)
+        standby.TAKE_TIMEOUT = 0.1
+        with patch('chess.uci.popen_engine', new=HangingEngine):
+            standby.prepare('engines/a-stockf', '')
+            started.wait(5)
+            self.assertIsNone(standby.take('engines/a-stockf', ''))
+            self.assertIsNone(standby.get_file())
+            release.set()
+            standby._thread.join()
+        self.assertIsNone(standby._engine)
+        self.assertTrue(engines[0].quitted)
+
+    def test_no_standby_for_mame_engines(self):
+        standby = EngineStandby(UciShell(), 256)
+        standby.prepare('engines/mame/academy', '-speed 1.0')
+        self.assertIsNone(standby.get_file())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,60 +1,167 @@
+import io
 import paramiko
 import unittest
 from unittest.mock import patch
 
-from uci.engine import UciShell, WindowsShellType
+from uci.engine import UciShell
 
 
-class SshShellMock:
-    def __init__(*args, **kwargs):
+class SftpMock:
+    def __init__(self):
+        self.opened = []
+
+    def get_channel(self):
+        return ChannelMock()
+
+    def open(self, name, mode):
+        self.opened.append(name)
+        return io.BytesIO(b"[Level@00]\n")
+
+
+class ChannelMock:
+    closed = False
+
+
+class SessionMock:
+    def __init__(self, output):
+        self.output = output
+        self.command = None
+
+    def exec_command(self, command):
+        self.command = command
+
+    def makefile(self, mode):
+        return io.BytesIO(self.output) if "r" in mode else io.BytesIO()
+
+    def makefile_stderr(self, mode):
+        return io.BytesIO()
+
+    def exit_status_ready(self):
+        return True
+
+
+class TransportMock:
+    def __init__(self):
+        self.active = True
+        self.sftp_clients = []
+        self.sessions = []
+
+    def is_active(self):
+        return self.active
+
+    def set_keepalive(self, interval):
+        self.keepalive = interval
+
+    def open_sftp_client(self):
+        self.sftp_clients.append(SftpMock())
+        return self.sftp_clients[-1]
+
+    def open_session(self):
+        self.sessions.append(SessionMock(b"4711\n0\n"))
+        return self.sessions[-1]
+
+
+class ClientMock:
+    instances: list = []
+
+    def __init__(self):
+        ClientMock.instances.append(self)
+        self.transport = None
+        self.closed = False
+
+    def load_system_host_keys(self):
         pass
 
+    def set_missing_host_key_policy(self, policy):
+        self.policy = policy
+
+    def connect(self, **kwargs):
+        self.kwargs = kwargs
+        self.transport = TransportMock()
+
+    def get_transport(self):
+        return self.transport
+
     def close(self):
-        return 42
+        self.closed = True
 
 
+@patch("paramiko.SSHClient", new=ClientMock)
 class TestUciShell(unittest.TestCase):
+    def setUp(self):
+        ClientMock.instances = []
+
     def test_no_hostname(self):
         uci_shell = UciShell()
         self.assertIsNone(uci_shell.get())
 
-    @patch("spur.SshShell")
-    def test_password_authentication(self, sshshell_mock):
+    def test_password_authentication(self):
         uci_shell = UciShell(hostname="test", username="user", password="pass")
-        kwargs = sshshell_mock.call_args.kwargs
-        self.assertEqual(kwargs["hostname"], "test")
-        self.assertEqual(kwargs["username"], "user")
-        self.assertEqual(kwargs["password"], "pass")
-        self.assertTrue(isinstance(kwargs["missing_host_key"], paramiko.AutoAddPolicy))
-        self.assertIsNone(kwargs.get("private_key_file"))
-        self.assertIsNone(kwargs.get("shell_type"))
+        self.assertTrue(uci_shell.is_connected())
+        client = ClientMock.instances[0]
+        self.assertEqual(client.kwargs["hostname"], "test")
+        self.assertEqual(client.kwargs["username"], "user")
+        self.assertEqual(client.kwargs["password"], "pass")
+        self.assertTrue(isinstance(client.policy, paramiko.AutoAddPolicy))
+        self.assertIsNone(client.kwargs.get("key_filename"))
         self.assertIsNotNone(uci_shell.get())
 
-    @patch("spur.SshShell")
-    def test_private_key_authentication(self, sshshell_mock):
+    def test_private_key_authentication(self):
         uci_shell = UciShell(hostname="test", username="user", key_file="key")
-        kwargs = sshshell_mock.call_args.kwargs
-        self.assertEqual(kwargs["hostname"], "test")
-        self.assertEqual(kwargs["username"], "user")
-        self.assertIsNone(kwargs.get("password"))
-        self.assertTrue(isinstance(kwargs["missing_host_key"], paramiko.AutoAddPolicy))
-        self.assertEqual(kwargs["private_key_file"], "key")
-        self.assertIsNone(kwargs.get("shell_type"))
+        self.assertTrue(uci_shell.is_connected())
+        client = ClientMock.instances[0]
+        self.assertEqual(client.kwargs["hostname"], "test")
+        self.assertEqual(client.kwargs["username"], "user")
+        self.assertIsNone(client.kwargs.get("password"))
+        self.assertTrue(isinstance(client.policy, paramiko.AutoAddPolicy))
+        self.assertEqual(client.kwargs["key_filename"], "key")
         self.assertIsNotNone(uci_shell.get())
 
-    @patch("spur.SshShell")
-    def test_windows_shell(self, sshshell_mock):
+    def test_spawn(self):
+        uci_shell = UciShell(hostname="test", username="user", password="pass")
+        process = uci_shell.spawn(["engines/a-stockf"], store_pid=True, allow_error=True)
+        session = ClientMock.instances[0].transport.sessions[0]
+        self.assertEqual(4711, process.pid)
+        self.assertIn("engines/a-stockf", session.command)
+        self.assertNotIn("powershell", session.command)
+
+    def test_windows_shell(self):
         uci_shell = UciShell(hostname="test", username="user", password="pass", windows=True)
-        kwargs = sshshell_mock.call_args.kwargs
-        self.assertEqual(kwargs["hostname"], "test")
-        self.assertEqual(kwargs["username"], "user")
-        self.assertEqual(kwargs["password"], "pass")
-        self.assertTrue(isinstance(kwargs["missing_host_key"], paramiko.AutoAddPolicy))
-        self.assertIsNone(kwargs.get("private_key_file"))
-        self.assertTrue(isinstance(kwargs["shell_type"], WindowsShellType))
-        self.assertIsNotNone(uci_shell.get())
+        uci_shell.spawn(["engines/a-stockf"], store_pid=True, allow_error=True)
+        self.assertIn("powershell", ClientMock.instances[0].transport.sessions[0].command)
+
+    def test_close(self):
+        uci_shell = UciShell(hostname="test", username="user", password="pass")
+        uci_shell.is_connected()
+        uci_shell.close()
+        self.assertTrue(ClientMock.instances[0].closed)
+
+    def test_sftp_session_is_shared(self):
+        uci_shell = UciShell(hostname="test", username="user", password="pass")
+        with uci_shell.open("engines.ini") as file:
+            file.read()
+        with uci_shell.open("a-stockf.uci") as file:
+            self.assertEqual("[Level@00]\n", file.read())
+        self.assertEqual(1, len(ClientMock.instances))
+        transport = ClientMock.instances[0].transport
+        self.assertEqual(1, len(transport.sftp_clients))
+        self.assertEqual(["engines.ini", "a-stockf.uci"], transport.sftp_clients[0].opened)
+        self.assertEqual(30, transport.keepalive)
+
+    def test_sftp_file_class_is_created_once(self):
+        uci_shell = UciShell(hostname="test", username="user", password="pass")
+        with uci_shell.open("engines.ini", "rb") as first, uci_shell.open("a-stockf.uci", "rb") as second:
+            self.assertIs(type(first), type(second))
 
-    @patch("spur.SshShell", new=SshShellMock)
-    def test_call_redirection(self):
+    def test_lost_connection_is_reconnected(self):
         uci_shell = UciShell(hostname="test", username="user", password="pass")
-        self.assertEqual(uci_shell.get().close(), 42)
+        self.assertTrue(uci_shell.is_connected())
+        ClientMock.instances[0].transport.active = False
+        with uci_shell.open("a-stockf.uci") as file:
+            file.read()
+        self.assertEqual(2, len(ClientMock.instances))
+        self.assertTrue(ClientMock.instances[0].closed)
+        self.assertEqual(1, len(ClientMock.instances[1].transport.sftp_clients))
+
+    def test_local_shell_is_not_connected(self):
+        self.assertFalse(UciShell().is_connected())
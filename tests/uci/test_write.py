@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+import configparser
+import os
+import stat
+import sys
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from uci.write import write_engine_ini
+import uci.write
+
+FAKE_ENGINE = """#!{python}
+import sys
+import time
+for line in sys.stdin:
+    cmd = line.strip()
+    if cmd == 'uci':
+        time.sleep({delay})
+        print('id name {name}')
+        print('option name Skill Level type spin default 20 min 0 max 2')
+        print('uciok')
+        sys.stdout.flush()
+    elif cmd == 'quit':
+        break
+"""
+
+
+class TestWriteEngineIni(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.engine_path = self.tmp_dir.name
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def add_engine(self, file_name, name, delay=0):
+        path = os.path.join(self.engine_path, file_name)
+        with open(path, 'w') as file:
+            file.write(FAKE_ENGINE.format(python=sys.executable, name=name, delay=delay))
+        os.chmod(path, os.stat(path).st_mode | stat.S_IEXEC)
+
+    def read_ini(self):
+        config = configparser.ConfigParser()
+        config.optionxform = str
+        config.read(os.path.join(self.engine_path, 'engines.ini'))
+        return config
+
+    def test_engines_are_probed(self):
+        self.add_engine('a-first', 'First Engine 1.0')
+        self.add_engine('b-second', 'Second 2')
+        write_engine_ini(self.engine_path, workers=2, timeout=10)
+        config = self.read_ini()
+        self.assertEqual(['a-first', 'b-second'], config.sections())
+        self.assertEqual('First Engine 1.0', config['a-first']['name'])
+        with open(os.path.join(self.engine_path, 'engines.ini')) as file:
+            self.assertIn(';Skill Level = 20', file.read())
+        self.assertTrue(os.path.isfile(os.path.join(self.engine_path, 'a-first.uci')))
+
+    def test_unchanged_engines_are_not_probed_again(self):
+        self.add_engine('a-first', 'First Engine 1.0')
+        write_engine_ini(self.engine_path, workers=1, timeout=10)
+        self.add_engine('b-second', 'Second 2')
+        with patch('uci.write.probe_engine', wraps=uci.write.probe_engine) as probe_mock:
+            write_engine_ini(self.engine_path, workers=1, timeout=10)
+            probe_mock.assert_called_once_with(self.engine_path, 'b-second', 10)
+        self.assertEqual(['a-first', 'b-second'], self.read_ini().sections())
+
+    def test_slow_engine_is_skipped(self):
+        self.add_engine('a-first', 'First Engine 1.0')
+        self.add_engine('b-slow', 'Slow', delay=5)
+        write_engine_ini(self.engine_path, workers=2, timeout=1)
+        self.assertEqual(['a-first'], self.read_ini().sections())
+
+    def test_broken_engine_is_skipped(self):
+        self.add_engine('a-first', 'First Engine 1.0')
+        self.add_engine('b-broken', 'Broken')
+        probe_engine = uci.write.probe_engine
+
+        def probe(engine_path, engine_file_name, timeout):
+            if engine_file_name == 'b-broken':
+                raise KeyError('UCI_Elo')
+            return probe_engine(engine_path, engine_file_name, timeout)
+
+        with patch('uci.write.probe_engine', side_effect=probe):
+            write_engine_ini(self.engine_path, workers=2, timeout=10)
+        self.assertEqual(['a-first'], self.read_ini().sections())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -12,18 +12,16 @@
 # along with this program. If not, see <http://www.gnu.org/licenses/>.
 
 import datetime
-from geopy.geocoders import Nominatim  # type: ignore
-from geopy.exc import GeopyError  # type: ignore
-from astral import LocationInfo  # type: ignore
-from astral.sun import sun  # type: ignore
-import astral.geocoder  # type: ignore
 
 import utilities
 
+# astral and geopy are imported on first use, most themes dont need them and they are slow to import on a Pi
+
 
 def calc_theme(theme_in: str, location_setting: str) -> str:
     theme_out = theme_in
     if theme_in == 'auto':
+        import astral.geocoder  # type: ignore
         location = utilities.get_location()[0] if location_setting == 'auto' else location_setting
         try:
             location_info = astral.geocoder.lookup(location, astral.geocoder.database())
@@ -53,6 +51,7 @@ def _theme_according_to_current_time() -> str:
 
 
 def _theme_from_location_info(location_info) -> str:
+    from astral.sun import sun  # type: ignore
     local_timezone = location_info.tzinfo
     local_time = datetime.datetime.now(local_timezone)
     sun_info = sun(location_info.observer, tzinfo=local_timezone)
@@ -68,6 +67,9 @@ def _theme_for_time(current_time: datetime.datetime, sunrise: datetime.datetime,
 
 
 def _location_info_from_location(location: str):
+    from astral import LocationInfo  # type: ignore
+    from geopy.exc import GeopyError  # type: ignore
+    from geopy.geocoders import Nominatim  # type: ignore
     location_info = None
     geolocator = Nominatim(user_agent='Picochess')
     try:
@@ -0,0 +1,110 @@
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Deque, Dict, Tuple
+
+from dgt.api import Event, Message
+
+# the events and messages a move passes from the board till the clock, web and voice
+MOVE_EVENTS = (Event.FEN, Event.KEYBOARD_FEN, Event.KEYBOARD_MOVE, Event.REMOTE_MOVE, Event.BEST_MOVE,
+               Event.NEW_GAME)
+MOVE_MESSAGES = (Message.DGT_FEN, Message.USER_MOVE_DONE, Message.COMPUTER_MOVE, Message.COMPUTER_MOVE_DONE,
+                 Message.START_NEW_GAME, Message.TAKE_BACK)
+
+TraceEvent = Tuple[str, str, str, float, float, int, str, Dict[str, str]]  # phase, name, cat, ts, dur, tid, ...
+
+
+def trace_args(item) -> Dict[str, str]:
+    """Return the fen and move of an event or message, they tie the spans of one move together."""
+    return {key: str(value) for key, value in vars(item).items() if key in ('fen', 'move') and value}
+
+
+class Tracer(object):
+
+    """
+    Spans of the move lifecycle, kept in a ring buffer of the last size events.
+
+    The events are exported in the Chrome trace format, so chrome://tracing or Perfetto shows them
+    on a timeline with one row per thread.
+    """
+
+    def __init__(self, size: int = 4096):
+        self.events: Deque[TraceEvent] = deque(maxlen=size)
+
+    @staticmethod
+    def now() -> float:
+        """Return the time in microseconds, pass it to complete() for spans crossing functions."""
+        return time.perf_counter() * 1e6
+
+    def _add(self, phase: str, name: str, cat: str, start: float, duration: float, args: Dict[str, str]):
+        thread = threading.current_thread()
+        self.events.append((phase, name, cat, start, duration, thread.ident or 0, thread.name, args))
+
+    def instant(self, name: str, cat: str, **args: str):
+        self._add('i', name, cat, self.now(), 0, args)
+
+    def complete(self, name: str, cat: str, start: float, **args: str):
+        """Add a span which started at start (from now()) and ends now."""
+        self._add('X', name, cat, start, self.now() - start, args)
+
+    @contextmanager
+    def span(self, name: str, cat: str, **args: str):
+        start = self.now()
+        try:
+            yield
+        finally:
+            self.complete(name, cat, start, **args)
+
+    @contextmanager
+    def message_span(self, message, display: str):
+        """Trace the processing of message by a display, if it belongs to a move."""
+        if not isinstance(message, MOVE_MESSAGES):
+            yield
+            return
+        with self.span(repr(message), display, **trace_args(message)):
+            yield
+
+    def clear(self):
+        self.events.clear()
+
+    def chrome_trace(self) -> dict:
+        """Return the events in the Chrome trace format."""
+        pid = os.getpid()
+        trace_events = []
+        threads: Dict[int, str] = {}
+        for phase, name, cat, start, duration, tid, thread_name, args in list(self.events):
+            threads[tid] = thread_name
+            event = {'name': name, 'cat': cat, 'ph': phase, 'ts': round(start, 1), 'pid': pid, 'tid': tid,
+                     'args': args}
+            if phase == 'X':
+                event['dur'] = round(duration, 1)
+            else:
+                event['s'] = 't'  # instant on its thread
+            trace_events.append(event)
+        trace_events.extend({'name': 'thread_name', 'ph': 'M', 'pid': pid, 'tid': tid, 'args': {'name': name}}
+                            for tid, name in threads.items())
+        return {'traceEvents': trace_events, 'displayTimeUnit': 'ms'}
+
+    def dump(self, file_name: str):
+        """Write the events to a Chrome trace JSON file."""
+        with open(file_name, 'w') as trace_file:
+            json.dump(self.chrome_trace(), trace_file)
+
+
+tracer = Tracer()
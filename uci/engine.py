@@ -15,19 +15,26 @@
 # You should have received a copy of the GNU General Public License
 # along with this program. If not, see <http://www.gnu.org/licenses/>.
 
+import io
+import itertools
+import json
 import os
-from typing import Optional
+import socket
+import time
+import threading
+from typing import Dict, Optional, Union
 import logging
 import configparser
-import spur  # type: ignore
-import paramiko
 
 from subprocess import DEVNULL
 from dgt.api import Event
+from metrics import metrics
 from utilities import Observable
 import chess.uci  # type: ignore
 from chess import Board  # type: ignore
-from uci.informer import Informer
+from uci.evalcache import engine_identity, eval_cache
+from uci.informer import Informer, SearchMetrics
+from uci.engine_host import DEFAULT_PORT, send_message
 from uci.rating import Rating, Result
 from utilities import write_picochess_ini
 
@@ -37,6 +44,8 @@ UCI_ELO_NON_STANDARD2 = "UCI_Limit"
 
 logger = logging.getLogger(__name__)
 
+# spur and paramiko are only imported for remote engines, they are slow to import on a Pi
+
 
 class WindowsShellType:
     """Shell type supporting Windows for spur."""
@@ -45,6 +54,7 @@ class WindowsShellType:
 
     def generate_run_command(self, command_args, store_pid, cwd=None, update_env={}, new_process_group=False):
         if new_process_group:
+            import spur.ssh  # type: ignore
             raise spur.ssh.UnsupportedArgumentError("'new_process_group' is not supported when using a windows shell")
 
         commands = []
@@ -79,42 +89,361 @@ class WindowsShellType:
         return '"' + value + '"'
 
 
+_pooled_sftp_file_class = None  # created on the first remote file, spur is imported lazily
+
+
+def _pooled_sftp_file(sftp, sftp_file, mode: str):
+    """Return a remote file which keeps the (shared) sftp session open when closed."""
+    global _pooled_sftp_file_class
+    if _pooled_sftp_file_class is None:
+        import spur.ssh  # type: ignore
+
+        class PooledSftpFile(spur.ssh.SftpFile):
+
+            def close(self):
+                self._file.close()
+
+        _pooled_sftp_file_class = PooledSftpFile
+    return _pooled_sftp_file_class(sftp, sftp_file, mode)
+
+
 class UciShell(object):
-    """Handle the uci engine shell."""
+    """Handle the uci engine shell.
+
+    For a remote engine one paramiko ssh client is kept alive and shared by the engine process and
+    all file reads. A lost connection is detected before the next use and connected again.
+    Processes are started like spur does, so chess.uci can use the shell as a spur shell.
+    """
 
-    def __init__(self, hostname=None, username=None, key_file=None, password=None, windows=False):
+    def __init__(self, hostname=None, username=None, key_file=None, password=None, windows=False, keepalive=30,
+                 connect_timeout=60):
         super(UciShell, self).__init__()
+        self._keepalive = keepalive
+        self._client = None
+        self._sftp = None
+        self._lock = threading.RLock()
+        self._windows = windows
+        self._connect_params: Optional[dict] = None
         if hostname:
-            logger.info("connecting to [%s]", hostname)
-            shell_params = {
+            self._connect_params = {
                 "hostname": hostname,
                 "username": username,
-                "missing_host_key": paramiko.AutoAddPolicy(),
+                "timeout": connect_timeout,
             }
             if key_file:
-                shell_params["private_key_file"] = key_file
+                self._connect_params["key_filename"] = key_file
             else:
-                shell_params["password"] = password
-            if windows:
-                shell_params["shell_type"] = WindowsShellType()
+                self._connect_params["password"] = password
 
-            self._shell = spur.SshShell(**shell_params)
-        else:
-            self._shell = None
+    def get(self):
+        return self if self._connect_params is not None else None
+
+    def _connect(self):
+        import paramiko
+
+        hostname = self._connect_params["hostname"]
+        logger.info("connecting to [%s]", hostname)
+        client = paramiko.SSHClient()
+        client.load_system_host_keys()
+        client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
+        start = time.monotonic()
+        client.connect(**self._connect_params)
+        seconds = time.monotonic() - start
+        logger.info("connected to [%s] in %.3fs", hostname, seconds)
+        metrics.gauge("picochess_ssh_connect_seconds", "Time of the last ssh connect to the remote engine server",
+                      host=hostname).set(round(seconds, 3))
+        client.get_transport().set_keepalive(self._keepalive)
+        return client
+
+    def _transport(self):
+        """Return the transport of the ssh connection, connect again if it was lost."""
+        with self._lock:
+            if self._client is not None:
+                transport = self._client.get_transport()
+                if transport is not None and transport.is_active():
+                    return transport
+                logger.info("ssh connection lost - reconnecting")
+                self._disconnect()
+            self._client = self._connect()
+            return self._client.get_transport()
+
+    def _disconnect(self):
+        self._sftp = None
+        try:
+            self._client.close()
+        except Exception:  # noqa - the connection is broken anyway
+            pass
+        self._client = None
+
+    def close(self):
+        """Close the ssh connection."""
+        with self._lock:
+            if self._client is not None:
+                self._disconnect()
+
+    def is_connected(self) -> bool:
+        """Check the ssh connection (connecting again if needed)."""
+        if self._connect_params is None:
+            return False
+        import paramiko
+        try:
+            self._transport()
+        except (OSError, EOFError, paramiko.SSHException) as exc:
+            logger.warning("ssh connection failed: %s", exc)
+            return False
+        return True
 
-    def __getattr__(self, attr):
-        """Dispatch unknown attributes to SshShell."""
-        return getattr(self._shell, attr)
+    def spawn(self, command, stdout=None, stderr=None, allow_error=False, store_pid=False, encoding=None):
+        """Start a remote process on the shared ssh connection, see spur.SshShell.spawn()."""
+        import spur.ssh  # type: ignore
+
+        shell_type = WindowsShellType() if self._windows else spur.ssh.ShellTypes.sh
+        channel = self._transport().open_session()
+        channel.exec_command(shell_type.generate_run_command(command, store_pid=store_pid))
+        process_stdout = channel.makefile("rb")
+        pid = _read_int_line(process_stdout) if store_pid else None
+        if shell_type.supports_which and _read_int_line(process_stdout) != 0:
+            raise spur.NoSuchCommandError(command[0])
+        process = spur.ssh.SshProcess(channel, allow_error=allow_error, process_stdout=process_stdout,
+                                      stdout=stdout, stderr=stderr, encoding=encoding, shell=self)
+        process.pid = pid
+        return process
+
+    def run(self, *args, **kwargs):
+        """Run a remote process and return its result, used by spur to send signals."""
+        return self.spawn(*args, **kwargs).wait_for_result()
+
+    def open(self, name: str, mode="r"):
+        """Open a remote file with the shared sftp session."""
+        import paramiko
+        with self._lock:
+            for retry in (False, True):
+                try:
+                    transport = self._transport()
+                    if self._sftp is None or self._sftp.get_channel().closed:
+                        self._sftp = transport.open_sftp_client()
+                    sftp_file = _pooled_sftp_file(self._sftp, self._sftp.open(name, mode), mode)
+                    break
+                except (EOFError, paramiko.SSHException, ConnectionError):
+                    if retry:
+                        raise
+                    self._disconnect()
+        if "b" not in mode:
+            return io.TextIOWrapper(sftp_file)
+        return sftp_file
+
+
+def _read_int_line(output) -> int:
+    """Read the next non empty line of a starting remote process as a number (pid or exit code)."""
+    import spur  # type: ignore
+
+    while True:
+        line = output.readline()
+        if not line:
+            raise EOFError("remote process ended during startup")
+        if line.strip():
+            try:
+                return int(line)
+            except ValueError:
+                raise spur.CommandInitializationError(line)
+
+
+def is_engine_host_address(address: Optional[str]) -> bool:
+    """Return True if the remote server address points to an engine host (tcp://host:port or unix:///path)."""
+    return address is not None and address.startswith(("tcp://", "unix://"))
+
+
+class EngineHostResult(object):
+    """Result of a finished engine host process."""
+
+    def __init__(self, return_code):
+        self.return_code = return_code
+
+
+class EngineHostProcess(object):
+    """Engine process running on an engine host, used by chess.uci like a spur process."""
+
+    def __init__(self, shell, eid: int, stdout):
+        self.shell = shell
+        self.eid = eid
+        self.stdout = stdout
+        self.pid = None
+        self.error: Optional[str] = None
+        self.return_code = None
+        self.started = threading.Event()
+        self.finished = threading.Event()
+        self._stdin_buffer = b""
+
+    def stdin_write(self, value: bytes):
+        self._stdin_buffer += value
+        while b"\n" in self._stdin_buffer:
+            line, self._stdin_buffer = self._stdin_buffer.split(b"\n", 1)
+            self.shell.send(op="in", id=self.eid, line=line.decode("utf-8"))
+
+    def send_signal(self, signum):
+        self.shell.send(op="signal", id=self.eid, signum=int(signum))
+
+    def is_running(self):
+        return not self.finished.is_set()
+
+    def wait_for_result(self):
+        self.finished.wait()
+        return EngineHostResult(self.return_code)
+
+    def on_line(self, line: str):
+        if self.stdout:
+            self.stdout.write(line.encode("utf-8"))
+            self.stdout.write(b"\n")
+
+    def on_exit(self, return_code):
+        self.return_code = return_code
+        self.started.set()
+        self.finished.set()
+
+
+class UciTcpShell(object):
+    """Handle engines of an engine host (see uci/engine_host.py) like UciShell does for ssh.
+
+    All engines and file reads share one socket connection, which is connected again if it was lost.
+    """
+
+    def __init__(self, address: str, token: str = "", timeout: float = 10):
+        super(UciTcpShell, self).__init__()
+        self.address = address
+        self.token = token
+        self.timeout = timeout
+        self._sock: Optional[socket.socket] = None
+        self._lock = threading.RLock()
+        self._write_lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self._processes: Dict[int, EngineHostProcess] = {}
+        self._reads: Dict[int, list] = {}
 
     def get(self):
-        return self if self._shell is not None else None
+        return self
+
+    def _create_socket(self) -> socket.socket:
+        if self.address.startswith("unix://"):
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            sock.settimeout(self.timeout)
+            sock.connect(self.address[len("unix://"):])
+        else:
+            host, _, port = self.address[len("tcp://"):].partition(":")
+            sock = socket.create_connection((host, int(port) if port else DEFAULT_PORT), timeout=self.timeout)
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        return sock
+
+    def _connect(self):
+        logger.info("connecting to engine host [%s]", self.address)
+        sock = self._create_socket()
+        reader = sock.makefile("rb")
+        send_message(sock, self._write_lock, op="hello", token=self.token)
+        answer = json.loads(reader.readline() or "{}")
+        if not answer.get("ok"):
+            sock.close()
+            raise ConnectionRefusedError("engine host [{}] refused the connection".format(self.address))
+        sock.settimeout(None)
+        self._sock = sock
+        threading.Thread(target=self._read_messages, args=(sock, reader), daemon=True).start()
+
+    def _read_messages(self, sock: socket.socket, reader):
+        for raw in reader:
+            try:
+                message = json.loads(raw)
+            except ValueError:
+                continue
+            opr = message.get("op")
+            eid = message.get("id")
+            process = self._processes.get(eid)
+            if opr == "out" and process:
+                process.on_line(message["line"])
+            elif opr == "started" and process:
+                process.pid = message["pid"]
+                process.started.set()
+            elif opr == "exit" and process:
+                process.on_exit(message["code"])
+                del self._processes[eid]
+            elif opr in ("file", "error") and eid in self._reads:
+                self._reads[eid].append(message)
+                self._reads[eid][0].set()
+            elif opr == "error" and process:
+                process.error = message["text"]
+                process.on_exit(None)
+                del self._processes[eid]
+        logger.warning("connection to engine host [%s] lost", self.address)
+        with self._lock:
+            if self._sock is sock:
+                self._sock = None
+        for process in list(self._processes.values()):
+            process.on_exit(None)
+        self._processes.clear()
+        for waiting in self._reads.values():
+            waiting[0].set()
+
+    def is_connected(self) -> bool:
+        """Check the connection (connecting again if needed)."""
+        with self._lock:
+            if self._sock is None:
+                try:
+                    self._connect()
+                except (OSError, ValueError) as exc:
+                    logger.warning("engine host connection failed: %s", exc)
+                    return False
+            return True
+
+    def send(self, **message):
+        """Send a message to the engine host."""
+        with self._lock:
+            if self._sock is None:
+                self._connect()
+            sock = self._sock
+        send_message(sock, self._write_lock, **message)
+
+    def spawn(self, command, store_pid=False, allow_error=False, stdout=None, **kwargs):
+        """Start an engine on the engine host."""
+        eid = next(self._ids)
+        process = EngineHostProcess(self, eid, stdout)
+        self._processes[eid] = process
+        self.send(op="spawn", id=eid, cmd=list(command))
+        if not process.started.wait(self.timeout) or process.error:
+            self._processes.pop(eid, None)
+            raise OSError("engine host could not start {}: {}".format(command[0], process.error))
+        return process
+
+    def open(self, name: str, mode="r"):
+        """Read a file from the engine folder of the engine host."""
+        eid = next(self._ids)
+        waiting: list = [threading.Event()]
+        self._reads[eid] = waiting
+        try:
+            self.send(op="read", id=eid, name=name)
+            waiting[0].wait(self.timeout)
+        finally:
+            del self._reads[eid]
+        if len(waiting) < 2 or waiting[1]["op"] != "file":
+            raise FileNotFoundError(name)
+        data = waiting[1]["data"]
+        return io.BytesIO(data.encode("utf-8")) if "b" in mode else io.StringIO(data)
+
+    def close(self):
+        """Close the connection, the engine host stops all engines of this connection."""
+        with self._lock:
+            if self._sock is not None:
+                self._sock.close()
+                self._sock = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
 
 
 class UciEngine(object):
 
     """Handle the uci engine communication."""
 
-    def __init__(self, file: str, uci_shell: UciShell, mame_par: str):
+    def __init__(self, file: str, uci_shell: Union[UciShell, UciTcpShell], mame_par: str):
         super(UciEngine, self).__init__()
         logger.info("mame parameters=" + mame_par)
         try:
@@ -124,6 +453,7 @@ class UciEngine(object):
             self.uci_elo_eval_fn = None  # saved UCI_Elo eval function
             self.shell = uci_shell.get()
             logger.info("file " + file)
+            start = time.monotonic()
             if "/mame/" in file:
                 self.is_mame = True
                 mfile = [file, mame_par]
@@ -138,9 +468,11 @@ class UciEngine(object):
 
             self.file = file
             if self.engine:
-                handler = Informer()
-                self.engine.info_handlers.append(handler)
+                self.informer = Informer(self.engine, engine_identity(file))
+                self.engine.info_handlers.append(self.informer)
+                self.engine.info_handlers.append(SearchMetrics(self.engine, "engine"))
                 self.engine.uci()
+                logger.debug("engine %s started in %.3fs", file, time.monotonic() - start)
             else:
                 logger.error("engine executable [%s] not found", file)
             self.options: dict = {}
@@ -173,6 +505,7 @@ class UciEngine(object):
     def send(self):
         """Send options to engine."""
         self.engine.setoption(self.options)
+        self.informer.identity = engine_identity(self.file, self.options)
 
     def has_levels(self):
         """Return engine level support."""
@@ -251,7 +584,7 @@ class UciEngine(object):
         """Go engine."""
         self.show_best = True
         time_dict["async_callback"] = self.callback
-        logger.debug("molli: timedict: %s", str(time_dict))
+        logger.debug("molli: timedict: %s", time_dict)
         # Observable.fire(Event.START_SEARCH())
         self.future = self.engine.go(**time_dict)
         return self.future
@@ -261,6 +594,14 @@ class UciEngine(object):
         logger.debug("molli: go_emu")
         self.future = self.engine.go(async_callback=self.callback)
 
+    def show_cached_evaluation(self):
+        """Show the cached evaluation of the position set before until the search gets deeper."""
+        self.informer.show_cached(self.engine.board)
+
+    def forget_cached_evaluations(self):
+        """Remove the cached evaluations of this engine with its current options."""
+        eval_cache.forget(self.informer.identity)
+
     def ponder(self):
         """Ponder engine."""
         self.show_best = False
@@ -343,6 +684,7 @@ class UciEngine(object):
         parser = configparser.ConfigParser()
 
         if not options:
+            start = time.monotonic()
             if self.shell is None:
                 success = bool(parser.read(self.get_file() + ".uci"))
             else:
@@ -352,6 +694,7 @@ class UciEngine(object):
                     success = True
                 except FileNotFoundError:
                     success = False
+            logger.debug("%s.uci read in %.3fs", self.get_file(), time.monotonic() - start)
             if success:
                 options = dict(parser[parser.sections().pop()])
 
@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Engine host: share the engines of one machine with several picochess boards.
+
+The host and the client (uci.engine.UciTcpShell) talk json lines over one TCP or unix socket
+connection. Several engines can run over the same connection, each message carries the id
+of the engine process it belongs to:
+
+    client -> host: hello(token), spawn(id, cmd), in(id, line), signal(id, signum), read(id, name)
+    host -> client: hello(ok), started(id, pid), out(id, line), exit(id, code), file(id, data), error(id, text)
+
+There is no encryption, so only use it in a trusted network. Listening on other than the
+loopback address requires a token.
+"""
+
+import argparse
+import hmac
+import ipaddress
+import json
+import logging
+import os
+import platform
+import signal
+import socket
+import socketserver
+import subprocess
+import threading
+from subprocess import DEVNULL, PIPE
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PORT = 9898
+
+
+def send_message(sock: socket.socket, lock: threading.Lock, **message):
+    """Send one json line."""
+    data = (json.dumps(message) + '\n').encode('utf-8')
+    with lock:
+        sock.sendall(data)
+
+
+def resolve_engine_file(engine_path: str, name: str) -> Optional[str]:
+    """Return the file for name inside engine_path or None if it points outside of it."""
+    engine_path = os.path.realpath(engine_path)
+    if os.path.isabs(name) and os.path.realpath(name).startswith(engine_path + os.sep):
+        return os.path.realpath(name)
+    path = os.path.realpath(os.path.join(engine_path, name.lstrip('/\\')))
+    return path if path.startswith(engine_path + os.sep) else None
+
+
+class EngineHostHandler(socketserver.StreamRequestHandler):
+
+    """Serve the engine processes of one client connection."""
+
+    def setup(self):
+        super(EngineHostHandler, self).setup()
+        if self.request.family in (socket.AF_INET, socket.AF_INET6):
+            self.request.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.engine_path: str = self.server.engine_path  # type: ignore[attr-defined]
+        self.token: str = self.server.token  # type: ignore[attr-defined]
+        self.write_lock = threading.Lock()
+        self.processes: Dict[int, subprocess.Popen] = {}
+        self.authorized = not self.token
+
+    def send(self, **message):
+        try:
+            send_message(self.request, self.write_lock, **message)
+        except OSError:
+            pass  # the connection is gone, finish() cleans up
+
+    def _pump_output(self, eid: int, process: subprocess.Popen):
+        for line in process.stdout:  # type: ignore[union-attr]
+            self.send(op='out', id=eid, line=line.decode('utf-8', errors='replace').rstrip('\r\n'))
+        self.send(op='exit', id=eid, code=process.wait())
+
+    def _spawn(self, eid: int, cmd: list):
+        file = resolve_engine_file(self.engine_path, cmd[0]) if cmd else None
+        if file is None or not os.access(file, os.X_OK):
+            self.send(op='error', id=eid, text='engine not found')
+            return
+        try:
+            process = subprocess.Popen([file] + cmd[1:], stdin=PIPE, stdout=PIPE, stderr=DEVNULL,
+                                       cwd=os.path.dirname(file))
+        except OSError as exc:
+            self.send(op='error', id=eid, text=str(exc))
+            return
+        logger.info('(%s) engine %s started with pid %i', self.client_address, file, process.pid)
+        self.processes[eid] = process
+        self.send(op='started', id=eid, pid=process.pid)
+        threading.Thread(target=self._pump_output, args=(eid, process), daemon=True).start()
+
+    def _read(self, eid: int, name: str):
+        file = resolve_engine_file(self.engine_path, name)
+        if file is None or not os.path.isfile(file):
+            self.send(op='error', id=eid, text='file not found')
+            return
+        with open(file, encoding='utf-8', errors='replace') as read_file:
+            self.send(op='file', id=eid, data=read_file.read())
+
+    def _process_message(self, message: dict):
+        opr = message.get('op')
+        eid = message.get('id', 0)
+        if opr == 'hello':
+            token = str(message.get('token', ''))
+            self.authorized = self.authorized or hmac.compare_digest(token.encode('utf-8'), self.token.encode('utf-8'))
+            self.send(op='hello', ok=self.authorized)
+        elif not self.authorized:
+            self.send(op='error', id=eid, text='not authorized')
+        elif opr == 'in':
+            process = self.processes.get(eid)
+            if process and process.poll() is None:
+                try:
+                    process.stdin.write((message['line'] + '\n').encode('utf-8'))  # type: ignore[union-attr]
+                    process.stdin.flush()  # type: ignore[union-attr]
+                except OSError:
+                    pass  # the engine is just terminating
+        elif opr == 'spawn':
+            self._spawn(eid, message.get('cmd', []))
+        elif opr == 'signal':
+            process = self.processes.get(eid)
+            if process and process.poll() is None:
+                process.send_signal(message.get('signum', signal.SIGTERM))
+        elif opr == 'read':
+            self._read(eid, message.get('name', ''))
+        else:
+            self.send(op='error', id=eid, text='unknown operation')
+
+    def handle(self):
+        logger.info('(%s) client connected', self.client_address)
+        for raw in self.rfile:
+            try:
+                message = json.loads(raw)
+            except ValueError:
+                logger.warning('(%s) invalid message %s', self.client_address, raw)
+                continue
+            self._process_message(message)
+
+    def finish(self):
+        for process in self.processes.values():
+            if process.poll() is None:
+                process.kill()
+        logger.info('(%s) client disconnected', self.client_address)
+        super(EngineHostHandler, self).finish()
+
+
+class EngineHost(socketserver.ThreadingMixIn, socketserver.TCPServer):
+
+    """TCP server giving access to the engines of engine_path."""
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, address, engine_path: str, token: str = ''):
+        self.engine_path = engine_path
+        self.token = token
+        super(EngineHost, self).__init__(address, EngineHostHandler)
+
+
+if hasattr(socketserver, 'UnixStreamServer'):
+    class UnixEngineHost(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+
+        """Unix socket server giving access to the engines of engine_path."""
+
+        daemon_threads = True
+
+        def __init__(self, address: str, engine_path: str, token: str = ''):
+            self.engine_path = engine_path
+            self.token = token
+            super(UnixEngineHost, self).__init__(address, EngineHostHandler)
+
+
+def is_loopback(address: str) -> bool:
+    """Return True if the bind address can only be reached from this machine."""
+    if address == 'localhost':
+        return True
+    try:
+        return ipaddress.ip_address(address).is_loopback
+    except ValueError:
+        return False
+
+
+def main():
+    """Start the engine host."""
+    program_path = os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir))
+    parser = argparse.ArgumentParser(description='share the engines of this machine with picochess boards')
+    parser.add_argument('-p', '--port', type=int, default=DEFAULT_PORT, help='tcp port to listen on')
+    parser.add_argument('-b', '--bind', type=str, default='127.0.0.1',
+                        help='address to listen on, other than the loopback address only with a token')
+    parser.add_argument('-u', '--unix-socket', type=str, default=None, help='listen on this unix socket instead of tcp')
+    parser.add_argument('-e', '--engine-path', type=str, default=program_path + os.sep + 'engines' + os.sep + platform.machine(),
+                        help='folder with the engines')
+    parser.add_argument('-t', '--token', type=str, default='', help='token the clients must send (engine-remote-pass)')
+    parser.add_argument('-l', '--log-level', type=str, default='info', help='logging level')
+    args = parser.parse_args()
+    if not args.unix_socket and not args.token and not is_loopback(args.bind):
+        parser.error('a token is needed to listen on {}'.format(args.bind))
+
+    logging.basicConfig(level=getattr(logging, args.log_level.upper()), format='%(asctime)s %(levelname)7s %(message)s')
+    if args.unix_socket:
+        if os.path.exists(args.unix_socket):
+            os.remove(args.unix_socket)
+        server: socketserver.BaseServer = UnixEngineHost(args.unix_socket, args.engine_path, args.token)
+    else:
+        server = EngineHost((args.bind, args.port), args.engine_path, args.token)
+    logger.info('serving engines of %s', args.engine_path)
+    server.serve_forever()
+
+
+if __name__ == '__main__':
+    main()
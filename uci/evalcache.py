@@ -0,0 +1,203 @@
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, List, NamedTuple, Optional
+
+import chess  # type: ignore
+import chess.polyglot  # type: ignore
+import chess.uci  # type: ignore
+
+logger = logging.getLogger(__name__)
+
+CACHE_VERSION = 2
+MAX_DEPTHS = 4  # evaluations of different depths kept for one position
+PV_LENGTH = 8  # moves kept of each pv line
+
+
+class Evaluation(NamedTuple):
+    """Result of an engine search on one position."""
+
+    depth: int
+    bestmove: Optional[chess.Move]
+    pv: Dict[int, List[chess.Move]]  # multipv number => moves
+    score: Dict[int, chess.uci.Score]  # multipv number => score
+
+
+def engine_identity(file: str, options: Optional[dict] = None) -> str:
+    """Identify an engine by its file and the uci options changing its evaluations (e.g. the level)."""
+    return json.dumps([file, options or {}], sort_keys=True)
+
+
+class EvalCache(object):
+
+    """Engine evaluations by engine identity and zobrist key of the position, the least recently used are dropped."""
+
+    def __init__(self, size: int = 10000, file_name: Optional[str] = None):
+        super(EvalCache, self).__init__()
+        self.size = size
+        self.file_name = file_name
+        self.entries: OrderedDict = OrderedDict()  # (engine identity, zobrist key) => {depth: Evaluation}
+        self.lock = threading.Lock()
+
+    def configure(self, size: int, file_name: Optional[str]):
+        """Set the size and load the cache file (if any)."""
+        self.size = size
+        self.file_name = file_name
+        if file_name:
+            self.load()
+
+    def get(self, board: chess.Board, depth: int = 0, multipv: int = 1, exact=False,
+            engine: str = "") -> Optional[Evaluation]:
+        """Return the deepest evaluation of board by engine with at least depth and multipv lines.
+
+        With exact only an evaluation of exactly this depth is returned.
+        """
+        key = (engine, chess.polyglot.zobrist_hash(board))
+        with self.lock:
+            evaluations = self.entries.get(key)
+            if not evaluations:
+                return None
+            self.entries.move_to_end(key)
+            candidates = [
+                evaluation
+                for evaluation in evaluations.values()
+                if (evaluation.depth == depth if exact else evaluation.depth >= depth) and len(evaluation.pv) >= multipv
+            ]
+        if not candidates:
+            return None
+        evaluation = max(candidates, key=lambda evaluation: evaluation.depth)
+        if evaluation.bestmove and evaluation.bestmove not in board.legal_moves:
+            logger.warning("zobrist collision for %s", board.fen())
+            return None
+        return evaluation
+
+    def put(self, board: chess.Board, evaluation: Evaluation, engine: str = ""):
+        """Add an evaluation by engine, one with more pv lines for the same depth wins."""
+        key = (engine, chess.polyglot.zobrist_hash(board))
+        with self.lock:
+            evaluations = self.entries.pop(key, {})
+            old = evaluations.get(evaluation.depth)
+            if old is None or len(old.pv) <= len(evaluation.pv):
+                evaluations[evaluation.depth] = evaluation
+            while len(evaluations) > MAX_DEPTHS:
+                del evaluations[min(evaluations)]
+            self.entries[key] = evaluations
+            while len(self.entries) > self.size:
+                self.entries.popitem(last=False)
+
+    def store(self, board: chess.Board, info: dict, bestmove: Optional[chess.Move], engine: str = ""):
+        """Add the info of a finished search of engine on board."""
+        depth = info.get("depth")
+        pv = {multipv: moves[:PV_LENGTH] for multipv, moves in info.get("pv", {}).items() if moves}
+        score = {multipv: info["score"][multipv] for multipv in pv if multipv in info.get("score", {})}
+        if not depth or not pv or len(score) != len(pv):
+            return
+        self.put(board, Evaluation(depth, bestmove or pv[min(pv)][0], pv, score), engine)
+
+    def restore(self, board: chess.Board, info_handler: "CachingInfoHandler", depth: int, multipv: int,
+                exact=False) -> bool:
+        """Fill the info_handler with a cached evaluation of its engine instead of searching, return if found."""
+        evaluation = self.get(board, depth, multipv, exact, info_handler.identity)
+        if evaluation is None:
+            return False
+        with info_handler as info:
+            info.clear()
+            info.update(
+                {"refutation": {}, "currline": {}, "depth": evaluation.depth,
+                 "pv": dict(evaluation.pv), "score": dict(evaluation.score)}
+            )
+        logger.debug("cached evaluation depth %i for %s", evaluation.depth, board.fen())
+        return True
+
+    def clear(self):
+        """Remove all evaluations."""
+        with self.lock:
+            self.entries.clear()
+
+    def forget(self, engine: str):
+        """Remove the evaluations of engine."""
+        with self.lock:
+            for key in [key for key in self.entries if key[0] == engine]:
+                del self.entries[key]
+
+    def load(self):
+        """Read the evaluations from the cache file."""
+        try:
+            with open(self.file_name) as cache_file:
+                data = json.load(cache_file)
+        except (OSError, ValueError):
+            return
+        if data.get("version") != CACHE_VERSION:
+            return
+        with self.lock:
+            for (engine, zobrist), evaluations in data["entries"]:
+                self.entries[(engine, zobrist)] = {
+                    evaluation["depth"]: Evaluation(
+                        evaluation["depth"],
+                        chess.Move.from_uci(evaluation["bestmove"]) if evaluation["bestmove"] else None,
+                        {int(multipv): [chess.Move.from_uci(move) for move in moves]
+                         for multipv, moves in evaluation["pv"].items()},
+                        {int(multipv): chess.uci.Score(*score) for multipv, score in evaluation["score"].items()},
+                    )
+                    for evaluation in evaluations
+                }
+            while len(self.entries) > self.size:
+                self.entries.popitem(last=False)
+        logger.info("loaded %i cached evaluations", len(self.entries))
+
+    def save(self):
+        """Write the evaluations to the cache file."""
+        if not self.file_name:
+            return
+        with self.lock:
+            entries = [
+                [list(key), [
+                    {"depth": evaluation.depth,
+                     "bestmove": evaluation.bestmove.uci() if evaluation.bestmove else None,
+                     "pv": {multipv: [move.uci() for move in moves] for multipv, moves in evaluation.pv.items()},
+                     "score": {multipv: list(score) for multipv, score in evaluation.score.items()}}
+                    for evaluation in evaluations.values()
+                ]]
+                for key, evaluations in self.entries.items()
+            ]
+        tmp_name = self.file_name + ".tmp"
+        try:
+            with open(tmp_name, "w") as cache_file:
+                json.dump({"version": CACHE_VERSION, "entries": entries}, cache_file)
+            os.replace(tmp_name, self.file_name)
+        except OSError:
+            logger.exception("could not write the evaluation cache %s", self.file_name)
+
+
+eval_cache = EvalCache()
+
+
+class CachingInfoHandler(chess.uci.InfoHandler):
+
+    """Info handler adding the result of each finished search to the evaluation cache."""
+
+    def __init__(self, engine=None, identity: str = ""):
+        super(CachingInfoHandler, self).__init__()
+        self.engine = engine  # the chess.uci engine, it knows the searched position
+        self.identity = identity  # see engine_identity(), evaluations of other engines are not used
+
+    def on_bestmove(self, bestmove, ponder):
+        if self.engine is not None:
+            with self.lock:
+                eval_cache.store(self.engine.board, self.info, bestmove, self.identity)
+        super(CachingInfoHandler, self).on_bestmove(bestmove, ponder)
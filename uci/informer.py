@@ -15,22 +15,40 @@
 # You should have received a copy of the GNU General Public License
 # along with this program. If not, see <http://www.gnu.org/licenses/>.
 
-from threading import Timer
+import chess.uci  # type: ignore
 
-from utilities import Observable
+from utilities import Observable, scheduler
 from dgt.api import Event
-import chess.uci  # type: ignore
+from metrics import metrics
+from tracing import tracer
+from uci.evalcache import CachingInfoHandler, eval_cache
 
 
-class Informer(chess.uci.InfoHandler):
+class Informer(CachingInfoHandler):
 
     """Internal uci engine info handler."""
 
-    def __init__(self):
-        super(Informer, self).__init__()
+    def __init__(self, engine=None, identity: str = ""):
+        super(Informer, self).__init__(engine, identity)
         self.allow_score = True
         self.allow_pv = True
         self.allow_depth = True
+        self.cached_depth = 0  # depth of the shown cached evaluation, shallower infos are not shown
+
+    def show_cached(self, board):
+        """Show the cached evaluation of board by this engine until the search gets deeper."""
+        evaluation = eval_cache.get(board, engine=self.identity)
+        if evaluation is None:
+            self.cached_depth = 0
+            return
+        self.cached_depth = evaluation.depth
+        score = evaluation.score[min(evaluation.score)]
+        Observable.fire(Event.NEW_DEPTH(depth=evaluation.depth))
+        Observable.fire(Event.NEW_SCORE(score=score.cp, mate=score.mate))
+        Observable.fire(Event.NEW_PV(pv=evaluation.pv[min(evaluation.pv)]))
+
+    def _deeper_than_cached(self):
+        return self.info.get("depth", 0) > self.cached_depth
 
     def on_go(self):
         """Engine sends GO."""
@@ -41,6 +59,7 @@ class Informer(chess.uci.InfoHandler):
         super().on_go()
 
     def on_bestmove(self, bestmove, ponder):
+        self.cached_depth = 0
         Observable.fire(Event.STOP_SEARCH())
         super().on_bestmove(bestmove, ponder)
 
@@ -56,7 +75,7 @@ class Informer(chess.uci.InfoHandler):
     def _allow_fire_score(self):
         if self.allow_score:
             self.allow_score = False
-            Timer(0.5, self._reset_allow_score).start()
+            scheduler.schedule(0.5, self._reset_allow_score)
             return True
         else:
             return False
@@ -64,7 +83,7 @@ class Informer(chess.uci.InfoHandler):
     def _allow_fire_pv(self):
         if self.allow_pv:
             self.allow_pv = False
-            Timer(0.5, self._reset_allow_pv).start()
+            scheduler.schedule(0.5, self._reset_allow_pv)
             return True
         else:
             return False
@@ -72,25 +91,56 @@ class Informer(chess.uci.InfoHandler):
     def _allow_fire_depth(self):
         if self.allow_depth:
             self.allow_depth = False
-            Timer(0.5, self._reset_allow_depth).start()
+            scheduler.schedule(0.5, self._reset_allow_depth)
             return True
         else:
             return False
 
     def score(self, cp, mate, lowerbound, upperbound):
         """Engine sends SCORE."""
-        if self._allow_fire_score():
+        if self._deeper_than_cached() and self._allow_fire_score():
             Observable.fire(Event.NEW_SCORE(score=cp, mate=mate))
         super().score(cp, mate, lowerbound, upperbound)
 
     def pv(self, moves):
         """Call when engine sends PV."""
-        if self._allow_fire_pv() and moves:
+        if self._deeper_than_cached() and self._allow_fire_pv() and moves:
             Observable.fire(Event.NEW_PV(pv=moves))
         super().pv(moves)
 
     def depth(self, dep):
         """Engine sends DEPTH."""
-        if self._allow_fire_depth():
+        if dep > self.cached_depth and self._allow_fire_depth():
             Observable.fire(Event.NEW_DEPTH(depth=dep))
         super().depth(dep)
+
+
+class SearchMetrics(chess.uci.InfoHandler):
+
+    """Count the searches of an engine with their time till bestmove, and keep its last nps and a trace span."""
+
+    def __init__(self, engine, searcher: str):
+        super(SearchMetrics, self).__init__()
+        self.engine = engine  # the chess.uci engine, it knows if it ponders
+        self.searcher = searcher
+        self.started = 0.0
+        self.mode = 'search'
+        self.nps_gauge = metrics.gauge('picochess_engine_nps', 'Nodes per second of the last search',
+                                       searcher=searcher)
+
+    def on_go(self):
+        self.started = tracer.now()
+        self.mode = 'ponder' if self.engine.pondering else 'search'
+        super(SearchMetrics, self).on_go()
+
+    def nps(self, x):
+        self.nps_gauge.set(x)
+        super(SearchMetrics, self).nps(x)
+
+    def on_bestmove(self, bestmove, ponder):
+        labels = {'searcher': self.searcher, 'mode': self.mode}
+        metrics.counter('picochess_engine_searches_total', 'Finished engine searches', **labels).inc()
+        metrics.summary('picochess_engine_search_seconds', 'Time from go till bestmove',
+                        **labels).observe((tracer.now() - self.started) / 1e6)
+        tracer.complete(self.mode, 'engine', self.started, move=str(bestmove), **labels)
+        super(SearchMetrics, self).on_bestmove(bestmove, ponder)
@@ -18,35 +18,64 @@
 import logging
 import platform
 import configparser
+import json
 import os
+from typing import Optional
 from dgt.api import Dgt
 
 
 logger = logging.getLogger(__name__)
 
+CATALOG_VERSION = 1
 
-def read_engine_ini(engine_shell=None, engine_path=None, filename=None) -> list[dict[str, str]]:
-    l_web_text = ''
-    """Read engine.ini and create a library list out of it."""
-    if filename is None:
-        filename = 'engines.ini'
-    config = configparser.ConfigParser()
-    config.optionxform = str  # type: ignore
+
+def _file_signature(path: str) -> Optional[list]:
+    """Return the (mtime, size) of a local file or None if it doesnt exist."""
     try:
-        if engine_shell is None:
-            if not engine_path:
-                program_path = os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir))
-                engine_path = program_path + os.sep + 'engines' + os.sep + platform.machine()
-            logger.debug('complete path without shell: %s', str(engine_path + os.sep + filename))
-            config.read(engine_path + os.sep + filename)
-        else:
-            logger.debug('complete path: %s', str(engine_path + os.sep + filename))
-            with engine_shell.open(engine_path + os.sep + filename, 'r') as file:
-                config.read_file(file)
-    except FileNotFoundError:
-        pass
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return [stat.st_mtime_ns, stat.st_size]
 
-    library = []
+
+def _load_catalog(cache_file: str) -> Optional[dict]:
+    try:
+        with open(cache_file) as file:
+            catalog = json.load(file)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(catalog, dict) or catalog.get('version') != CATALOG_VERSION:
+        return None
+    return catalog
+
+
+def _save_catalog(cache_file: str, catalog: dict):
+    catalog['version'] = CATALOG_VERSION
+    try:
+        with open(cache_file + '.tmp', 'w') as file:
+            json.dump(catalog, file)
+        os.replace(cache_file + '.tmp', cache_file)
+    except OSError as exc:
+        logger.debug('engine catalog %s not written: %s', cache_file, exc)
+
+
+def _catalog_is_valid(catalog: dict) -> bool:
+    """Check the cached signatures of a local catalog against the files."""
+    return all(_file_signature(path) == signature for path, signature in catalog['files'].items())
+
+
+def _parse_levels(parser: configparser.ConfigParser) -> dict:
+    level_dict: dict[str, dict] = {}
+    for p_section in parser.sections():
+        level_dict[p_section] = {}
+        for option in parser.options(p_section):
+            level_dict[p_section][option] = parser[p_section][option]
+    return level_dict
+
+
+def _parse_engines(config: configparser.ConfigParser, engine_shell, engine_path: str) -> list:
+    """Parse the engine sections together with their .uci level files."""
+    engines = []
     for section in config.sections():
         parser = configparser.ConfigParser()
         parser.optionxform = str  # type: ignore
@@ -62,12 +91,14 @@ def read_engine_ini(engine_shell=None, engine_path=None, filename=None) -> list[
             except FileNotFoundError:
                 success = False
         if success:
-            for p_section in parser.sections():
-                level_dict[p_section] = {}
-                for option in parser.options(p_section):
-                    level_dict[p_section][option] = parser[p_section][option]
+            level_dict = _parse_levels(parser)
+        engines.append([section, dict(config[section]), level_dict])
+    return engines
+
 
-        confsect = config[section]
+def _build_library(engines: list, engine_path: str) -> list[dict]:
+    library = []
+    for section, confsect, level_dict in engines:
         l_web_text = confsect['web'] if 'web' in confsect else confsect['large']
         text = Dgt.DISPLAY_TEXT(web_text=l_web_text, large_text=confsect['large'], medium_text=confsect['medium'], small_text=confsect['small'], wait=True, beep=False,
                                 maxtime=0, devs={'ser', 'i2c', 'web'})
@@ -81,3 +112,59 @@ def read_engine_ini(engine_shell=None, engine_path=None, filename=None) -> list[
             }
         )
     return library
+
+
+def _read_local_engines(engine_path: str, filename: str, use_cache: bool) -> list:
+    """Read a local engine ini, using the catalog cache when all files are unchanged."""
+    ini_file = engine_path + os.sep + filename
+    cache_file = engine_path + os.sep + '.' + filename + '.cache'
+    if use_cache:
+        catalog = _load_catalog(cache_file)
+        if catalog is not None and _catalog_is_valid(catalog):
+            logger.debug('using engine catalog %s', cache_file)
+            return catalog['engines']
+
+    logger.debug('complete path without shell: %s', ini_file)
+    config = configparser.ConfigParser()
+    config.optionxform = str  # type: ignore
+    config.read(ini_file)
+    engines = _parse_engines(config, None, engine_path)
+
+    if use_cache:
+        files = {ini_file: _file_signature(ini_file)}
+        for section, _, _ in engines:
+            uci_file = engine_path + os.sep + section + '.uci'
+            files[uci_file] = _file_signature(uci_file)
+        _save_catalog(cache_file, {'files': files, 'engines': engines})
+    return engines
+
+
+def _read_remote_engines(engine_shell, engine_path: str, filename: str) -> list:
+    """Read a remote engine ini together with its .uci files, these are not cached."""
+    logger.debug('complete path: %s', str(engine_path + os.sep + filename))
+    config = configparser.ConfigParser()
+    config.optionxform = str  # type: ignore
+    try:
+        with engine_shell.open(engine_path + os.sep + filename, 'r') as file:
+            config.read_file(file)
+    except FileNotFoundError:
+        pass
+    return _parse_engines(config, engine_shell, engine_path)
+
+
+def read_engine_ini(engine_shell=None, engine_path=None, filename=None, use_cache=True) -> list[dict[str, str]]:
+    """
+    Read engine.ini and create a library list out of it.
+    The parsed local engines are stored in a catalog file next to the ini file, so that next time
+    only one file needs to be read as long as the ini and .uci files stay the same.
+    """
+    if filename is None:
+        filename = 'engines.ini'
+    if engine_shell is None:
+        if not engine_path:
+            program_path = os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir))
+            engine_path = program_path + os.sep + 'engines' + os.sep + platform.machine()
+        engines = _read_local_engines(engine_path, filename, use_cache)
+    else:
+        engines = _read_remote_engines(engine_shell, engine_path, filename)
+    return _build_library(engines, engine_path)
@@ -0,0 +1,173 @@
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, List, NamedTuple, Optional
+
+import chess  # type: ignore
+import chess.polyglot  # type: ignore
+
+logger = logging.getLogger(__name__)
+
+
+class Speculation(NamedTuple):
+    """Best move found for a position during the user's thinking time."""
+
+    bestmove: chess.Move
+    ponder: Optional[chess.Move]
+    seconds: float
+
+
+def expected_move_time(game: chess.Board, time_dict: dict) -> Optional[float]:
+    """Return the seconds the engine would roughly think on this position or None if unknown."""
+    if "movetime" in time_dict:
+        return time_dict["movetime"] / 1000
+    if "wtime" in time_dict and "btime" in time_dict:
+        remaining = time_dict["wtime"] if game.turn == chess.WHITE else time_dict["btime"]
+        increment = time_dict.get("winc" if game.turn == chess.WHITE else "binc", 0)
+        moves_to_go = time_dict.get("movestogo") or 40
+        return (remaining / moves_to_go + increment) / 1000
+    return None  # depth or node limited search
+
+
+class SpeculativeBrain(object):
+
+    """Ponder on several predicted user moves in turn instead of only on the engine's ponder move.
+
+    The ponder move gets the first slice and, after the predicted moves had their slice, the
+    rest of the user's thinking time as permanent brain search, so a ponderhit stays possible.
+    The best moves found for the other candidates are kept and let picochess answer at once,
+    if they were searched long enough, otherwise the engine starts with a warm hash.
+    """
+
+    def __init__(self, candidates: int = 1, slice_time: float = 2.0, cache_size: int = 256):
+        super(SpeculativeBrain, self).__init__()
+        self.candidates = candidates
+        self.slice_time = slice_time
+        self.cache_size = cache_size
+        self.cache: OrderedDict = OrderedDict()
+        self.lock = threading.Lock()
+        self.cancelled = threading.Event()
+        self.worker: Optional[threading.Thread] = None
+        self.engine: Any = None  # the UciEngine searching for the user moves
+        self.game = chess.Board()
+        self.searching = chess.Move.null()  # candidate the engine is searching right now
+        self.brain_move = chess.Move.null()  # candidate searched with a real ponder search
+        self.search_start = 0.0
+
+    def start(self, engine, game: chess.Board, pb_move: chess.Move, predict: Callable[[], List[chess.Move]],
+              time_dict: dict):
+        """Start the search on the ponder move and the user moves returned by predict."""
+        self.cancel(keep_brain=False)
+        self.engine = engine
+        self.game = game.copy()
+        self.cancelled.clear()
+        if self.candidates <= 1:
+            self._search(pb_move, pb_move, time_dict)
+            return
+        self.worker = threading.Thread(target=self._run, args=(pb_move, predict, time_dict), daemon=True)
+        self.worker.start()
+
+    def _run(self, pb_move: chess.Move, predict: Callable[[], List[chess.Move]], time_dict: dict):
+        moves = [pb_move]
+        for move in moves:
+            if not self._search(move, pb_move, time_dict) or self.cancelled.wait(self.slice_time):
+                return
+            with self.lock:
+                if self.cancelled.is_set():
+                    return
+                self._stop()
+            if move == pb_move:
+                # the predictions are asked for after the first slice, so the tutor had time to analyse
+                for predicted in predict():
+                    if len(moves) >= self.candidates:
+                        break
+                    if predicted not in moves and predicted in self.game.legal_moves:
+                        moves.append(predicted)
+                logger.info("speculative brain on %s", moves)
+        self._search(pb_move, pb_move, time_dict)  # permanent brain until the user moves
+
+    def _search(self, move: chess.Move, pb_move: chess.Move, time_dict: dict) -> bool:
+        with self.lock:
+            if self.cancelled.is_set():
+                return False
+            game_copy = self.game.copy()
+            game_copy.push(move)
+            self.engine.position(game_copy)
+            if move == pb_move:
+                self.engine.brain(dict(time_dict))
+                self.brain_move = move
+            else:
+                self.engine.ponder()
+                self.brain_move = chess.Move.null()
+            self.searching = move
+            self.search_start = time.monotonic()
+            return True
+
+    def _stop(self):
+        """Stop the running search and remember its result, the lock must be held."""
+        res = self.engine.stop()
+        if self.searching and res and res.bestmove:
+            game_copy = self.game.copy()
+            game_copy.push(self.searching)
+            self._store(game_copy, res.bestmove, res.ponder, time.monotonic() - self.search_start)
+        self.searching = self.brain_move = chess.Move.null()
+
+    def _store(self, game: chess.Board, bestmove: chess.Move, ponder: Optional[chess.Move], seconds: float):
+        key = chess.polyglot.zobrist_hash(game)
+        old = self.cache.pop(key, None)
+        if old:
+            seconds += old.seconds
+        self.cache[key] = Speculation(bestmove, ponder, seconds)
+        while len(self.cache) > self.cache_size:
+            self.cache.popitem(last=False)
+
+    def cancel(self, keep_brain=True):
+        """Stop switching between the candidates.
+
+        A search on a predicted move is stopped and its result kept, a permanent brain
+        search is left running for a possible ponderhit if keep_brain is set.
+        """
+        with self.lock:
+            self.cancelled.set()
+            if self.searching and not self.brain_move:
+                self._stop()
+            if not keep_brain:
+                self.searching = self.brain_move = chess.Move.null()
+        if self.worker and self.worker is not threading.current_thread():
+            self.worker.join()
+        self.worker = None
+
+    def clear(self):
+        """Forget all searched moves, they dont fit a new game, engine, level or time control."""
+        self.cancel(keep_brain=False)
+        with self.lock:
+            self.cache.clear()
+
+    def is_brain_on(self, move: chess.Move) -> bool:
+        """Return if the engine runs a permanent brain search on move."""
+        return bool(move) and self.brain_move == move
+
+    def lookup(self, game: chess.Board, time_dict: dict) -> Optional[Speculation]:
+        """Return the best move for game if it was searched at least as long as a normal search."""
+        speculation = self.cache.get(chess.polyglot.zobrist_hash(game))
+        if speculation is None or speculation.bestmove not in game.legal_moves:
+            return None
+        needed = expected_move_time(game, time_dict)
+        if needed is None or speculation.seconds < needed:
+            logger.debug("speculation for %s too short: %.1fs", speculation.bestmove, speculation.seconds)
+            return None
+        return speculation
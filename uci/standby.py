@@ -0,0 +1,147 @@
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+import logging
+import os
+import threading
+from typing import Optional
+
+from uci.engine import UciEngine, UciShell
+
+logger = logging.getLogger(__name__)
+
+
+def available_memory_mb() -> Optional[int]:
+    """Return the available system memory in MB or None if unknown."""
+    try:
+        with open('/proc/meminfo') as meminfo:
+            for line in meminfo:
+                if line.startswith('MemAvailable:'):
+                    return int(line.split()[1]) // 1024
+    except (OSError, ValueError):
+        pass
+    return None
+
+
+def process_memory_mb(pid: int) -> Optional[int]:
+    """Return the resident memory of a process in MB or None if unknown."""
+    try:
+        with open('/proc/{}/status'.format(pid)) as status:
+            for line in status:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) // 1024
+    except (OSError, ValueError):
+        pass
+    return None
+
+
+class EngineStandby(object):
+
+    """Keep one local engine started in the background, so switching to it skips the engine startup."""
+
+    TAKE_TIMEOUT = 10.0  # seconds to wait for a running startup, a hanging engine is dropped after that
+
+    def __init__(self, uci_shell: UciShell, memory_budget: int):
+        super(EngineStandby, self).__init__()
+        self.uci_shell = uci_shell
+        self.memory_budget = memory_budget  # MB the standby engine may use
+        self._lock = threading.Lock()
+        self._file: Optional[str] = None  # real path, so that relative and linked names match
+        self._mame_par = ''
+        self._engine: Optional[UciEngine] = None
+        self._thread: Optional[threading.Thread] = None
+
+    def get_file(self) -> Optional[str]:
+        """Get the engine file in standby."""
+        return self._file
+
+    def prepare(self, file: str, mame_par: str):
+        """Start the engine in the background and replace the former standby engine."""
+        if '/mame/' in file:
+            logger.debug('no standby for emulated engine %s', file)
+            return
+        path = os.path.realpath(file)
+        with self._lock:
+            if self._file == path and self._mame_par == mame_par:
+                return
+            old_engine = self._engine
+            self._engine = None
+            self._file = path
+            self._mame_par = mame_par
+            self._thread = threading.Thread(target=self._warm_up, args=(file, path, mame_par), daemon=True)
+            self._thread.start()
+        if old_engine:
+            old_engine.quit()
+
+    def _warm_up(self, file: str, path: str, mame_par: str):
+        available = available_memory_mb()
+        if available is not None and available < 2 * self.memory_budget:
+            logger.info('not enough memory (%iMB) for standby engine %s', available, file)
+            self._forget(path, mame_par)
+            return
+        engine = UciEngine(file=file, uci_shell=self.uci_shell, mame_par=mame_par)
+        try:
+            logger.debug('standby engine %s started', engine.get_name())
+        except AttributeError:
+            logger.error('standby engine %s not started', file)
+            self._forget(path, mame_par)
+            return
+        used = process_memory_mb(engine.engine.process.pid())
+        if used is not None and used > self.memory_budget:
+            logger.info('standby engine %s uses %iMB - more than %iMB', file, used, self.memory_budget)
+            self._forget(path, mame_par)
+            engine.quit()
+            return
+        with self._lock:
+            if self._file == path and self._mame_par == mame_par:
+                self._engine = engine
+                return
+        engine.quit()  # another engine was requested meanwhile
+
+    def _forget(self, path: str, mame_par: str):
+        with self._lock:
+            if self._file == path and self._mame_par == mame_par:
+                self._file = None
+
+    def take(self, file: str, mame_par: str) -> Optional[UciEngine]:
+        """Return the standby engine if it was prepared for the file, waiting TAKE_TIMEOUT for a running startup."""
+        path = os.path.realpath(file)
+        with self._lock:
+            if self._file != path or self._mame_par != mame_par:
+                return None
+            thread = self._thread
+        if thread:
+            thread.join(self.TAKE_TIMEOUT)
+            if thread.is_alive():
+                logger.warning('standby engine %s still starting after %.1fs', file, self.TAKE_TIMEOUT)
+                self._forget(path, mame_par)  # the startup thread quits the engine when it is done
+                return None
+        with self._lock:
+            engine = self._engine
+            if self._file == path and self._mame_par == mame_par:
+                self._engine = None
+                self._file = None
+            else:
+                engine = None
+        if engine:
+            logger.debug('using standby engine %s', file)
+        return engine
+
+    def quit(self):
+        """Quit the standby engine."""
+        with self._lock:
+            engine = self._engine
+            self._engine = None
+            self._file = None
+        if engine:
+            engine.quit()
@@ -17,127 +17,212 @@
 
 import platform
 import configparser
+import json
 import os
-from uci.engine import UciShell, UciEngine
-
-
-def write_engine_ini(engine_path=None):
-    """Read the engine folder and create the engine.ini file."""
-    def write_level_ini(engine_filename: str):
-        """Write the level part for the engine.ini file."""
-        def calc_inc(diflevel: int):
-            """Calculate the increment for (max 20) levels."""
-            if diflevel > 1000:
-                inc = int(diflevel / 100)
-            else:
-                inc = int(diflevel / 10)
-            if 20 * inc < diflevel:
-                inc = int(diflevel / 20)
-            return inc
-
-        parser = configparser.ConfigParser()
-        parser.optionxform = str  # type: ignore
-        if not parser.read(engine_path + os.sep + engine_filename + '.uci'):
-            options = engine.get_options()
-            if engine.has_limit_strength():
-                uelevel = options['UCI_Elo']
-                minelo = uelevel.min
-                maxelo = uelevel.max
-                minlevel, maxlevel = min(minelo, maxelo), max(minelo, maxelo)
-                lvl_inc = calc_inc(maxlevel - minlevel)
-                level = minlevel
-                while level < maxlevel:
-                    parser['Elo@{:04d}'.format(level)] = {'UCI_LimitStrength': 'true', 'UCI_Elo': str(level)}
-                    level += lvl_inc
-                parser['Elo@{:04d}'.format(maxlevel)] = {'UCI_LimitStrength': 'false', 'UCI_Elo': str(maxlevel)}
-            if engine.has_skill_level():
-                sklevel = options['Skill Level']
-                minlevel = sklevel.min
-                maxlevel = sklevel.max
-                minlevel, maxlevel = min(minlevel, maxlevel), max(minlevel, maxlevel)
-                for level in range(minlevel, maxlevel + 1):
-                    parser['Level@{:02d}'.format(level)] = {'Skill Level': str(level)}
-            if engine.has_handicap_level():
-                sklevel = options['Handicap Level']
-                minlevel = sklevel.min
-                maxlevel = sklevel.max
-                minlevel, maxlevel = min(minlevel, maxlevel), max(minlevel, maxlevel)
-                for level in range(minlevel, maxlevel + 1):
-                    parser['Level@{:02d}'.format(level)] = {'Handicap Level': str(level)}
-            if engine.has_strength():
-                sklevel = options['Strength']
-                minlevel = sklevel.min
-                maxlevel = sklevel.max
-                minlevel, maxlevel = min(minlevel, maxlevel), max(minlevel, maxlevel)
-                lvl_inc = calc_inc(maxlevel - minlevel)
-                level = minlevel
-                count = 0
-                while level < maxlevel:
-                    parser['Level@{:02d}'.format(count)] = {'Strength': str(level)}
-                    level += lvl_inc
-                    count += 1
-                parser['Level@{:02d}'.format(count)] = {'Strength': str(maxlevel)}
-            with open(engine_path + os.sep + engine_filename + '.uci', 'w') as configfile:
-                parser.write(configfile)
+import time
+from concurrent import futures
+from subprocess import DEVNULL
+from typing import Optional
 
+import chess.uci  # type: ignore
+
+PROBE_VERSION = 1
+
+
+def _calc_inc(diflevel: int):
+    """Calculate the increment for (max 20) levels."""
+    if diflevel > 1000:
+        inc = int(diflevel / 100)
+    else:
+        inc = int(diflevel / 10)
+    if 20 * inc < diflevel:
+        inc = int(diflevel / 20)
+    return inc
+
+
+def _has_levels(options: dict):
+    """Return engine level support like UciEngine.has_levels() does."""
+    return any(name in options for name in ('Skill Level', 'Handicap Level', 'UCI_LimitStrength', 'Strength'))
+
+
+def write_level_ini(engine_path: str, engine_filename: str, options: dict):
+    """Write the level part for the engine.ini file."""
+    parser = configparser.ConfigParser()
+    parser.optionxform = str  # type: ignore
+    if not parser.read(engine_path + os.sep + engine_filename + '.uci'):
+        if 'UCI_LimitStrength' in options:
+            uelevel = options['UCI_Elo']
+            minelo = uelevel.min
+            maxelo = uelevel.max
+            minlevel, maxlevel = min(minelo, maxelo), max(minelo, maxelo)
+            lvl_inc = _calc_inc(maxlevel - minlevel)
+            level = minlevel
+            while level < maxlevel:
+                parser['Elo@{:04d}'.format(level)] = {'UCI_LimitStrength': 'true', 'UCI_Elo': str(level)}
+                level += lvl_inc
+            parser['Elo@{:04d}'.format(maxlevel)] = {'UCI_LimitStrength': 'false', 'UCI_Elo': str(maxlevel)}
+        if 'Skill Level' in options:
+            sklevel = options['Skill Level']
+            minlevel = sklevel.min
+            maxlevel = sklevel.max
+            minlevel, maxlevel = min(minlevel, maxlevel), max(minlevel, maxlevel)
+            for level in range(minlevel, maxlevel + 1):
+                parser['Level@{:02d}'.format(level)] = {'Skill Level': str(level)}
+        if 'Handicap Level' in options:
+            sklevel = options['Handicap Level']
+            minlevel = sklevel.min
+            maxlevel = sklevel.max
+            minlevel, maxlevel = min(minlevel, maxlevel), max(minlevel, maxlevel)
+            for level in range(minlevel, maxlevel + 1):
+                parser['Level@{:02d}'.format(level)] = {'Handicap Level': str(level)}
+        if 'Strength' in options:
+            sklevel = options['Strength']
+            minlevel = sklevel.min
+            maxlevel = sklevel.max
+            minlevel, maxlevel = min(minlevel, maxlevel), max(minlevel, maxlevel)
+            lvl_inc = _calc_inc(maxlevel - minlevel)
+            level = minlevel
+            count = 0
+            while level < maxlevel:
+                parser['Level@{:02d}'.format(count)] = {'Strength': str(level)}
+                level += lvl_inc
+                count += 1
+            parser['Level@{:02d}'.format(count)] = {'Strength': str(maxlevel)}
+        with open(engine_path + os.sep + engine_filename + '.uci', 'w') as configfile:
+            parser.write(configfile)
+
+
+def name_build(parts: list, maxlength: int, default_name: str):
+    """Get a (clever formed) cut name for the part list."""
+    eng_name = ''
+    for token in parts:
+        if len(eng_name) + len(token) > maxlength:
+            break
+        eng_name += token
+    return eng_name if eng_name else default_name
+
+
+def engine_section(engine_file_name: str, engine_name: str, engine_options: dict) -> dict:
+    """Build the engine.ini section for an engine."""
+    name_parts = engine_name.replace('.', '').split(' ')
+    name_small = name_build(name_parts, 6, engine_file_name[2:])
+    name_medium = name_build(name_parts, 8, name_small)
+    name_large = name_build(name_parts, 11, name_medium)
+
+    section = {}
+    # section[';available options'] = 'itsDefaultValue'
+    for option in engine_options:
+        section[str(';' + option)] = str(engine_options[option].default)
+
+    comp_elo = 2500
+    engine_elo = {'stockfish': 3360, 'texel': 3050, 'rodent': 2920,
+                  'zurichess': 2790, 'wyld': 2630, 'sayuri': 1850}
+    for name, elo in engine_elo.items():
+        if engine_name.lower().startswith(name):
+            comp_elo = elo
+            break
+
+    section['name'] = engine_name
+    section['small'] = name_small
+    section['medium'] = name_medium
+    section['large'] = name_large
+    section['elo'] = str(comp_elo)
+    return section
+
+
+def probe_engine(engine_path: str, engine_file_name: str, timeout: float) -> Optional[dict]:
+    """Start the engine, wait at most timeout secs for the uci handshake and return its ini section."""
+    engine = chess.uci.popen_engine(engine_path + os.sep + engine_file_name, stderr=DEVNULL)
+    try:
+        engine.uci(async_callback=True).result(timeout=timeout)
+    except (futures.TimeoutError, chess.uci.EngineTerminatedException):
+        engine.kill()
+        return None
+    try:
+        if _has_levels(engine.options):
+            write_level_ini(engine_path, engine_file_name, engine.options)
+        return engine_section(engine_file_name, engine.name, engine.options)
+    finally:
+        try:
+            engine.quit(async_callback=True).result(timeout=timeout)
+        except (futures.TimeoutError, chess.uci.EngineTerminatedException):
+            engine.kill()
+
+
+def _file_signature(path: str) -> list:
+    stat = os.stat(path)
+    return [stat.st_mtime_ns, stat.st_size]
+
+
+def _read_probe_cache(probe_file: str) -> dict:
+    try:
+        with open(probe_file) as file:
+            probes = json.load(file)
+    except (OSError, ValueError):
+        return {}
+    return probes.get('engines', {}) if probes.get('version') == PROBE_VERSION else {}
+
+
+def write_engine_ini(engine_path=None, workers=None, timeout=60.0, incremental=True):
+    """
+    Read the engine folder and create the engine.ini file.
+
+    The engines are probed by a pool of workers threads. With incremental set, only engines whose
+    executable changed since the last run are started again, the others are taken from the
+    .engines.ini.probe file. Each engine gets timeout secs for its uci handshake.
+    """
     def is_exe(fpath: str):
         """Check if fpath is an executable."""
         return os.path.isfile(fpath) and os.access(fpath, os.X_OK)
 
-    def name_build(parts: list, maxlength: int, default_name: str):
-        """Get a (clever formed) cut name for the part list."""
-        eng_name = ''
-        for token in parts:
-            if len(eng_name) + len(token) > maxlength:
-                break
-            eng_name += token
-        return eng_name if eng_name else default_name
-
     if not engine_path:
         program_path = os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir))
         engine_path = program_path + os.sep + 'engines' + os.sep + platform.machine()
-    engine_list = sorted(os.listdir(engine_path))
+    if workers is None:
+        workers = min(4, os.cpu_count() or 1)
+    probe_file = engine_path + os.sep + '.engines.ini.probe'
+    old_probes = _read_probe_cache(probe_file) if incremental else {}
+
+    engine_list = [name for name in sorted(os.listdir(engine_path)) if is_exe(engine_path + os.sep + name)]
+    probes = {}
+    to_probe = []
+    for engine_file_name in engine_list:
+        signature = _file_signature(engine_path + os.sep + engine_file_name)
+        old_probe = old_probes.get(engine_file_name)
+        if old_probe and old_probe['signature'] == signature:
+            print('{}: unchanged'.format(engine_file_name))
+            probes[engine_file_name] = old_probe
+        else:
+            to_probe.append((engine_file_name, signature))
+
+    def timed_probe(engine_file_name: str):
+        start = time.monotonic()
+        section = probe_engine(engine_path, engine_file_name, timeout)
+        return section, time.monotonic() - start
+
+    total_start = time.monotonic()
+    with futures.ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        probing = {executor.submit(timed_probe, name): (name, signature) for name, signature in to_probe}
+        for future in futures.as_completed(probing):
+            engine_file_name, signature = probing[future]
+            try:
+                section, seconds = future.result()
+            except (OSError, AttributeError, KeyError) as exc:  # broken engine, skip it
+                print('{}: failed ({}: {})'.format(engine_file_name, type(exc).__name__, exc))
+                continue
+            if section is None:
+                print('{}: no uci answer within {:.0f}s'.format(engine_file_name, timeout))
+                continue
+            print('{}: {:.2f}s'.format(engine_file_name, seconds))
+            probes[engine_file_name] = {'signature': signature, 'section': section, 'seconds': seconds}
+    print('probed {} of {} engines in {:.2f}s'.format(len(to_probe), len(engine_list), time.monotonic() - total_start))
+
     config = configparser.ConfigParser()
-    config.optionxform = str
-    uci_shell = UciShell()
+    config.optionxform = str  # type: ignore
     for engine_file_name in engine_list:
-        if is_exe(engine_path + os.sep + engine_file_name):
-            engine = UciEngine(file=engine_path + os.sep + engine_file_name, uci_shell=uci_shell)
-            if engine:
-                print(engine_file_name)
-                try:
-                    if engine.has_levels():
-                        write_level_ini(engine_file_name)
-                    engine_name = engine.get_name()
-
-                    name_parts = engine_name.replace('.', '').split(' ')
-                    name_small = name_build(name_parts, 6, engine_file_name[2:])
-                    name_medium = name_build(name_parts, 8, name_small)
-                    name_large = name_build(name_parts, 11, name_medium)
-
-                    config[engine_file_name] = {}
-
-                    # config[engine_file_name][';available options'] = 'itsDefaultValue'
-                    engine_options = engine.get_options()
-                    for option in engine_options:
-                        config[engine_file_name][str(';' + option)] = str(engine_options[option].default)
-
-                    comp_elo = 2500
-                    engine_elo = {'stockfish': 3360, 'texel': 3050, 'rodent': 2920,
-                                  'zurichess': 2790, 'wyld': 2630, 'sayuri': 1850}
-                    for name, elo in engine_elo.items():
-                        if engine_name.lower().startswith(name):
-                            comp_elo = elo
-                            break
-
-                    config[engine_file_name]['name'] = engine_name
-                    config[engine_file_name]['small'] = name_small
-                    config[engine_file_name]['medium'] = name_medium
-                    config[engine_file_name]['large'] = name_large
-                    config[engine_file_name]['elo'] = str(comp_elo)
-
-                except AttributeError:
-                    pass
-                engine.quit()
+        if engine_file_name in probes:
+            config[engine_file_name] = probes[engine_file_name]['section']
     with open(engine_path + os.sep + 'engines.ini', 'w') as configfile:
         config.write(configfile)
+    with open(probe_file, 'w') as file:
+        json.dump({'version': PROBE_VERSION, 'engines': probes}, file)
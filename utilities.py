@@ -26,8 +26,10 @@ import time
 import copy
 import configparser
 import subprocess
+import heapq
+import itertools
 
-from threading import Timer
+from threading import Condition, Thread
 from subprocess import Popen, PIPE
 
 from dgt.translate import DgtTranslate
@@ -106,12 +108,84 @@ class DisplayDgt(object):
             display.dgt_queue.put(copy.deepcopy(message))
 
 
+class ScheduledCall(object):
+
+    """Cancellation token of a call scheduled on the Scheduler."""
+
+    def __init__(self, function, args, kwargs):
+        self.function = function
+        self.args = args
+        self.kwargs = kwargs
+        self.cancelled = False
+        self.done = False
+
+    def cancel(self):
+        """Cancel the call, if it is already running it is not waited for."""
+        self.cancelled = True
+
+    def is_pending(self):
+        """Return if the call still waits for its time."""
+        return not (self.cancelled or self.done)
+
+    def run(self):
+        """Call the function unless cancelled."""
+        if self.cancelled:
+            return
+        self.done = True
+        try:
+            self.function(*self.args, **self.kwargs)
+        except Exception:  # don't kill the scheduler thread
+            logging.exception('scheduled call %s failed', self.function)
+
+
+class Scheduler(Thread):
+
+    """Run the scheduled calls at their time, all on one thread. The calls must return quickly."""
+
+    def __init__(self):
+        super(Scheduler, self).__init__(name='scheduler', daemon=True)
+        self.heap: list = []
+        self.counter = itertools.count()  # keeps calls with the same deadline in order
+        self.condition = Condition()
+
+    def schedule(self, delay: float, function, *args, **kwargs) -> ScheduledCall:
+        """Call function after delay seconds, return the token to cancel it."""
+        call = ScheduledCall(function, args, kwargs)
+        with self.condition:
+            heapq.heappush(self.heap, (time.monotonic() + delay, next(self.counter), call))
+            if not self.is_alive():
+                self.start()
+            self.condition.notify()
+        return call
+
+    def _next_call(self) -> ScheduledCall:
+        with self.condition:
+            while True:
+                while self.heap and self.heap[0][2].cancelled:
+                    heapq.heappop(self.heap)
+                if not self.heap:
+                    self.condition.wait()
+                    continue
+                wait = self.heap[0][0] - time.monotonic()
+                if wait <= 0:
+                    return heapq.heappop(self.heap)[2]
+                self.condition.wait(wait)
+
+    def run(self):
+        """Call by threading.Thread start() function."""
+        while True:
+            self._next_call().run()
+
+
+scheduler = Scheduler()
+
+
 class RepeatedTimer(object):
 
     """Call function on a given interval."""
 
     def __init__(self, interval, function, *args, **kwargs):
-        self._timer = None
+        self._timer: Optional[ScheduledCall] = None
         self.interval = interval
         self.function = function
         self.args = args
@@ -130,8 +204,7 @@ class RepeatedTimer(object):
     def start(self):
         """Start the RepeatedTimer."""
         if not self.timer_running:
-            self._timer = Timer(self.interval, self._run)
-            self._timer.start()
+            self._timer = scheduler.schedule(self.interval, self._run)
             self.timer_running = True
         else:
             logging.info('repeated timer already running - strange!')